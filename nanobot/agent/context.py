@@ -2,12 +2,16 @@
 
 import base64
 import mimetypes
+import re
 from pathlib import Path
 from typing import Any
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
 
+# The current-time section of the system prompt, which changes every minute
+CURRENT_TIME_RE = re.compile(r"^## Current Time\n.*$", re.MULTILINE)
+
 
 class ContextBuilder:
     """
@@ -2,24 +2,30 @@
 
 import asyncio
 import json
+import re
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
-from nanobot.agent.context import ContextBuilder
+from nanobot.agent.context import CURRENT_TIME_RE, ContextBuilder
+from nanobot.agent.routing import ModelRouter
+from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.cron import CronTool
+from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.http_cache import HttpCache
+from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.registry import ToolRegistry
-from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
+from nanobot.agent.tools.search import SearchTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
-from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
-from nanobot.agent.tools.cron import CronTool
-from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.web import WebFetchManyTool, WebFetchTool, WebSearchTool
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider
+from nanobot.providers.cache import bypass_cache, unkeyed
 from nanobot.session.manager import SessionManager
+from nanobot.utils.helpers import get_data_path
 
 
 class AgentLoop:
@@ -45,16 +51,31 @@ class AgentLoop:
         exec_config: "ExecToolConfig | None" = None,
         cron_service: "CronService | None" = None,
         solana_config: "SolanaTradingConfig | None" = None,
+        model_routing: "ModelRoutingConfig | None" = None,
+        search_config: "SearchToolConfig | None" = None,
+        web_config: "WebToolsConfig | None" = None,
+        subagent_config: "SubagentConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig, SolanaTradingConfig
+        from nanobot.config.schema import (
+            ExecToolConfig,
+            SearchToolConfig,
+            SolanaTradingConfig,
+            WebToolsConfig,
+        )
         from nanobot.cron.service import CronService
         self.bus = bus
         self.provider = provider
         self.workspace = workspace
         self.model = model or provider.get_default_model()
+        self.router = ModelRouter(self.model, model_routing)
         self.max_iterations = max_iterations
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
+        self.search_config = search_config or SearchToolConfig()
+        self.web_config = web_config or WebToolsConfig()
+        self.http_cache = HttpCache(
+            get_data_path() / "cache" / "http", max_bytes=self.web_config.fetch.cache_max_bytes
+        ) if self.web_config.fetch.cache else None
         self.cron_service = cron_service
         self.solana_config = solana_config
         
@@ -65,11 +86,15 @@ class AgentLoop:
             provider=provider,
             workspace=workspace,
             bus=bus,
-            model=self.model,
+            model=self.router.model_for("subagent"),
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
+            web_config=self.web_config,
+            http_cache=self.http_cache,
+            config=subagent_config,
         )
         
+        self.shell_pool: "ShellSessionPool | None" = None
         self._running = False
         self._register_default_tools()
     
@@ -80,17 +105,38 @@ class AgentLoop:
         self.tools.register(WriteFileTool())
         self.tools.register(EditFileTool())
         self.tools.register(ListDirTool())
+        self.tools.register(SearchTool(
+            workspace=self.workspace,
+            use_index=self.search_config.index,
+            max_file_bytes=self.search_config.max_file_bytes,
+            max_results=self.search_config.max_results,
+        ))
         
         # Shell tool
+        if self.exec_config.persistent_shell:
+            from nanobot.agent.tools.shell_session import ShellSessionPool
+            self.shell_pool = ShellSessionPool(idle_timeout=self.exec_config.shell_idle_timeout)
         self.tools.register(ExecTool(
             working_dir=str(self.workspace),
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.exec_config.restrict_to_workspace,
+            send_callback=self.bus.publish_outbound,
+            progress_interval=self.exec_config.progress_interval,
+            session_pool=self.shell_pool,
         ))
         
         # Web tools
-        self.tools.register(WebSearchTool(api_key=self.brave_api_key))
-        self.tools.register(WebFetchTool())
+        self.tools.register(WebSearchTool(
+            api_key=self.brave_api_key,
+            max_results=self.web_config.search.max_results,
+            cache_ttl=self.web_config.search.cache_ttl,
+        ))
+        web_fetch = WebFetchTool(
+            max_response_bytes=self.web_config.fetch.max_response_bytes,
+            cache=self.http_cache,
+        )
+        self.tools.register(web_fetch)
+        self.tools.register(WebFetchManyTool(web_fetch))
         
         # Message tool
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
@@ -142,14 +188,33 @@ class AgentLoop:
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
+        if self.shell_pool:
+            self.shell_pool.close_all()
         logger.info("Agent loop stopping")
     
-    async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
+    def _set_tool_context(self, channel: str, chat_id: str) -> None:
+        """Point context-aware tools (message, spawn, cron, exec, ...) at a chat for the current task."""
+        for name in ("message", "spawn", "cron", "exec", "solana_trader"):
+            tool = self.tools.get(name)
+            if tool and hasattr(tool, "set_context"):
+                tool.set_context(channel, chat_id)
+    
+    async def _process_message(
+        self,
+        msg: InboundMessage,
+        purpose: str = "interactive",
+        usage: dict[str, int] | None = None,
+    ) -> OutboundMessage | None:
         """
         Process a single inbound message.
         
         Args:
             msg: The inbound message to process.
+            purpose: What the turn is for (interactive, cron, heartbeat); selects the model.
+                Background (non-interactive) turns don't see the session history, and
+                the current time isn't part of their cache key, so a repeated check
+                can be answered from the response cache.
+            usage: If given, token usage of every LLM call is added to it.
         
         Returns:
             The response message, or None if no response needed.
@@ -165,25 +230,12 @@ class AgentLoop:
         session = self.sessions.get_or_create(msg.session_key)
         
         # Update tool contexts
-        message_tool = self.tools.get("message")
-        if isinstance(message_tool, MessageTool):
-            message_tool.set_context(msg.channel, msg.chat_id)
-        
-        spawn_tool = self.tools.get("spawn")
-        if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(msg.channel, msg.chat_id)
-        
-        cron_tool = self.tools.get("cron")
-        if isinstance(cron_tool, CronTool):
-            cron_tool.set_context(msg.channel, msg.chat_id)
-
-        solana_tool = self.tools.get("solana_trader")
-        if solana_tool and hasattr(solana_tool, "set_context"):
-            solana_tool.set_context(msg.channel, msg.chat_id)
+        self._set_tool_context(msg.channel, msg.chat_id)
 
         # Build initial messages (use get_history for LLM-formatted messages)
+        interactive = purpose == "interactive"
         messages = self.context.build_messages(
-            history=session.get_history(),
+            history=session.get_history() if interactive else [],
             current_message=msg.content,
             media=msg.media if msg.media else None,
             channel=msg.channel,
@@ -193,19 +245,27 @@ class AgentLoop:
         # Agent loop
         iteration = 0
         final_content = None
+        model = self.router.initial_model(purpose, msg.content, msg.media)
         
         while iteration < self.max_iterations:
             iteration += 1
             
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
+            # Call LLM (live chats always get a fresh answer, never a cached one)
+            with bypass_cache() if interactive else unkeyed(CURRENT_TIME_RE):
+                response = await self.provider.chat(
+                    messages=messages,
+                    tools=self.tools.get_definitions(),
+                    model=model
+                )
+            if usage is not None:
+                for key, value in response.usage.items():
+                    usage[key] = usage.get(key, 0) + value
             
             # Handle tool calls
             if response.has_tool_calls:
+                # Tool use means real work: continue on the full model
+                model = self.router.model_for(purpose)
+
                 # Add assistant message with tool calls
                 tool_call_dicts = [
                     {
@@ -273,21 +333,7 @@ class AgentLoop:
         session = self.sessions.get_or_create(session_key)
         
         # Update tool contexts
-        message_tool = self.tools.get("message")
-        if isinstance(message_tool, MessageTool):
-            message_tool.set_context(origin_channel, origin_chat_id)
-        
-        spawn_tool = self.tools.get("spawn")
-        if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(origin_channel, origin_chat_id)
-        
-        cron_tool = self.tools.get("cron")
-        if isinstance(cron_tool, CronTool):
-            cron_tool.set_context(origin_channel, origin_chat_id)
-
-        solana_tool = self.tools.get("solana_trader")
-        if solana_tool and hasattr(solana_tool, "set_context"):
-            solana_tool.set_context(origin_channel, origin_chat_id)
+        self._set_tool_context(origin_channel, origin_chat_id)
 
         # Build messages with the announce content
         messages = self.context.build_messages(
@@ -307,7 +353,7 @@ class AgentLoop:
             response = await self.provider.chat(
                 messages=messages,
                 tools=self.tools.get_definitions(),
-                model=self.model
+                model=self.router.model_for("announce")
             )
             
             if response.has_tool_calls:
@@ -357,6 +403,8 @@ class AgentLoop:
         session_key: str = "cli:direct",
         channel: str = "cli",
         chat_id: str = "direct",
+        purpose: str = "interactive",
+        usage: dict[str, int] | None = None,
     ) -> str:
         """
         Process a message directly (for CLI or cron usage).
@@ -366,6 +414,8 @@ class AgentLoop:
             session_key: Session identifier.
             channel: Source channel (for context).
             chat_id: Source chat ID (for context).
+            purpose: What the turn is for (interactive, cron, heartbeat).
+            usage: If given, the turn's token usage is accumulated into it.
         
         Returns:
             The agent's response.
@@ -377,5 +427,82 @@ class AgentLoop:
             content=content
         )
         
-        response = await self._process_message(msg)
+        response = await self._process_message(msg, purpose=purpose, usage=usage)
         return response.content if response else ""
+    
+    async def execute_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        channel: str = "cli",
+        chat_id: str = "direct",
+    ) -> str:
+        """
+        Execute a registered tool directly, without an LLM turn (for cron tool_call jobs).
+        
+        Args:
+            name: Tool name.
+            arguments: Tool arguments, validated against the tool's schema.
+            channel: Channel for context-aware tools.
+            chat_id: Chat ID for context-aware tools.
+        
+        Returns:
+            The tool result; failures are "Error..." strings as in a turn.
+        """
+        self._set_tool_context(channel, chat_id)
+        logger.debug(f"Executing tool directly: {name} with arguments: {json.dumps(arguments)}")
+        return await self.tools.execute(name, arguments)
+    
+    async def run_cron_job(self, job: "CronJob") -> str | None:
+        """
+        Execute a cron job: an agent turn, or its tool directly for tool_call jobs.
+        
+        A tool_call job escalates to an agent turn only when its result
+        matches escalate_if; otherwise the result itself is the job's output,
+        delivered if the job delivers and has no escalate_if. Token usage of
+        the turn is added to the job's run in the cron service.
+        
+        Args:
+            job: The job to run.
+        
+        Returns:
+            The response (or tool result) to record for the run.
+        
+        Raises:
+            RuntimeError: If the tool returns an error.
+        """
+        payload = job.payload
+        channel = payload.channel or "cli"
+        chat_id = payload.to or "direct"
+        message = payload.message
+        if payload.kind == "tool_call":
+            result = await self.execute_tool(payload.tool or "", payload.args, channel, chat_id)
+            if result.startswith("Error"):
+                raise RuntimeError(result)
+            if not payload.escalate_if or not re.search(payload.escalate_if, result):
+                if not payload.escalate_if and payload.deliver and payload.to:
+                    await self.bus.publish_outbound(OutboundMessage(
+                        channel=channel, chat_id=payload.to, content=result
+                    ))
+                return result
+            # The result matched: hand it to the agent
+            message = f"{message}\n\n[{payload.tool} returned]\n{result}"
+        
+        usage: dict[str, int] = {}
+        try:
+            response = await self.process_direct(
+                message,
+                session_key=f"cron:{job.id}",
+                channel=channel,
+                chat_id=chat_id,
+                purpose="cron",
+                usage=usage,
+            )
+        finally:
+            if self.cron_service:
+                self.cron_service.add_usage(job.id, usage)
+        if payload.deliver and payload.to:
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=channel, chat_id=payload.to, content=response or ""
+            ))
+        return response
@@ -0,0 +1,71 @@
+"""Per-purpose model routing for agent LLM calls."""
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import ModelRoutingConfig
+
+# Turns longer than this are assumed to need the full model
+SIMPLE_TURN_MAX_CHARS = 200
+
+# Hints that a turn needs tools, code or multi-step reasoning
+_COMPLEX_HINTS = re.compile(
+    r"```|`|https?://|www\.|[\w.-]+/[\w.-]+|\.\w{1,4}\b|\d+\s*[-+*/^%]\s*\d+|"
+    r"\b(search|find|look\s*up|fetch|browse|read|write|edit|create|delete|file|folder|"
+    r"run|exec|install|command|script|code|debug|fix|error|schedule|remind|cron|every|"
+    r"buy|sell|swap|trade|price|portfolio|wallet|token|analy[sz]e|explain|why|how|compare|"
+    r"calculate|plan|summari[sz]e|translate|research|step|list|remember|memory)\b",
+    re.IGNORECASE,
+)
+
+
+def is_simple_turn(message: str, media: list[str] | None = None) -> bool:
+    """
+    Cheap heuristic: can this turn be answered by a small model without tools?
+
+    True for short chit-chat and acknowledgements ("thanks!", "good morning"),
+    False for anything with attachments, code, paths/URLs, arithmetic or verbs
+    that usually lead to tool use or reasoning.
+    """
+    if media:
+        return False
+    text = message.strip()
+    if not text or len(text) > SIMPLE_TURN_MAX_CHARS or text.count("\n") > 2:
+        return False
+    return not _COMPLEX_HINTS.search(text)
+
+
+class ModelRouter:
+    """
+    Chooses the model for each agent LLM call.
+
+    Every purpose (interactive, subagent, heartbeat, cron, announce) can be
+    mapped to its own model; unset purposes use the default model. When a
+    fast model is configured, simple interactive and cron turns start on it
+    and escalate to the purpose model as soon as a tool is needed.
+    """
+
+    PURPOSES = ("interactive", "subagent", "heartbeat", "cron", "announce")
+    CLASSIFIED_PURPOSES = ("interactive", "cron")
+
+    def __init__(self, default_model: str, config: "ModelRoutingConfig | None" = None):
+        self.default_model = default_model
+        self.config = config
+        self.fast_model = (config.fast if config else "") or None
+
+    def model_for(self, purpose: str) -> str:
+        """Get the model configured for a purpose."""
+        if self.config and purpose in self.PURPOSES:
+            return getattr(self.config, purpose) or self.default_model
+        return self.default_model
+
+    def initial_model(self, purpose: str, message: str, media: list[str] | None = None) -> str:
+        """Get the model for the first LLM call of a turn."""
+        if (
+            self.fast_model
+            and purpose in self.CLASSIFIED_PURPOSES
+            and is_simple_turn(message, media)
+        ):
+            return self.fast_model
+        return self.model_for(purpose)
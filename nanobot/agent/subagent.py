@@ -1,8 +1,13 @@
 """Subagent manager for background task execution."""
 
 import asyncio
+import functools
 import json
+import sys
+import time
 import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -10,11 +15,68 @@ from loguru import logger
 
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import LLMProvider, LLMResponse
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
-from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.shell import ExecTool, _kill_process_group
+from nanobot.agent.tools.search import SearchTool
+from nanobot.agent.tools.web import WebSearchTool, WebFetchTool, WebFetchManyTool
+
+
+@dataclass
+class SubagentTask:
+    """A spawned subagent with its state and resource accounting."""
+    id: str
+    label: str
+    task: str
+    origin: dict[str, str]
+    status: str = "queued"  # queued, running, ok, error, cancelled, timeout
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    iterations: int = 0
+    tool_calls: int = 0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_latency_ms: float = 0.0
+    result: str | None = None
+    handle: asyncio.Task | None = field(default=None, repr=False)
+    
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+    
+    @property
+    def origin_key(self) -> str:
+        return f"{self.origin['channel']}:{self.origin['chat_id']}"
+    
+    def record_llm_call(self, usage: dict[str, int], latency_ms: float) -> None:
+        self.llm_calls += 1
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+        self.llm_latency_ms += latency_ms
+    
+    def summary(self) -> str:
+        """One-line description for list output."""
+        end = self.finished_at or time.time()
+        elapsed = f"{end - self.started_at:.0f}s" if self.started_at else "waiting"
+        return (
+            f"[{self.id}] {self.label} - {self.status} ({elapsed}, {self.iterations} steps, "
+            f"{self.prompt_tokens + self.completion_tokens} tokens)"
+        )
+    
+    def details(self) -> str:
+        """Multi-line description for status output."""
+        lines = [
+            self.summary(),
+            f"Task: {self.task}",
+            f"LLM calls: {self.llm_calls}, tool calls: {self.tool_calls}, prompt tokens: {self.prompt_tokens}, "
+            f"completion tokens: {self.completion_tokens}, LLM time: {self.llm_latency_ms / 1000:.1f}s",
+        ]
+        if self.result is not None:
+            lines.append(f"Result:\n{self.result}")
+        return "\n".join(lines)
 
 
 class SubagentManager:
@@ -24,6 +86,19 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+    
+    At most `max_concurrent` subagents run at once; further spawns wait in
+    FIFO order, and spawns beyond the global or per-chat quota are
+    rejected. Each subagent has a timeout and can be cancelled, and its
+    LLM calls, tokens and latency are tracked for list/status.
+    
+    With isolation "process", each subagent runs in a worker process
+    (see subagent_worker) under memory/CPU rlimits, so heavy or crashing
+    work can't stall or take down the gateway. Its LLM calls are still
+    made here, through the shared provider. A worker that dies without
+    reporting a result is restarted up to `max_restarts` times, but only
+    if it hasn't been handed any tool calls: tools may not be safe to run
+    twice.
     """
     
     def __init__(
@@ -34,15 +109,22 @@ class SubagentManager:
         model: str | None = None,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
+        web_config: "WebToolsConfig | None" = None,
+        http_cache: "HttpCache | None" = None,
+        config: "SubagentConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, SubagentConfig, WebToolsConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
         self.model = model or provider.get_default_model()
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
-        self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self.web_config = web_config or WebToolsConfig()
+        self.http_cache = http_cache
+        self.config = config or SubagentConfig()
+        self._slots = asyncio.Semaphore(self.config.max_concurrent)
+        self._tasks: OrderedDict[str, SubagentTask] = OrderedDict()
     
     async def spawn(
         self,
@@ -63,115 +145,254 @@ class SubagentManager:
         Returns:
             Status message indicating the subagent was started.
         """
-        task_id = str(uuid.uuid4())[:8]
-        display_label = label or task[:30] + ("..." if len(task) > 30 else "")
-        
         origin = {
             "channel": origin_channel,
             "chat_id": origin_chat_id,
         }
+        active = [t for t in self._tasks.values() if t.active]
+        if len(active) >= self.config.max_queued:
+            return f"Error: too many subagents ({len(active)}) already running or queued; wait for some to finish"
+        origin_key = f"{origin_channel}:{origin_chat_id}"
+        if sum(1 for t in active if t.origin_key == origin_key) >= self.config.max_per_origin:
+            return (
+                f"Error: this chat already has {self.config.max_per_origin} subagents running or queued; "
+                "wait for one to finish or cancel one"
+            )
         
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
-        )
-        self._running_tasks[task_id] = bg_task
+        task_id = str(uuid.uuid4())[:8]
+        display_label = label or task[:30] + ("..." if len(task) > 30 else "")
+        record = SubagentTask(id=task_id, label=display_label, task=task, origin=origin)
+        self._tasks[task_id] = record
+        self._prune_history()
         
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        record.handle = asyncio.create_task(self._run_subagent(record))
         
-        logger.info(f"Spawned subagent [{task_id}]: {display_label}")
-        return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
+        queued = len(active) >= self.config.max_concurrent
+        logger.info(f"Spawned subagent [{task_id}]: {display_label}{' (queued)' if queued else ''}")
+        state = "queued" if queued else "started"
+        return f"Subagent [{display_label}] {state} (id: {task_id}). I'll notify you when it completes."
     
-    async def _run_subagent(
-        self,
-        task_id: str,
-        task: str,
-        label: str,
-        origin: dict[str, str],
-    ) -> None:
-        """Execute the subagent task and announce the result."""
-        logger.info(f"Subagent [{task_id}] starting task: {label}")
-        
+    async def _run_subagent(self, record: SubagentTask) -> None:
+        """Wait for a free slot, run the subagent with its timeout and announce the result."""
         try:
-            # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
-            tools.register(ReadFileTool())
-            tools.register(WriteFileTool())
-            tools.register(ListDirTool())
-            tools.register(ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                restrict_to_workspace=self.exec_config.restrict_to_workspace,
-            ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
-            
-            # Build messages with subagent-specific prompt
-            system_prompt = self._build_subagent_prompt(task)
-            messages: list[dict[str, Any]] = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": task},
-            ]
+            async with self._slots:
+                record.status = "running"
+                record.started_at = time.time()
+                logger.info(f"Subagent [{record.id}] starting task: {record.label}")
+                run = self._execute_in_process if self.config.isolation == "process" else self._execute
+                try:
+                    result = await asyncio.wait_for(run(record), timeout=self.config.timeout_s)
+                    record.status = "ok"
+                except asyncio.TimeoutError:
+                    record.status = "timeout"
+                    result = f"Error: timed out after {self.config.timeout_s}s"
+                    logger.warning(f"Subagent [{record.id}] timed out")
+                except Exception as e:
+                    record.status = "error"
+                    result = f"Error: {str(e)}"
+                    logger.error(f"Subagent [{record.id}] failed: {e}")
+        except asyncio.CancelledError:
+            record.status = "cancelled"
+            record.finished_at = time.time()
+            logger.info(f"Subagent [{record.id}] cancelled")
+            return
+        
+        record.result = result
+        record.finished_at = time.time()
+        logger.info(
+            f"Subagent [{record.id}] finished: {record.status}, {record.llm_calls} LLM calls, "
+            f"{record.prompt_tokens + record.completion_tokens} tokens"
+        )
+        await self._announce_result(
+            record.id, record.label, record.task, result, record.origin,
+            "ok" if record.status == "ok" else "error",
+        )
+    
+    async def _execute(self, record: SubagentTask) -> str:
+        """Run the subagent's tool loop and return its final response."""
+        task_id, task = record.id, record.task
+        # Build subagent tools (no message tool, no spawn tool)
+        tools = ToolRegistry()
+        tools.register(ReadFileTool())
+        tools.register(WriteFileTool())
+        tools.register(ListDirTool())
+        tools.register(SearchTool(workspace=self.workspace))
+        tools.register(ExecTool(
+            working_dir=str(self.workspace),
+            timeout=self.exec_config.timeout,
+            restrict_to_workspace=self.exec_config.restrict_to_workspace,
+        ))
+        tools.register(WebSearchTool(
+            api_key=self.brave_api_key,
+            max_results=self.web_config.search.max_results,
+            cache_ttl=self.web_config.search.cache_ttl,
+        ))
+        web_fetch = WebFetchTool(
+            max_response_bytes=self.web_config.fetch.max_response_bytes,
+            cache=self.http_cache,
+        )
+        tools.register(web_fetch)
+        tools.register(WebFetchManyTool(web_fetch))
+        
+        # Build messages with subagent-specific prompt
+        system_prompt = self._build_subagent_prompt(task)
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": task},
+        ]
+        
+        # Run agent loop (limited iterations)
+        max_iterations = self.config.max_iterations
+        final_result: str | None = None
+        
+        while record.iterations < max_iterations:
+            record.iterations += 1
             
-            # Run agent loop (limited iterations)
-            max_iterations = 15
-            iteration = 0
-            final_result: str | None = None
+            start = time.monotonic()
+            response = await self.provider.chat(
+                messages=messages,
+                tools=tools.get_definitions(),
+                model=self.model,
+            )
+            record.record_llm_call(response.usage, (time.monotonic() - start) * 1000)
             
-            while iteration < max_iterations:
-                iteration += 1
+            if response.has_tool_calls:
+                # Add assistant message with tool calls
+                tool_call_dicts = [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.name,
+                            "arguments": json.dumps(tc.arguments),
+                        },
+                    }
+                    for tc in response.tool_calls
+                ]
+                messages.append({
+                    "role": "assistant",
+                    "content": response.content or "",
+                    "tool_calls": tool_call_dicts,
+                })
                 
-                response = await self.provider.chat(
-                    messages=messages,
-                    tools=tools.get_definitions(),
-                    model=self.model,
-                )
-                
-                if response.has_tool_calls:
-                    # Add assistant message with tool calls
-                    tool_call_dicts = [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.name,
-                                "arguments": json.dumps(tc.arguments),
-                            },
-                        }
-                        for tc in response.tool_calls
-                    ]
+                # Execute tools
+                for tool_call in response.tool_calls:
+                    record.tool_calls += 1
+                    args_str = json.dumps(tool_call.arguments)
+                    logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
+                    result = await tools.execute(tool_call.name, tool_call.arguments)
                     messages.append({
-                        "role": "assistant",
-                        "content": response.content or "",
-                        "tool_calls": tool_call_dicts,
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "name": tool_call.name,
+                        "content": result,
                     })
-                    
-                    # Execute tools
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments)
-                        logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_call.name,
-                            "content": result,
-                        })
-                else:
-                    final_result = response.content
-                    break
-            
-            if final_result is None:
-                final_result = "Task completed but no final response was generated."
-            
-            logger.info(f"Subagent [{task_id}] completed successfully")
-            await self._announce_result(task_id, label, task, final_result, origin, "ok")
+            else:
+                final_result = response.content
+                break
+        
+        if final_result is None:
+            final_result = "Task completed but no final response was generated."
+        
+        return final_result
+    
+    async def _execute_in_process(self, record: SubagentTask) -> str:
+        """Run the subagent in a worker process, restarting it if it crashes."""
+        crashes = 0
+        while True:
+            outcome = await self._run_worker(record)
+            if isinstance(outcome, tuple):
+                status, result = outcome
+                if status != "ok":
+                    raise RuntimeError(result.removeprefix("Error: "))
+                return result
+            crashes += 1
+            if record.tool_calls:
+                raise RuntimeError(
+                    f"worker process crashed after running tools ({outcome}); "
+                    "not restarted, as tools may not be safe to repeat"
+                )
+            if crashes > self.config.max_restarts:
+                raise RuntimeError(f"worker process crashed ({outcome})")
+            logger.warning(f"Subagent [{record.id}] worker crashed ({outcome}), restarting")
+    
+    async def _run_worker(self, record: SubagentTask) -> tuple[str, str] | str:
+        """
+        Run one worker process to completion.
+        
+        Returns (status, result) from the worker, or a description of how
+        it died if it exited without a result.
+        """
+        from nanobot.agent.subagent_worker import MARKER, limit_resources
+        
+        request = {
+            "id": record.id,
+            "label": record.label,
+            "task": record.task,
+            "origin": record.origin,
+            "model": self.model,
+            "workspace": str(self.workspace),
+        }
+        preexec = None
+        if sys.platform != "win32":
+            preexec = functools.partial(limit_resources, self.config.max_memory_mb, self.config.max_cpu_s)
+        
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "nanobot.agent.subagent_worker",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            preexec_fn=preexec,
+            start_new_session=True,
+            limit=16 * 1024 * 1024,  # Result lines can be long
+        )
+        outcome: tuple[str, str] | None = None
+        try:
+            process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+            await process.stdin.drain()
             
+            async for line in process.stdout:
+                text = line.decode("utf-8", errors="replace")
+                if not text.startswith(MARKER):
+                    continue
+                event = json.loads(text[len(MARKER):])
+                if event["type"] == "llm_request":
+                    response = await self._proxy_llm_call(record, event)
+                    try:
+                        process.stdin.write(json.dumps(asdict(response)).encode("utf-8") + b"\n")
+                        await process.stdin.drain()
+                    except (BrokenPipeError, ConnectionResetError):
+                        break  # Worker died; its exit status tells how
+                elif event["type"] == "result":
+                    outcome = (event["status"], event["result"])
+            code = await process.wait()
+        finally:
+            if process.returncode is None:
+                # Cancelled or timed out: take the worker and its children down
+                _kill_process_group(process)
+                await process.wait()
+        
+        if outcome:
+            return outcome
+        return f"killed by signal {-code}" if code < 0 else f"exit code {code}"
+    
+    async def _proxy_llm_call(self, record: SubagentTask, request: dict[str, Any]) -> LLMResponse:
+        """Make an LLM call on behalf of a worker process."""
+        record.iterations += 1
+        start = time.monotonic()
+        try:
+            response = await self.provider.chat(
+                messages=request["messages"],
+                tools=request["tools"],
+                model=request["model"],
+                max_tokens=request["max_tokens"],
+                temperature=request["temperature"],
+            )
         except Exception as e:
-            error_msg = f"Error: {str(e)}"
-            logger.error(f"Subagent [{task_id}] failed: {e}")
-            await self._announce_result(task_id, label, task, error_msg, origin, "error")
+            response = LLMResponse(content=f"Error calling LLM: {e}", finish_reason="error")
+        record.record_llm_call(response.usage, (time.monotonic() - start) * 1000)
+        # Counted when handed out: the worker may crash while running them
+        record.tool_calls += len(response.tool_calls)
+        return response
     
     async def _announce_result(
         self,
@@ -238,4 +459,33 @@ When you have completed the task, provide a clear summary of your findings or ac
     
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
-        return len(self._running_tasks)
+        return sum(1 for t in self._tasks.values() if t.status == "running")
+    
+    def get(self, task_id: str) -> SubagentTask | None:
+        """Get a subagent by id."""
+        return self._tasks.get(task_id)
+    
+    def list(self, origin_channel: str | None = None, origin_chat_id: str | None = None) -> list[SubagentTask]:
+        """Subagents (active and recently finished), optionally only those from one chat."""
+        tasks = list(self._tasks.values())
+        if origin_channel is not None:
+            key = f"{origin_channel}:{origin_chat_id}"
+            tasks = [t for t in tasks if t.origin_key == key]
+        return tasks
+    
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a queued or running subagent; False if it isn't active."""
+        record = self._tasks.get(task_id)
+        if not record or not record.active or not record.handle:
+            return False
+        record.handle.cancel()
+        if record.status == "queued":
+            # A task cancelled before its first step never runs its handler
+            record.status = "cancelled"
+            record.finished_at = time.time()
+        return True
+    
+    def _prune_history(self) -> None:
+        finished = [t.id for t in self._tasks.values() if not t.active]
+        for task_id in finished[:max(0, len(finished) - self.config.history)]:
+            del self._tasks[task_id]
@@ -0,0 +1,133 @@
+"""Worker process for process-isolated subagents.
+
+SubagentManager starts `python -m nanobot.agent.subagent_worker` and talks
+to it in JSON lines. The first stdin line is the request. The worker does
+not call the LLM itself: each call is sent to the parent as an event, the
+parent makes it with its own provider (so rate limits, the response cache
+and circuit breakers are shared with the gateway) and writes the response
+back on stdin. Event lines on stdout start with MARKER; any other output
+(e.g. from libraries) is ignored. Logs go to stderr, which is shared with
+the gateway.
+
+Events:
+    {"type": "llm_request", "messages": [...], "tools": [...], "model": "...", ...}
+    {"type": "result", "status": "ok" | "error", "result": "..."}
+
+Replies on stdin, one per llm_request:
+    {"content": "...", "tool_calls": [...], "finish_reason": "...", "usage": {...}}
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+MARKER = "@@nanobot-subagent "
+
+
+def emit(event: dict[str, Any]) -> None:
+    sys.stdout.write(MARKER + json.dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def limit_resources(max_memory_mb: int, max_cpu_s: int) -> None:
+    """Applied in the child before exec: rlimits and lower scheduling priority."""
+    import os
+    import resource
+
+    if max_memory_mb > 0:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if max_cpu_s > 0:
+        resource.setrlimit(resource.RLIMIT_CPU, (max_cpu_s, max_cpu_s + 5))
+    # Background work should lose to the gateway for CPU
+    os.nice(10)
+
+
+class ParentProvider(LLMProvider):
+    """LLM provider that asks the parent process to make each call."""
+
+    def __init__(self, model: str):
+        super().__init__()
+        self.model = model
+        self._lock = asyncio.Lock()  # One request/reply exchange at a time
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        async with self._lock:
+            emit({
+                "type": "llm_request",
+                "messages": messages,
+                "tools": tools,
+                "model": model or self.model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            })
+            line = await asyncio.to_thread(sys.stdin.readline)
+        if not line:
+            raise RuntimeError("parent process closed the connection")
+        reply = json.loads(line)
+        return LLMResponse(
+            content=reply.get("content"),
+            tool_calls=[ToolCallRequest(**tc) for tc in reply.get("tool_calls", [])],
+            finish_reason=reply.get("finish_reason", "stop"),
+            usage=reply.get("usage", {}),
+        )
+
+    def get_default_model(self) -> str:
+        return self.model
+
+
+async def run(request: dict[str, Any]) -> str:
+    """Run one subagent as described by the request; returns its final response."""
+    from nanobot.agent.subagent import SubagentManager, SubagentTask
+    from nanobot.agent.tools.http_cache import HttpCache
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import load_config
+    from nanobot.utils.helpers import get_data_path
+
+    config = load_config()
+    web = config.tools.web
+    manager = SubagentManager(
+        provider=ParentProvider(request["model"]),
+        workspace=Path(request["workspace"]),
+        bus=MessageBus(),
+        model=request["model"],
+        brave_api_key=config.tools.web.search.api_key or None,
+        exec_config=config.tools.exec,
+        web_config=web,
+        http_cache=HttpCache(
+            get_data_path() / "cache" / "http", max_bytes=web.fetch.cache_max_bytes
+        ) if web.fetch.cache else None,
+        config=config.agents.subagents,
+    )
+    record = SubagentTask(
+        id=request["id"],
+        label=request["label"],
+        task=request["task"],
+        origin=request["origin"],
+        status="running",
+    )
+    return await manager._execute(record)
+
+
+def main() -> None:
+    request = json.loads(sys.stdin.readline())
+    try:
+        result = asyncio.run(run(request))
+        emit({"type": "result", "status": "ok", "result": result})
+    except Exception as e:
+        emit({"type": "result", "status": "error", "result": f"Error: {str(e)}"})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,32 @@
 """Base class for agent tools."""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from contextvars import ContextVar
+from typing import Any, Callable
+
+
+class ToolContext:
+    """
+    The chat a context-aware tool acts for, as (channel, chat_id).
+    
+    Kept in a context variable rather than on the tool, so agent turns that
+    run concurrently in separate tasks (cron jobs, the message loop) each see
+    the chat they were set up for.
+    """
+    
+    def __init__(self, name: str, channel: str = "", chat_id: str = ""):
+        self._var: ContextVar[tuple[str, str]] = ContextVar(name, default=(channel, chat_id))
+    
+    def set(self, channel: str, chat_id: str) -> None:
+        self._var.set((channel, chat_id))
+    
+    @property
+    def channel(self) -> str:
+        return self._var.get()[0]
+    
+    @property
+    def chat_id(self) -> str:
+        return self._var.get()[1]
 
 
 class Tool(ABC):
@@ -54,41 +79,80 @@ class Tool(ABC):
 
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """Validate tool parameters against JSON schema. Returns error list (empty if valid)."""
+        validator = self.__dict__.get("_validator") or self.compile_validator()
+        return validator(params)
+
+    def compile_validator(self) -> Callable[[dict[str, Any]], list[str]]:
+        """
+        Compile the parameter schema into a validation closure.
+
+        The schema is walked once here instead of on every call; the result
+        is cached on the tool and used by validate_params().
+        """
         schema = self.parameters or {}
         if schema.get("type", "object") != "object":
             raise ValueError(f"Schema must be object type, got {schema.get('type')!r}")
-        return self._validate(params, {**schema, "type": "object"}, "")
+        check = self._compile({**schema, "type": "object"})
+        self._validator: Callable[[dict[str, Any]], list[str]] = lambda params: check(params, "")
+        return self._validator
 
-    def _validate(self, val: Any, schema: dict[str, Any], path: str) -> list[str]:
-        t, label = schema.get("type"), path or "parameter"
-        if t in self._TYPE_MAP and not isinstance(val, self._TYPE_MAP[t]):
-            return [f"{label} should be {t}"]
-        
-        errors = []
-        if "enum" in schema and val not in schema["enum"]:
-            errors.append(f"{label} must be one of {schema['enum']}")
+    @classmethod
+    def _compile(cls, schema: dict[str, Any]) -> Callable[[Any, str], list[str]]:
+        t = schema.get("type")
+        py_type = cls._TYPE_MAP.get(t) if t else None
+        checks: list[Callable[[Any, str], str | None]] = []
+
+        if "enum" in schema:
+            enum = schema["enum"]
+            checks.append(lambda v, label: f"{label} must be one of {enum}" if v not in enum else None)
         if t in ("integer", "number"):
-            if "minimum" in schema and val < schema["minimum"]:
-                errors.append(f"{label} must be >= {schema['minimum']}")
-            if "maximum" in schema and val > schema["maximum"]:
-                errors.append(f"{label} must be <= {schema['maximum']}")
+            if "minimum" in schema:
+                lo = schema["minimum"]
+                checks.append(lambda v, label: f"{label} must be >= {lo}" if v < lo else None)
+            if "maximum" in schema:
+                hi = schema["maximum"]
+                checks.append(lambda v, label: f"{label} must be <= {hi}" if v > hi else None)
         if t == "string":
-            if "minLength" in schema and len(val) < schema["minLength"]:
-                errors.append(f"{label} must be at least {schema['minLength']} chars")
-            if "maxLength" in schema and len(val) > schema["maxLength"]:
-                errors.append(f"{label} must be at most {schema['maxLength']} chars")
+            if "minLength" in schema:
+                min_len = schema["minLength"]
+                checks.append(
+                    lambda v, label: f"{label} must be at least {min_len} chars" if len(v) < min_len else None
+                )
+            if "maxLength" in schema:
+                max_len = schema["maxLength"]
+                checks.append(
+                    lambda v, label: f"{label} must be at most {max_len} chars" if len(v) > max_len else None
+                )
+
+        props: dict[str, Callable[[Any, str], list[str]]] = {}
+        required: list[str] = []
         if t == "object":
-            props = schema.get("properties", {})
-            for k in schema.get("required", []):
-                if k not in val:
-                    errors.append(f"missing required {path + '.' + k if path else k}")
-            for k, v in val.items():
-                if k in props:
-                    errors.extend(self._validate(v, props[k], path + '.' + k if path else k))
-        if t == "array" and "items" in schema:
-            for i, item in enumerate(val):
-                errors.extend(self._validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
-        return errors
+            props = {k: cls._compile(v) for k, v in schema.get("properties", {}).items()}
+            required = list(schema.get("required", []))
+        items = cls._compile(schema["items"]) if t == "array" and "items" in schema else None
+
+        def check(val: Any, path: str) -> list[str]:
+            label = path or "parameter"
+            if py_type is not None and not isinstance(val, py_type):
+                return [f"{label} should be {t}"]
+
+            errors = []
+            for c in checks:
+                if (err := c(val, label)) is not None:
+                    errors.append(err)
+            if t == "object":
+                for k in required:
+                    if k not in val:
+                        errors.append(f"missing required {path + '.' + k if path else k}")
+                for k, v in val.items():
+                    if k in props:
+                        errors.extend(props[k](v, path + '.' + k if path else k))
+            if items is not None:
+                for i, item in enumerate(val):
+                    errors.extend(items(item, f"{path}[{i}]" if path else f"[{i}]"))
+            return errors
+
+        return check
     
     def to_schema(self) -> dict[str, Any]:
         """Convert tool to OpenAI function schema format."""
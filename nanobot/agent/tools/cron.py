@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
 from nanobot.cron.service import CronService
 from nanobot.cron.types import CronSchedule
 
@@ -12,13 +12,11 @@ class CronTool(Tool):
     
     def __init__(self, cron_service: CronService):
         self._cron = cron_service
-        self._channel = ""
-        self._chat_id = ""
+        self._context = ToolContext("cron_context")
     
     def set_context(self, channel: str, chat_id: str) -> None:
         """Set the current session context for delivery."""
-        self._channel = channel
-        self._chat_id = chat_id
+        self._context.set(channel, chat_id)
     
     @property
     def name(self) -> str:
@@ -26,7 +24,11 @@ class CronTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Schedule reminders and recurring tasks. Actions: add, list, remove."
+        return (
+            "Schedule reminders and recurring tasks. Actions: add, list, remove. "
+            "For cheap periodic checks, set tool/tool_args to call a tool directly without "
+            "an agent turn, and escalate_if to wake the agent only when the result matches."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -50,6 +52,22 @@ class CronTool(Tool):
                     "type": "string",
                     "description": "Cron expression like '0 9 * * *' (for scheduled tasks)"
                 },
+                "tz": {
+                    "type": "string",
+                    "description": "IANA timezone for cron_expr, e.g. 'America/New_York' (default UTC)"
+                },
+                "tool": {
+                    "type": "string",
+                    "description": "Tool to call directly on each run instead of an agent turn (for add)"
+                },
+                "tool_args": {
+                    "type": "object",
+                    "description": "Fixed arguments for tool"
+                },
+                "escalate_if": {
+                    "type": "string",
+                    "description": "Regex; when the tool result matches, run an agent turn with message and the result"
+                },
                 "job_id": {
                     "type": "string",
                     "description": "Job ID (for remove)"
@@ -64,46 +82,71 @@ class CronTool(Tool):
         message: str = "",
         every_seconds: int | None = None,
         cron_expr: str | None = None,
+        tz: str | None = None,
+        tool: str | None = None,
+        tool_args: dict[str, Any] | None = None,
+        escalate_if: str | None = None,
         job_id: str | None = None,
         **kwargs: Any
     ) -> str:
         if action == "add":
-            return self._add_job(message, every_seconds, cron_expr)
+            return self._add_job(message, every_seconds, cron_expr, tz, tool, tool_args, escalate_if)
         elif action == "list":
             return self._list_jobs()
         elif action == "remove":
             return self._remove_job(job_id)
         return f"Unknown action: {action}"
     
-    def _add_job(self, message: str, every_seconds: int | None, cron_expr: str | None) -> str:
-        if not message:
+    def _add_job(
+        self,
+        message: str,
+        every_seconds: int | None,
+        cron_expr: str | None,
+        tz: str | None = None,
+        tool: str | None = None,
+        tool_args: dict[str, Any] | None = None,
+        escalate_if: str | None = None,
+    ) -> str:
+        if not message and not tool:
             return "Error: message is required for add"
-        if not self._channel or not self._chat_id:
+        if escalate_if and not message:
+            return "Error: message is required with escalate_if (it's the escalation prompt)"
+        if not self._context.channel or not self._context.chat_id:
             return "Error: no session context (channel/chat_id)"
         
         # Build schedule
         if every_seconds:
             schedule = CronSchedule(kind="every", every_ms=every_seconds * 1000)
         elif cron_expr:
-            schedule = CronSchedule(kind="cron", expr=cron_expr)
+            schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
         else:
             return "Error: either every_seconds or cron_expr is required"
         
-        job = self._cron.add_job(
-            name=message[:30],
-            schedule=schedule,
-            message=message,
-            deliver=True,
-            channel=self._channel,
-            to=self._chat_id,
-        )
+        try:
+            job = self._cron.add_job(
+                name=message[:30] or tool,
+                schedule=schedule,
+                message=message,
+                deliver=True,
+                channel=self._context.channel,
+                to=self._context.chat_id,
+                tool=tool,
+                tool_args=tool_args,
+                escalate_if=escalate_if,
+            )
+        except ValueError as e:
+            return f"Error: {str(e)}"
         return f"Created job '{job.name}' (id: {job.id})"
     
     def _list_jobs(self) -> str:
         jobs = self._cron.list_jobs()
         if not jobs:
             return "No scheduled jobs."
-        lines = [f"- {j.name} (id: {j.id}, {j.schedule.kind})" for j in jobs]
+        lines = [
+            f"- {j.name} (id: {j.id}, {j.schedule.kind}"
+            + (f", calls {j.payload.tool}" if j.payload.kind == "tool_call" else "") + ")"
+            for j in jobs
+        ]
         return "Scheduled jobs:\n" + "\n".join(lines)
     
     def _remove_job(self, job_id: str | None) -> str:
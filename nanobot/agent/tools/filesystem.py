@@ -1,13 +1,101 @@
 """File system tools: read, write, edit."""
 
+import asyncio
+import bisect
+import mmap
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.helpers import atomic_write, atomic_writer, format_size
+
+# Most bytes of file content a single read returns
+MAX_READ_BYTES = 128 * 1024
+
+# Bytes sniffed for NUL to decide a file is binary
+BINARY_SNIFF_BYTES = 8192
+
+# Distance between line index checkpoints
+LINE_INDEX_STRIDE = 256 * 1024
+
+# Line indexes kept in memory
+LINE_INDEX_CACHE_SIZE = 32
+
+# Files larger than this are edited by streaming instead of in memory
+STREAMING_EDIT_BYTES = 4 * 1024 * 1024
+
+# Read size for streaming edits
+EDIT_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class LineIndex:
+    """
+    Sparse line index of a file.
+    
+    Records the line number at every LINE_INDEX_STRIDE bytes, so line N is
+    found by a bisect plus a scan of at most one stride.
+    """
+    size: int
+    total_lines: int = 0
+    offsets: list[int] = field(default_factory=list)  # checkpoint byte offsets
+    lines: list[int] = field(default_factory=list)  # 0-based line starting at or after each offset
+    
+    @classmethod
+    def build(cls, mm: mmap.mmap) -> "LineIndex":
+        index = cls(size=len(mm))
+        newlines = 0
+        for start in range(0, len(mm), LINE_INDEX_STRIDE):
+            index.offsets.append(start)
+            index.lines.append(newlines)
+            newlines += mm[start:start + LINE_INDEX_STRIDE].count(b"\n")
+        # A final line without a trailing newline still counts
+        index.total_lines = newlines + (1 if len(mm) and mm[-1:] != b"\n" else 0)
+        return index
+    
+    def seek(self, mm: mmap.mmap, line: int) -> int:
+        """Byte offset where 0-based `line` starts."""
+        if line <= 0:
+            return 0
+        # Last checkpoint that lies inside an earlier line
+        i = bisect.bisect_left(self.lines, line) - 1
+        pos, current = self.offsets[i], self.lines[i]
+        # Checkpoints can fall mid-line: move to the start of the next line first
+        if pos > 0 and mm[pos - 1:pos] != b"\n":
+            pos = mm.find(b"\n", pos) + 1 or len(mm)
+            current += 1
+        while current < line and pos < len(mm):
+            pos = mm.find(b"\n", pos) + 1 or len(mm)
+            current += 1
+        return pos
+
+
+_line_indexes: OrderedDict[tuple[str, int, int], LineIndex] = OrderedDict()
+
+
+def _line_index(path: Path, mtime_ns: int, mm: mmap.mmap) -> LineIndex:
+    """Get the cached index for a file version, building it if needed."""
+    key = (str(path), mtime_ns, len(mm))
+    if key in _line_indexes:
+        _line_indexes.move_to_end(key)
+        return _line_indexes[key]
+    index = LineIndex.build(mm)
+    _line_indexes[key] = index
+    while len(_line_indexes) > LINE_INDEX_CACHE_SIZE:
+        _line_indexes.popitem(last=False)
+    return index
 
 
 class ReadFileTool(Tool):
-    """Tool to read file contents."""
+    """
+    Tool to read file contents.
+    
+    Small files are returned whole. Large files and explicit line ranges
+    are served through mmap and a cached sparse line index, and every read
+    is capped at MAX_READ_BYTES with a hint on how to page further.
+    """
     
     @property
     def name(self) -> str:
@@ -15,7 +103,11 @@ class ReadFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Read the contents of a file at the given path."
+        return (
+            "Read the contents of a file at the given path. Large files are returned "
+            "in pages; use offset/limit to read a line range (negative offset reads "
+            "from the end, e.g. -100 for the last 100 lines)."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -25,12 +117,23 @@ class ReadFileTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The file path to read"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "1-based line to start at; negative counts from the end"
+                },
+                "limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of lines to return"
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self, path: str, offset: int | None = None, limit: int | None = None, **kwargs: Any
+    ) -> str:
         try:
             file_path = Path(path).expanduser()
             if not file_path.exists():
@@ -38,16 +141,71 @@ class ReadFileTool(Tool):
             if not file_path.is_file():
                 return f"Error: Not a file: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            return content
+            st = file_path.stat()
+            with open(file_path, "rb") as f:
+                if b"\0" in f.read(BINARY_SNIFF_BYTES):
+                    return f"Error: {path} looks like a binary file ({format_size(st.st_size)})"
+            
+            if offset is None and limit is None and st.st_size <= MAX_READ_BYTES:
+                return file_path.read_text(encoding="utf-8")
+            if st.st_size == 0:
+                return ""
+            
+            return await asyncio.to_thread(self._read_range, file_path, st.st_mtime_ns, offset, limit)
         except PermissionError:
             return f"Error: Permission denied: {path}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
+    
+    @staticmethod
+    def _read_range(path: Path, mtime_ns: int, offset: int | None, limit: int | None) -> str:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = _line_index(path, mtime_ns, mm)
+            total = index.total_lines
+            
+            if offset is None or offset == 0:
+                first = 0
+            elif offset < 0:
+                first = max(0, total + offset)
+            else:
+                first = offset - 1
+            if first >= total:
+                return f"Error: offset {offset} is past the end of the file ({total} lines)"
+            last = min(total, first + limit) if limit else total  # exclusive
+            
+            start = index.seek(mm, first)
+            end = index.seek(mm, last) if last < total else len(mm)
+            truncated = end - start > MAX_READ_BYTES
+            line_cut = False
+            if truncated:
+                # Cut at the last full line that fits
+                cut = mm.rfind(b"\n", start, start + MAX_READ_BYTES)
+                if cut >= start:
+                    end = cut + 1
+                    last = first + mm[start:end].count(b"\n")
+                else:
+                    # A single line longer than the cap: show its start and page past it
+                    end = start + MAX_READ_BYTES
+                    last = first + 1
+                    line_cut = True
+            content = mm[start:end].decode("utf-8", errors="replace")
+        
+        if first == 0 and last >= total and not truncated:
+            return content
+        shown = f"lines {first + 1}-{max(first + 1, last)} of {total}"
+        hint = f"; use offset={last + 1} to continue" if last < total else ""
+        cap = f", output capped at {format_size(MAX_READ_BYTES)}" if truncated else ""
+        if line_cut:
+            cap = f", line {first + 1} cut at {format_size(MAX_READ_BYTES)}"
+        sep = "" if content.endswith("\n") else "\n"
+        return f"{content}{sep}[{shown} ({format_size(index.size)} file{cap}){hint}]"
 
 
 class WriteFileTool(Tool):
-    """Tool to write content to a file."""
+    """Tool to write content to a file (atomically, via temp file and rename)."""
+    
+    def __init__(self, fsync: bool = False):
+        self.fsync = fsync
     
     @property
     def name(self) -> str:
@@ -77,8 +235,7 @@ class WriteFileTool(Tool):
     async def execute(self, path: str, content: str, **kwargs: Any) -> str:
         try:
             file_path = Path(path).expanduser()
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
+            atomic_write(file_path, content, fsync=self.fsync)
             return f"Successfully wrote {len(content)} bytes to {path}"
         except PermissionError:
             return f"Error: Permission denied: {path}"
@@ -86,8 +243,58 @@ class WriteFileTool(Tool):
             return f"Error writing file: {str(e)}"
 
 
+class EditError(Exception):
+    """An edit that can't be applied; the message is returned to the agent."""
+
+
+def _locate_in_memory(data: bytes, needle: bytes) -> tuple[int, int]:
+    """(count, first position) of non-overlapping occurrences."""
+    return data.count(needle), data.find(needle)
+
+
+def _locate_streaming(path: Path, needles: list[bytes]) -> list[tuple[int, int]]:
+    """
+    (count, first position) per needle, reading the file in chunks.
+    
+    Consecutive chunks overlap by the longest needle minus one byte so
+    matches across a chunk boundary are found; counting stops at 2 since
+    only uniqueness matters.
+    """
+    overlap = max(len(n) for n in needles) - 1
+    counts = [0] * len(needles)
+    first = [-1] * len(needles)
+    next_from = [0] * len(needles)  # absolute offset to resume each needle's search
+    carry = b""
+    base = 0  # absolute offset of carry[0]
+    with open(path, "rb") as f:
+        while chunk := f.read(EDIT_CHUNK_BYTES):
+            data = carry + chunk
+            for i, needle in enumerate(needles):
+                while counts[i] < 2:
+                    pos = data.find(needle, max(0, next_from[i] - base))
+                    if pos == -1:
+                        break
+                    counts[i] += 1
+                    if first[i] == -1:
+                        first[i] = base + pos
+                    next_from[i] = base + pos + len(needle)
+            carry = data[-overlap:] if overlap else b""
+            base += len(data) - len(carry)
+    return list(zip(counts, first))
+
+
 class EditFileTool(Tool):
-    """Tool to edit a file by replacing text."""
+    """
+    Tool to edit a file by replacing text.
+    
+    Several edits can be applied in one call with a single read and a
+    single atomic write. Files over STREAMING_EDIT_BYTES are never loaded
+    whole: one pass locates the edits, a second copies the file into the
+    temp file with the replacements spliced in.
+    """
+    
+    def __init__(self, fsync: bool = False):
+        self.fsync = fsync
     
     @property
     def name(self) -> str:
@@ -95,7 +302,11 @@ class EditFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Edit a file by replacing old_text with new_text. The old_text must exist exactly in the file."
+        return (
+            "Edit a file by replacing old_text with new_text. The old_text must exist exactly "
+            "once in the file. To make several changes at once, pass `edits` instead; each "
+            "is matched against the original file and they must not overlap."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -113,35 +324,128 @@ class EditFileTool(Tool):
                 "new_text": {
                     "type": "string",
                     "description": "The text to replace with"
+                },
+                "edits": {
+                    "type": "array",
+                    "description": "Several replacements applied together",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_text": {"type": "string"},
+                            "new_text": {"type": "string"}
+                        },
+                        "required": ["old_text", "new_text"]
+                    }
                 }
             },
-            "required": ["path", "old_text", "new_text"]
+            "required": ["path"]
         }
     
-    async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        old_text: str | None = None,
+        new_text: str | None = None,
+        edits: list[dict[str, str]] | None = None,
+        **kwargs: Any,
+    ) -> str:
+        if edits is None:
+            if old_text is None or new_text is None:
+                return "Error: provide old_text and new_text, or edits"
+            edits = [{"old_text": old_text, "new_text": new_text}]
+        elif not edits:
+            return "Error: edits is empty"
+        
         try:
             file_path = Path(path).expanduser()
             if not file_path.exists():
                 return f"Error: File not found: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            
-            if old_text not in content:
-                return f"Error: old_text not found in file. Make sure it matches exactly."
-            
-            # Count occurrences
-            count = content.count(old_text)
-            if count > 1:
-                return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
-            
-            new_content = content.replace(old_text, new_text, 1)
-            file_path.write_text(new_content, encoding="utf-8")
-            
-            return f"Successfully edited {path}"
+            await asyncio.to_thread(self._apply, file_path, edits)
+            if len(edits) == 1:
+                return f"Successfully edited {path}"
+            return f"Successfully applied {len(edits)} edits to {path}"
+        except EditError as e:
+            return str(e)
         except PermissionError:
             return f"Error: Permission denied: {path}"
         except Exception as e:
             return f"Error editing file: {str(e)}"
+    
+    def _apply(self, path: Path, edits: list[dict[str, str]]) -> None:
+        size = path.stat().st_size
+        streaming = size > STREAMING_EDIT_BYTES
+        
+        if streaming:
+            with open(path, "rb") as f:
+                crlf = b"\r\n" in f.read(EDIT_CHUNK_BYTES)
+            data = b""
+        else:
+            data = path.read_bytes()
+            crlf = b"\r\n" in data
+        
+        olds, news = [], []
+        for edit in edits:
+            old, new = edit["old_text"], edit["new_text"]
+            if crlf and "\r\n" not in old:
+                # The file uses CRLF; the agent almost certainly wrote LF
+                old, new = old.replace("\n", "\r\n"), new.replace("\n", "\r\n")
+            if not old:
+                raise EditError("Error: old_text must not be empty")
+            olds.append(old.encode("utf-8"))
+            news.append(new.encode("utf-8"))
+        
+        if streaming:
+            located = _locate_streaming(path, olds)
+        else:
+            located = [_locate_in_memory(data, old) for old in olds]
+        
+        splices = []
+        for i, ((count, pos), old, new) in enumerate(zip(located, olds, news)):
+            where = f"edits[{i}]: " if len(edits) > 1 else ""
+            if count == 0:
+                raise EditError(f"Error: {where}old_text not found in file. Make sure it matches exactly.")
+            if count > 1:
+                raise EditError(
+                    f"Warning: {where}old_text appears {count}{'+' if streaming else ''} times. "
+                    "Please provide more context to make it unique."
+                )
+            splices.append((pos, pos + len(old), new))
+        
+        splices.sort()
+        for (_, end, _), (start, _, _) in zip(splices, splices[1:]):
+            if start < end:
+                raise EditError("Error: edits overlap; merge them into one edit")
+        
+        with atomic_writer(path, fsync=self.fsync) as out:
+            if not streaming:
+                cur = 0
+                for start, end, new in splices:
+                    out.write(data[cur:start])
+                    out.write(new)
+                    cur = end
+                out.write(data[cur:])
+                return
+            
+            with open(path, "rb") as src:
+                cur = 0
+                for start, end, new in splices:
+                    self._copy(src, out, start - cur)
+                    out.write(new)
+                    src.seek(end)
+                    cur = end
+                self._copy(src, out, None)
+    
+    @staticmethod
+    def _copy(src: Any, out: Any, length: int | None) -> None:
+        """Copy `length` bytes (or the rest) from src to out in chunks."""
+        while length is None or length > 0:
+            chunk = src.read(EDIT_CHUNK_BYTES if length is None else min(EDIT_CHUNK_BYTES, length))
+            if not chunk:
+                return
+            out.write(chunk)
+            if length is not None:
+                length -= len(chunk)
 
 
 class ListDirTool(Tool):
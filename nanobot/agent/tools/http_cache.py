@@ -0,0 +1,146 @@
+"""Disk-backed HTTP cache for web_fetch honoring ETag, Last-Modified and Cache-Control."""
+
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping
+
+from loguru import logger
+
+from nanobot.utils.disk_lru import DiskLRU
+
+# Response headers kept with a cached entry
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires", "date")
+
+
+@dataclass
+class CachedResponse:
+    """A stored response and what's needed to decide whether it's still fresh."""
+    url: str
+    final_url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    stored_at: float
+    max_age: float | None  # None: no explicit freshness, always revalidate
+
+    @property
+    def fresh(self) -> bool:
+        return self.max_age is not None and time.time() - self.stored_at < self.max_age
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if etag := self.headers.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+
+def _cache_control(headers: Mapping[str, str]) -> dict[str, str]:
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def freshness(headers: Mapping[str, str]) -> tuple[bool, float | None]:
+    """
+    (storable, max_age seconds) for a response.
+
+    no-store responses aren't stored; no-cache ones are stored but always
+    revalidated. Freshness comes from max-age/s-maxage, then Expires.
+    """
+    directives = _cache_control(headers)
+    if "no-store" in directives or headers.get("vary", "").strip() == "*":
+        return False, None
+    if "no-cache" in directives:
+        return True, None
+    for name in ("s-maxage", "max-age"):
+        if name in directives and re.fullmatch(r"\d+", directives[name]):
+            return True, float(directives[name])
+    if expires := headers.get("expires"):
+        try:
+            date = parsedate_to_datetime(headers["date"]).timestamp() if headers.get("date") else time.time()
+            return True, max(0.0, parsedate_to_datetime(expires).timestamp() - date)
+        except (TypeError, ValueError, KeyError):
+            return True, 0.0
+    return True, None
+
+
+class HttpCache:
+    """
+    LRU cache of GET responses on disk under a byte budget.
+
+    Each entry is one file: a JSON header line followed by the raw body.
+    Stale entries with an ETag or Last-Modified are kept so they can be
+    revalidated with a conditional request instead of re-downloaded.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024):
+        self.store = DiskLRU(directory, ".http", max_bytes)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Get the stored response for a URL, fresh or not."""
+        key = self._key(url)
+        if key not in self.store:
+            return None
+        try:
+            with open(self.store.path(key), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            self.store.drop(key)
+            return None
+        self.store.touch(key)
+        return CachedResponse(body=body, **meta)
+
+    def put(
+        self, url: str, final_url: str, status: int, headers: Mapping[str, str], body: bytes
+    ) -> None:
+        """Store a complete 200 response if its headers allow it."""
+        storable, max_age = freshness(headers)
+        if not storable or status != 200:
+            return
+        if max_age is None and not ("etag" in headers or "last-modified" in headers):
+            return  # Could never be served without a full refetch
+        kept = {name: headers[name] for name in _KEPT_HEADERS if name in headers}
+        self._write(CachedResponse(url, final_url, status, kept, body, time.time(), max_age))
+
+    def revalidated(self, entry: CachedResponse, headers: Mapping[str, str]) -> None:
+        """Refresh an entry after a 304 Not Modified."""
+        for name in _KEPT_HEADERS:
+            if name in headers:
+                entry.headers[name] = headers[name]
+        _, entry.max_age = freshness(entry.headers)
+        entry.stored_at = time.time()
+        self._write(entry)
+
+    def _write(self, entry: CachedResponse) -> None:
+        meta = {
+            "url": entry.url,
+            "final_url": entry.final_url,
+            "status": entry.status,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+            "max_age": entry.max_age,
+        }
+        data = json.dumps(meta).encode("utf-8") + b"\n" + entry.body
+        try:
+            self.store.write(self._key(entry.url), data)
+        except OSError as e:
+            logger.warning(f"HTTP cache write failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self.store)
@@ -2,7 +2,7 @@
 
 from typing import Any, Callable, Awaitable
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
 from nanobot.bus.events import OutboundMessage
 
 
@@ -16,13 +16,11 @@ class MessageTool(Tool):
         default_chat_id: str = ""
     ):
         self._send_callback = send_callback
-        self._default_channel = default_channel
-        self._default_chat_id = default_chat_id
+        self._context = ToolContext("message_context", default_channel, default_chat_id)
     
     def set_context(self, channel: str, chat_id: str) -> None:
         """Set the current message context."""
-        self._default_channel = channel
-        self._default_chat_id = chat_id
+        self._context.set(channel, chat_id)
     
     def set_send_callback(self, callback: Callable[[OutboundMessage], Awaitable[None]]) -> None:
         """Set the callback for sending messages."""
@@ -64,8 +62,8 @@ class MessageTool(Tool):
         chat_id: str | None = None,
         **kwargs: Any
     ) -> str:
-        channel = channel or self._default_channel
-        chat_id = chat_id or self._default_chat_id
+        channel = channel or self._context.channel
+        chat_id = chat_id or self._context.chat_id
         
         if not channel or not chat_id:
             return "Error: No target channel/chat specified"
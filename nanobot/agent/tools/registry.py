@@ -9,19 +9,30 @@ class ToolRegistry:
     """
     Registry for agent tools.
     
-    Allows dynamic registration and execution of tools.
+    Allows dynamic registration and execution of tools. Tool definitions
+    are built once and reused until the set of tools changes; `version`
+    is bumped on every register/unregister.
     """
     
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._definitions: list[dict[str, Any]] | None = None
+        self.version = 0
     
     def register(self, tool: Tool) -> None:
-        """Register a tool."""
+        """Register a tool, compiling its parameter validator."""
+        tool.compile_validator()
         self._tools[tool.name] = tool
+        self._changed()
     
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
-        self._tools.pop(name, None)
+        if self._tools.pop(name, None) is not None:
+            self._changed()
+    
+    def _changed(self) -> None:
+        self.version += 1
+        self._definitions = None
     
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -32,8 +43,15 @@ class ToolRegistry:
         return name in self._tools
     
     def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+        """
+        Get all tool definitions in OpenAI format.
+
+        Sorted by name so the list is byte-identical across calls, which keeps
+        provider-side prompt caches warm. The list is shared; don't mutate it.
+        """
+        if self._definitions is None:
+            self._definitions = [self._tools[name].to_schema() for name in sorted(self._tools)]
+        return self._definitions
     
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
@@ -0,0 +1,333 @@
+"""Search tool: grep over the workspace, optionally backed by a trigram index."""
+
+import asyncio
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+
+# Directories never worth searching
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", "dist", "build",
+}
+
+# Files searched per worker thread batch
+BATCH_SIZE = 64
+
+# Matching lines are cut to this many characters
+MAX_LINE_CHARS = 300
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+# Group openers whose contents are matched like a plain group
+_GROUP_HEADER_RE = re.compile(r"\(\?(?::|P<\w+>)")
+
+
+def _walk(root: Path, glob: str | None) -> list[Path]:
+    """Files under root, skipping vendored/cache directories and hidden dirs."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if glob:
+                rel = os.path.relpath(os.path.join(dirpath, name), root)
+                if not (fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(rel, glob)):
+                    continue
+            files.append(Path(dirpath) / name)
+    return files
+
+
+def _read_text(path: Path, max_bytes: int) -> str | None:
+    """File contents, or None for binary, oversized or unreadable files."""
+    try:
+        if path.stat().st_size > max_bytes:
+            return None
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def _trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> list[str]:
+    """
+    Literal runs every match of a regex must contain.
+
+    Conservative: alternation or anything not understood yields no
+    literals, which disables index filtering for that query.
+    """
+    if "|" in pattern.replace("\\|", "") or re.search(r"\)[?*{]", pattern):
+        return []
+    runs: list[str] = []
+    current = ""
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        nxt = pattern[i + 1] if i + 1 < len(pattern) else ""
+        if ch == "\\" and nxt and not nxt.isalnum():
+            literal, step = nxt, 2
+        elif ch in _REGEX_META:
+            if ch == "[":
+                # Skip a character class entirely
+                end = pattern.find("]", i + 2)
+                i = end + 1 if end != -1 else len(pattern)
+            elif ch == "{":
+                # Skip a {m,n} quantifier
+                end = pattern.find("}", i)
+                i = end + 1 if end != -1 else len(pattern)
+            elif ch == "(" and nxt == "?":
+                header = _GROUP_HEADER_RE.match(pattern, i)
+                if not header:
+                    return []  # Lookaround, conditional, inline flags, ...
+                i = header.end()
+            elif ch == "\\":
+                i += 2  # \d, \w, \b, ...
+            else:
+                i += 1
+            runs.append(current)
+            current = ""
+            continue
+        else:
+            literal, step = ch, 1
+        # A quantifier after a character makes it optional or repeated
+        after = pattern[i + step] if i + step < len(pattern) else ""
+        if after in ("?", "*", "{"):
+            runs.append(current)
+            current = ""
+        else:
+            current += literal
+        i += step
+    runs.append(current)
+    return [r for r in runs if len(r) >= 3]
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index of the text files under a root.
+
+    refresh() re-reads only files whose mtime or size changed since the
+    last refresh, so repeated searches over a large workspace pay for a
+    directory walk and stat() calls, not for reading every file.
+    """
+
+    def __init__(self, root: Path, max_file_bytes: int):
+        self.root = root
+        self.max_file_bytes = max_file_bytes
+        self._files: dict[Path, tuple[int, int, set[str]]] = {}  # path -> (mtime_ns, size, trigrams)
+        self._postings: dict[str, set[Path]] = {}
+
+    def refresh(self) -> None:
+        seen = set()
+        for path in _walk(self.root, None):
+            seen.add(path)
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            known = self._files.get(path)
+            if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+                continue
+            self._remove(path)
+            text = _read_text(path, self.max_file_bytes)
+            grams = _trigrams(text) if text is not None else set()
+            self._files[path] = (st.st_mtime_ns, st.st_size, grams)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(path)
+        for path in set(self._files) - seen:
+            self._remove(path)
+
+    def _remove(self, path: Path) -> None:
+        known = self._files.pop(path, None)
+        if not known:
+            return
+        for gram in known[2]:
+            paths = self._postings.get(gram)
+            if paths:
+                paths.discard(path)
+                if not paths:
+                    del self._postings[gram]
+
+    def candidates(self, literals: list[str]) -> set[Path] | None:
+        """Files that may contain all literals, or None if nothing can be ruled out."""
+        grams = set()
+        for literal in literals:
+            grams |= _trigrams(literal)
+        if not grams:
+            return None
+        result: set[Path] | None = None
+        for gram in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+            paths = self._postings.get(gram, set())
+            result = set(paths) if result is None else result & paths
+            if not result:
+                break
+        return result or set()
+
+
+class SearchTool(Tool):
+    """
+    Tool to search file contents by regex or literal text.
+
+    Files are searched in parallel worker threads. With `use_index`, a
+    trigram index of the workspace narrows each search to files that can
+    possibly match.
+    """
+
+    def __init__(
+        self,
+        workspace: Path,
+        use_index: bool = False,
+        max_file_bytes: int = 2 * 1024 * 1024,
+        max_results: int = 100,
+    ):
+        self.workspace = workspace
+        self.max_file_bytes = max_file_bytes
+        self.max_results = max_results
+        self._index = TrigramIndex(workspace, max_file_bytes) if use_index else None
+        self._index_lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return "search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search file contents under a directory (default: the workspace) for a "
+            "regex or literal string. Returns matching lines as path:line: text."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "Regular expression (or literal text with literal=true)"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Directory to search (default: workspace)"
+                },
+                "glob": {
+                    "type": "string",
+                    "description": "Only search files matching this glob, e.g. '*.py' or 'src/**/*.ts'"
+                },
+                "literal": {
+                    "type": "boolean",
+                    "description": "Treat pattern as plain text"
+                },
+                "ignore_case": {
+                    "type": "boolean",
+                    "description": "Case-insensitive matching"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 1000,
+                    "description": "Maximum matching lines to return (default 100)"
+                }
+            },
+            "required": ["pattern"]
+        }
+
+    async def execute(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        literal: bool = False,
+        ignore_case: bool = False,
+        max_results: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        root = Path(path).expanduser() if path else self.workspace
+        if not root.is_dir():
+            return f"Error: Directory not found: {path}"
+        try:
+            regex = re.compile(
+                re.escape(pattern) if literal else pattern,
+                re.IGNORECASE if ignore_case else 0,
+            )
+        except re.error as e:
+            return f"Error: Invalid regex: {e}"
+        limit = max_results or self.max_results
+
+        try:
+            files = await self._candidate_files(root, glob, [pattern] if literal else required_literals(pattern))
+            matches, scanned = await self._search(files, regex, limit, root)
+        except Exception as e:
+            return f"Error searching: {str(e)}"
+
+        if not matches:
+            return f"No matches for '{pattern}' ({scanned} files searched)"
+        lines = [f"{rel}:{lineno}: {text}" for rel, lineno, text in matches[:limit]]
+        if len(matches) > limit:
+            lines.append(f"... (stopped after {limit} matches; narrow the pattern or glob)")
+        return "\n".join(lines)
+
+    async def _candidate_files(self, root: Path, glob: str | None, literals: list[str]) -> list[Path]:
+        files = await asyncio.to_thread(_walk, root, glob)
+        if not self._index or not root.resolve().is_relative_to(self.workspace.resolve()):
+            return files
+        async with self._index_lock:
+            await asyncio.to_thread(self._index.refresh)
+            candidates = self._index.candidates(literals)
+        if candidates is None:
+            return files
+        return [f for f in files if f in candidates]
+
+    async def _search(
+        self, files: list[Path], regex: re.Pattern, limit: int, root: Path
+    ) -> tuple[list[tuple[str, int, str]], int]:
+        """Search files in worker threads; returns matches in file order and files scanned."""
+        stop = asyncio.Event()
+        batches = [files[i:i + BATCH_SIZE] for i in range(0, len(files), BATCH_SIZE)]
+
+        def search_batch(batch: list[Path]) -> list[tuple[str, int, str]]:
+            found: list[tuple[str, int, str]] = []
+            for file in batch:
+                if stop.is_set() or len(found) > limit:
+                    break
+                text = _read_text(file, self.max_file_bytes)
+                if text is None or not regex.search(text):
+                    continue
+                rel = os.path.relpath(file, root)
+                for lineno, line in enumerate(text.splitlines(), 1):
+                    if regex.search(line):
+                        found.append((rel, lineno, line.strip()[:MAX_LINE_CHARS]))
+                        if len(found) > limit:
+                            break
+            return found
+
+        # Bounded fan-out so one search doesn't monopolise the default executor
+        workers = asyncio.Semaphore(min(8, (os.cpu_count() or 2)))
+
+        found_total = 0
+
+        async def run(batch: list[Path]) -> list[tuple[str, int, str]]:
+            nonlocal found_total
+            async with workers:
+                if stop.is_set():
+                    return []
+                found = await asyncio.to_thread(search_batch, batch)
+            found_total += len(found)
+            if found_total > limit:
+                stop.set()
+            return found
+
+        matches: list[tuple[str, int, str]] = []
+        for found in await asyncio.gather(*(run(b) for b in batches)):
+            matches.extend(found)
+        return matches, len(files)
@@ -3,14 +3,164 @@
 import asyncio
 import os
 import re
+import shlex
+import signal
+import time
+import uuid
 from pathlib import Path
-from typing import Any
+from typing import IO, TYPE_CHECKING, Any, Awaitable, Callable
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
+from nanobot.bus.events import OutboundMessage
+from nanobot.utils.helpers import format_size, get_data_path
+
+if TYPE_CHECKING:
+    from nanobot.agent.tools.shell_session import ShellSessionPool
+
+# Spill files kept per directory; older ones are pruned
+MAX_SPILL_FILES = 50
+
+# Spill files stop growing past this size
+MAX_SPILL_BYTES = 256 * 1024 * 1024
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a shell started in its own session together with its children."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class OutputCapture:
+    """
+    Bounded capture of one process stream.
+    
+    Keeps the first `head_bytes` and the last `tail_bytes` in memory. Once
+    the stream outgrows both, everything (including what was already
+    captured) goes to a spill file so the full output stays available
+    without holding it in memory.
+    """
+    
+    def __init__(self, head_bytes: int, tail_bytes: int, spill_path: Path | None = None):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_path = spill_path
+        self.total = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill: IO[bytes] | None = None
+        self._spilled = 0
+    
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        if len(self._head) < self.head_bytes:
+            take = self.head_bytes - len(self._head)
+            self._head += data[:take]
+            rest = data[take:]
+        else:
+            rest = data
+        if not rest:
+            return
+        
+        if self._spill is None and self.spill_path and self.total > self.head_bytes + self.tail_bytes:
+            self._open_spill()
+        if self._spill is not None:
+            self._write_spill(rest)
+        
+        self._tail += rest
+        if len(self._tail) > self.tail_bytes:
+            del self._tail[:len(self._tail) - self.tail_bytes]
+    
+    def _open_spill(self) -> None:
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            _prune_spill_dir(self.spill_path.parent)
+            self._spill = open(self.spill_path, "wb")
+        except OSError:
+            self.spill_path = None
+            return
+        # Nothing has been dropped yet: head + tail is the stream so far
+        self._write_spill(bytes(self._head) + bytes(self._tail))
+    
+    def _write_spill(self, data: bytes) -> None:
+        room = MAX_SPILL_BYTES - self._spilled
+        if room <= 0:
+            return
+        chunk = data[:room]
+        try:
+            self._spill.write(chunk)
+            self._spilled += len(chunk)
+        except OSError:
+            pass
+    
+    @property
+    def omitted(self) -> int:
+        """Bytes not held in memory."""
+        return self.total - len(self._head) - len(self._tail)
+    
+    def text(self) -> str:
+        """Decoded output with a marker where bytes were omitted."""
+        head = self._head.decode("utf-8", errors="replace")
+        if self.omitted <= 0:
+            return head + self._tail.decode("utf-8", errors="replace")
+        
+        where = ""
+        if self.spill_path:
+            where = f"; full output in {self.spill_path}"
+            if self._spilled < self.total:
+                where += f" (first {format_size(self._spilled)})"
+        tail = self._tail.decode("utf-8", errors="replace")
+        return f"{head}\n... ({self.omitted} bytes omitted{where}) ...\n{tail}"
+    
+    def last_line(self) -> str:
+        """Last non-empty line seen so far."""
+        buf = self._tail or self._head
+        for line in reversed(buf.decode("utf-8", errors="replace").splitlines()):
+            if line.strip():
+                return line.strip()
+        return ""
+    
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+def _prune_spill_dir(directory: Path) -> None:
+    """Keep only the most recent spill files."""
+    try:
+        files = sorted(directory.glob("*.log"), key=lambda p: p.stat().st_mtime)
+    except OSError:
+        return
+    for old in files[:-MAX_SPILL_FILES]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
 
 
 class ExecTool(Tool):
-    """Tool to execute shell commands."""
+    """
+    Tool to execute shell commands.
+    
+    Output is captured incrementally with a bounded head and tail per
+    stream; anything beyond that is written to a spill file the agent can
+    page through with read_file. Long-running commands send periodic
+    progress updates to the current chat when a send callback is set.
+    
+    With a session pool, commands run in a persistent shell per chat, so
+    cwd, environment variables and activated virtualenvs carry over from
+    one call to the next.
+    """
+    
+    STDOUT_HEAD_BYTES = 4000
+    STDOUT_TAIL_BYTES = 6000
+    STDERR_HEAD_BYTES = 1000
+    STDERR_TAIL_BYTES = 3000
     
     def __init__(
         self,
@@ -19,9 +169,18 @@ class ExecTool(Tool):
         deny_patterns: list[str] | None = None,
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
+        send_callback: Callable[[OutboundMessage], Awaitable[None]] | None = None,
+        progress_interval: int = 0,
+        spill_dir: Path | None = None,
+        session_pool: "ShellSessionPool | None" = None,
     ):
         self.timeout = timeout
         self.working_dir = working_dir
+        self.progress_interval = progress_interval
+        self.spill_dir = spill_dir if spill_dir is not None else get_data_path() / "exec"
+        self._send_callback = send_callback
+        self.session_pool = session_pool
+        self._context = ToolContext("exec_context")
         self.deny_patterns = deny_patterns or [
             r"\brm\s+-[rf]{1,2}\b",          # rm -r, rm -rf, rm -fr
             r"\bdel\s+/[fq]\b",              # del /f, del /q
@@ -35,6 +194,10 @@ class ExecTool(Tool):
         self.allow_patterns = allow_patterns or []
         self.restrict_to_workspace = restrict_to_workspace
     
+    def set_context(self, channel: str, chat_id: str) -> None:
+        """Set the chat that receives progress updates."""
+        self._context.set(channel, chat_id)
+    
     @property
     def name(self) -> str:
         return "exec"
@@ -66,47 +229,151 @@ class ExecTool(Tool):
         if guard_error:
             return guard_error
         
+        spill_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        stdout = OutputCapture(
+            self.STDOUT_HEAD_BYTES, self.STDOUT_TAIL_BYTES, self._spill_path(spill_id, "stdout")
+        )
+        stderr = OutputCapture(
+            self.STDERR_HEAD_BYTES, self.STDERR_TAIL_BYTES, self._spill_path(spill_id, "stderr")
+        )
+        progress: asyncio.Task | None = None
+        process: asyncio.subprocess.Process | None = None
+        
+        if self.session_pool:
+            try:
+                return await self._execute_persistent(command, working_dir, cwd, stdout)
+            finally:
+                stdout.close()
+                stderr.close()
+        
         try:
             process = await asyncio.create_subprocess_shell(
                 command,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
+                start_new_session=True,
             )
             
+            if self._send_callback and self._context.channel and self._context.chat_id and self.progress_interval > 0:
+                progress = asyncio.create_task(self._report_progress(command, stdout, stderr))
+            
+            timed_out = False
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._pump(process.stdout, stdout),
+                        self._pump(process.stderr, stderr),
+                        process.wait(),
+                    ),
                     timeout=self.timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
-                return f"Error: Command timed out after {self.timeout} seconds"
+                timed_out = True
+                _kill_process_group(process)
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
             
             output_parts = []
             
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
+            if timed_out:
+                output_parts.append(f"Error: Command timed out after {self.timeout} seconds")
             
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
+            if stdout.total:
+                output_parts.append(stdout.text())
+            
+            if stderr.total:
+                stderr_text = stderr.text()
                 if stderr_text.strip():
                     output_parts.append(f"STDERR:\n{stderr_text}")
             
-            if process.returncode != 0:
+            if not timed_out and process.returncode != 0:
                 output_parts.append(f"\nExit code: {process.returncode}")
             
-            result = "\n".join(output_parts) if output_parts else "(no output)"
-            
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
-            
-            return result
+            return "\n".join(output_parts) if output_parts else "(no output)"
             
         except Exception as e:
             return f"Error executing command: {str(e)}"
+        finally:
+            if progress:
+                progress.cancel()
+            if process and process.returncode is None:
+                # Cancelled mid-run: the group is detached, so it would outlive the turn.
+                _kill_process_group(process)
+            stdout.close()
+            stderr.close()
+
+    async def _execute_persistent(
+        self, command: str, working_dir: str | None, cwd: str, output: "OutputCapture"
+    ) -> str:
+        """Run a command in this chat's persistent shell (stdout and stderr merged)."""
+        key = f"{self._context.channel}:{self._context.chat_id}" if self._context.channel else "default"
+        if working_dir or self.restrict_to_workspace:
+            # The shell keeps the cwd of earlier commands; when restricted, start
+            # every command in the directory the guard checked against
+            command = f"cd -- {shlex.quote(cwd)} && {command}"
+        
+        progress: asyncio.Task | None = None
+        try:
+            session = await self.session_pool.get(key, self.working_dir or os.getcwd())
+            if self._send_callback and self._context.channel and self._context.chat_id and self.progress_interval > 0:
+                progress = asyncio.create_task(
+                    self._report_progress(command, output, OutputCapture(0, 0))
+                )
+            exit_code = await session.run(command, self.timeout, output)
+        except Exception as e:
+            return f"Error executing command: {str(e)}"
+        finally:
+            if progress:
+                progress.cancel()
+        
+        output_parts = []
+        if exit_code is None:
+            state = "interrupted" if session.alive else "shell session restarted"
+            output_parts.append(f"Error: Command timed out after {self.timeout} seconds ({state})")
+        if output.total:
+            output_parts.append(output.text())
+        if exit_code:
+            output_parts.append(f"\nExit code: {exit_code}")
+        
+        return "\n".join(output_parts) if output_parts else "(no output)"
+
+    @staticmethod
+    async def _pump(stream: asyncio.StreamReader | None, capture: "OutputCapture") -> None:
+        """Copy a process stream into a capture chunk by chunk."""
+        if stream is None:
+            return
+        while chunk := await stream.read(64 * 1024):
+            capture.feed(chunk)
+
+    async def _report_progress(
+        self, command: str, stdout: "OutputCapture", stderr: "OutputCapture"
+    ) -> None:
+        """Periodically tell the user a long-running command is still going."""
+        start = time.monotonic()
+        label = command if len(command) <= 60 else command[:57] + "..."
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            elapsed = int(time.monotonic() - start)
+            size = stdout.total + stderr.total
+            lines = [f"⏳ Still running ({elapsed}s, {format_size(size)} output): `{label}`"]
+            if last := stdout.last_line() or stderr.last_line():
+                lines.append(last[:200])
+            try:
+                await self._send_callback(OutboundMessage(
+                    channel=self._context.channel,
+                    chat_id=self._context.chat_id,
+                    content="\n".join(lines),
+                ))
+            except Exception:
+                return
+
+    def _spill_path(self, spill_id: str, stream: str) -> Path | None:
+        if not self.spill_dir:
+            return None
+        return self.spill_dir / f"{spill_id}.{stream}.log"
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
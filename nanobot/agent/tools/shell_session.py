@@ -0,0 +1,258 @@
+"""Persistent PTY-backed shell sessions for the exec tool (POSIX only)."""
+
+import asyncio
+import fcntl
+import os
+import pty
+import re
+import signal
+import termios
+import time
+import uuid
+
+from loguru import logger
+
+from nanobot.agent.tools.shell import OutputCapture
+
+# Output held back from the capture so a sentinel split across reads is still matched
+_SENTINEL_MARGIN = 64
+
+
+def _sentinel_command(token: str) -> str:
+    # Quoted pieces so the typed line itself can never match the sentinel pattern
+    return f"printf '\\n%s%d%s\\n' '__NB_' \"$__nb_rc\" '_{token}__'\n"
+
+
+def _acquire_controlling_tty() -> None:
+    """Runs in the child after setsid(): make the PTY its controlling terminal."""
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class ShellSession:
+    """
+    A long-lived interactive bash on a pseudo-terminal.
+
+    Environment, cwd, activated virtualenvs and shell functions persist
+    between commands. Each command is followed by a printf of a random
+    sentinel carrying its exit code, which is how the end of its output is
+    found. stdin of each command is /dev/null so it cannot swallow the
+    sentinel line.
+    """
+
+    def __init__(self, key: str, cwd: str, shell: str = "/bin/bash"):
+        self.key = key
+        self.cwd = cwd
+        self.shell = shell
+        self.last_used = time.monotonic()
+        self._proc: asyncio.subprocess.Process | None = None
+        self._master: int | None = None
+        self._buffer = bytearray()
+        self._data = asyncio.Event()
+        self._eof = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None and not self._eof
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def start(self) -> None:
+        master, slave = pty.openpty()
+        env = {**os.environ, "TERM": "dumb", "PS1": "", "PS2": "", "HISTFILE": ""}
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                self.shell, "--noprofile", "--norc", "--noediting", "-i",
+                stdin=slave, stdout=slave, stderr=slave,
+                cwd=self.cwd,
+                env=env,
+                start_new_session=True,
+                preexec_fn=_acquire_controlling_tty,
+            )
+        finally:
+            os.close(slave)
+
+        self._master = master
+        os.set_blocking(master, False)
+        asyncio.get_running_loop().add_reader(master, self._on_readable)
+
+        # No echo, no CR/LF translation, no 4 KB canonical line limit
+        await self._write("stty -echo -onlcr -icanon 2>/dev/null; PS1=''; PS2=''; unset PROMPT_COMMAND\n")
+        if not await self._sync(timeout=10):
+            self.close()
+            raise RuntimeError("shell session did not start")
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._master, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._eof = True
+            asyncio.get_running_loop().remove_reader(self._master)
+        else:
+            self._buffer += data
+        self._data.set()
+
+    async def _write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        while data:
+            try:
+                n = os.write(self._master, data)
+            except BlockingIOError:
+                await asyncio.sleep(0.01)  # PTY input queue full; the shell drains it quickly
+                continue
+            data = data[n:]
+
+    async def _wait_data(self, deadline: float) -> bool:
+        """Wait for more output until the deadline; False on timeout."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        self._data.clear()
+        try:
+            await asyncio.wait_for(self._data.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _sync(self, timeout: float) -> bool:
+        """Discard pending output up to a fresh sentinel."""
+        token = uuid.uuid4().hex
+        pattern = re.compile(rb"__NB_-?\d+_" + token.encode() + rb"__\n")
+        await self._write(f"__nb_rc=0\n{_sentinel_command(token)}")
+        deadline = time.monotonic() + timeout
+        while True:
+            if m := pattern.search(self._buffer):
+                del self._buffer[:m.end()]
+                return True
+            if self._eof or not await self._wait_data(deadline):
+                return False
+
+    async def run(self, command: str, timeout: float, capture: OutputCapture) -> int | None:
+        """
+        Run one command, feeding its output into `capture`.
+
+        Returns the exit code, or None if the command timed out (it is
+        interrupted with Ctrl-C; if the shell can't be recovered it is
+        closed and the pool starts a new one next time).
+        """
+        async with self._lock:
+            self.last_used = time.monotonic()
+            token = uuid.uuid4().hex
+            pattern = re.compile(rb"\n__NB_(-?\d+)_" + token.encode() + rb"__\n")
+            self._buffer.clear()
+            await self._write(f"{{ {command}\n}} </dev/null\n__nb_rc=$?\n{_sentinel_command(token)}")
+
+            deadline = time.monotonic() + timeout
+            try:
+                while True:
+                    if m := pattern.search(self._buffer):
+                        exit_code = int(m.group(1))  # Before the buffer is mutated
+                        capture.feed(bytes(self._buffer[:m.start()]))
+                        del self._buffer[:m.end()]
+                        return exit_code
+                    safe = len(self._buffer) - _SENTINEL_MARGIN
+                    if safe > 0:
+                        capture.feed(bytes(self._buffer[:safe]))
+                        del self._buffer[:safe]
+                    if self._eof:
+                        capture.feed(bytes(self._buffer))
+                        self._buffer.clear()
+                        raise RuntimeError("shell session exited")
+                    if not await self._wait_data(deadline):
+                        break
+            finally:
+                self.last_used = time.monotonic()
+
+            # Timed out: interrupt the foreground job and resynchronise
+            capture.feed(bytes(self._buffer))
+            self._buffer.clear()
+            await self._write("\x03")
+            if not await self._sync(timeout=5):
+                logger.warning(f"Shell session {self.key} unresponsive after timeout, closing")
+                self.close()
+            return None
+
+    def close(self) -> None:
+        if self._master is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._master)
+            except (RuntimeError, ValueError):
+                pass
+            try:
+                os.close(self._master)
+            except OSError:
+                pass
+            self._master = None
+        if self._proc and self._proc.returncode is None:
+            try:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self._eof = True
+
+
+class ShellSessionPool:
+    """
+    Persistent shell sessions keyed by chat session (`channel:chat_id`).
+
+    Sessions idle for longer than `idle_timeout` seconds are reaped, and
+    the least recently used idle session is closed when `max_sessions`
+    would be exceeded.
+    """
+
+    def __init__(self, idle_timeout: float = 600, max_sessions: int = 8):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions: dict[str, ShellSession] = {}
+        self._reaper: asyncio.Task | None = None
+
+    async def get(self, key: str, cwd: str) -> ShellSession:
+        """Get the live session for a key, starting one if needed."""
+        session = self._sessions.get(key)
+        if session and session.alive:
+            return session
+        if session:
+            session.close()
+            del self._sessions[key]
+
+        if len(self._sessions) >= self.max_sessions:
+            idle = [s for s in self._sessions.values() if not s.busy]
+            if idle:
+                self._close(min(idle, key=lambda s: s.last_used).key)
+
+        session = ShellSession(key, cwd)
+        await session.start()
+        self._sessions[key] = session
+        logger.debug(f"Started shell session for {key}")
+
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+        return session
+
+    def _close(self, key: str) -> None:
+        session = self._sessions.pop(key, None)
+        if session:
+            session.close()
+
+    async def _reap_loop(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(min(60, self.idle_timeout / 2))
+            now = time.monotonic()
+            for key, session in list(self._sessions.items()):
+                if not session.alive or (not session.busy and now - session.last_used > self.idle_timeout):
+                    logger.debug(f"Reaping shell session {key}")
+                    self._close(key)
+
+    def close_all(self) -> None:
+        """Close every session."""
+        for key in list(self._sessions):
+            self._close(key)
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
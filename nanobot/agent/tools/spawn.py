@@ -2,7 +2,7 @@
 
 from typing import Any, TYPE_CHECKING
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
 
 if TYPE_CHECKING:
     from nanobot.agent.subagent import SubagentManager
@@ -13,18 +13,17 @@ class SpawnTool(Tool):
     Tool to spawn a subagent for background task execution.
     
     The subagent runs asynchronously and announces its result back
-    to the main agent when complete.
+    to the main agent when complete. The same tool lists, inspects and
+    cancels the subagents spawned from the current chat.
     """
     
     def __init__(self, manager: "SubagentManager"):
         self._manager = manager
-        self._origin_channel = "cli"
-        self._origin_chat_id = "direct"
+        self._origin = ToolContext("spawn_origin", "cli", "direct")
     
     def set_context(self, channel: str, chat_id: str) -> None:
         """Set the origin context for subagent announcements."""
-        self._origin_channel = channel
-        self._origin_chat_id = chat_id
+        self._origin.set(channel, chat_id)
     
     @property
     def name(self) -> str:
@@ -35,7 +34,8 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "Actions: spawn (default), list, status (by task_id), cancel (by task_id)."
         )
     
     @property
@@ -43,23 +43,60 @@ class SpawnTool(Tool):
         return {
             "type": "object",
             "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["spawn", "list", "status", "cancel"],
+                    "description": "What to do (default: spawn)",
+                },
                 "task": {
                     "type": "string",
-                    "description": "The task for the subagent to complete",
+                    "description": "The task for the subagent to complete (for spawn)",
                 },
                 "label": {
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "task_id": {
+                    "type": "string",
+                    "description": "Subagent id (for status and cancel)",
+                },
             },
-            "required": ["task"],
         }
     
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
-        """Spawn a subagent to execute the given task."""
-        return await self._manager.spawn(
-            task=task,
-            label=label,
-            origin_channel=self._origin_channel,
-            origin_chat_id=self._origin_chat_id,
-        )
+    async def execute(
+        self,
+        action: str = "spawn",
+        task: str | None = None,
+        label: str | None = None,
+        task_id: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        if action == "spawn":
+            if not task:
+                return "Error: task is required for spawn"
+            return await self._manager.spawn(
+                task=task,
+                label=label,
+                origin_channel=self._origin.channel,
+                origin_chat_id=self._origin.chat_id,
+            )
+        if action == "list":
+            return self._list()
+        if action in ("status", "cancel"):
+            if not task_id:
+                return f"Error: task_id is required for {action}"
+            record = self._manager.get(task_id)
+            if not record or record.origin_key != f"{self._origin.channel}:{self._origin.chat_id}":
+                return f"Error: subagent {task_id} not found"
+            if action == "status":
+                return record.details()
+            if self._manager.cancel(task_id):
+                return f"Cancelled subagent {task_id}"
+            return f"Subagent {task_id} is not running ({record.status})"
+        return f"Unknown action: {action}"
+    
+    def _list(self) -> str:
+        tasks = self._manager.list(self._origin.channel, self._origin.chat_id)
+        if not tasks:
+            return "No subagents."
+        return "Subagents:\n" + "\n".join(t.summary() for t in tasks)
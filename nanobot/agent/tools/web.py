@@ -1,33 +1,78 @@
 """Web tools: web_search and web_fetch."""
 
-import html
+import asyncio
 import json
+import multiprocessing
 import os
 import re
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.http_cache import HttpCache
+from nanobot.utils.html_markdown import extract_readable
+from nanobot.utils.http import get_http_client
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
-MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks (see get_http_client)
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024  # Bodies are cut off at this size while streaming
+SEARCH_CACHE_SIZE = 256  # Search results kept in memory
+EXTRACT_WORKERS = 2  # Worker processes for readability/markdown conversion
+EXTRACT_TIMEOUT_S = 20  # A page taking longer than this to extract is given up on
+MAX_EXTRACT_CHARS = 2_000_000  # HTML beyond this is not passed to the extractor
 
+_extract_pool: Executor | None = None
 
-def _strip_tags(text: str) -> str:
-    """Remove HTML tags and decode entities."""
-    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
-    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
-    text = re.sub(r'<[^>]+>', '', text)
-    return html.unescape(text).strip()
 
+def _get_extract_pool() -> Executor:
+    """Process pool for CPU-bound extraction (threads where processes aren't available)."""
+    global _extract_pool
+    if _extract_pool is None:
+        try:
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        except (OSError, ImportError, NotImplementedError):
+            _extract_pool = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="web-extract")
+    return _extract_pool
+
+
+def _reset_extract_pool() -> None:
+    """Throw away the pool, terminating worker processes stuck on a page."""
+    global _extract_pool
+    pool, _extract_pool = _extract_pool, None
+    if pool is None:
+        return
+    if isinstance(pool, ProcessPoolExecutor):
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
 
-def _normalize(text: str) -> str:
-    """Normalize whitespace."""
-    text = re.sub(r'[ \t]+', ' ', text)
-    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+async def _extract(html: str, mode: str) -> tuple[str, str]:
+    """Run readability + conversion off the event loop, with a timeout."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(_get_extract_pool(), extract_readable, html, mode),
+            timeout=EXTRACT_TIMEOUT_S,
+        )
+    except asyncio.TimeoutError:
+        _reset_extract_pool()
+        raise TimeoutError(f"content extraction timed out after {EXTRACT_TIMEOUT_S}s")
+    except BrokenProcessPool:
+        # Workers couldn't start or died: use a thread this time
+        _reset_extract_pool()
+        return await asyncio.wait_for(
+            asyncio.to_thread(extract_readable, html, mode), timeout=EXTRACT_TIMEOUT_S
+        )
 
 
 def _validate_url(url: str) -> tuple[bool, str]:
@@ -43,6 +88,26 @@ def _validate_url(url: str) -> tuple[bool, str]:
         return False, str(e)
 
 
+def _decode(body: bytes, content_type: str) -> str:
+    """Decode a body using the charset from its Content-Type (default UTF-8)."""
+    m = re.search(r'charset=["\']?([\w.:-]+)', content_type, re.I)
+    try:
+        return body.decode(m[1] if m else "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+async def _read_limited(response: httpx.Response, max_bytes: int) -> tuple[bytes, bool]:
+    """Read a streamed body up to max_bytes; returns (body, truncated)."""
+    chunks, size = [], 0
+    async for chunk in response.aiter_bytes():
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+
 class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
@@ -57,9 +122,11 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
     
-    def __init__(self, api_key: str | None = None, max_results: int = 5):
+    def __init__(self, api_key: str | None = None, max_results: int = 5, cache_ttl: int = 600):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY", "")
         self.max_results = max_results
+        self.cache_ttl = cache_ttl
+        self._cache: OrderedDict[tuple[str, int], tuple[float, list[dict[str, Any]]]] = OrderedDict()
     
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         if not self.api_key:
@@ -67,16 +134,18 @@ class WebSearchTool(Tool):
         
         try:
             n = min(max(count or self.max_results, 1), 10)
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
+            results = self._cached(query, n)
+            if results is None:
+                r = await get_http_client().get(
                     "https://api.search.brave.com/res/v1/web/search",
                     params={"q": query, "count": n},
                     headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
                     timeout=10.0
                 )
                 r.raise_for_status()
+                results = r.json().get("web", {}).get("results", [])
+                self._store(query, n, results)
             
-            results = r.json().get("web", {}).get("results", [])
             if not results:
                 return f"No results for: {query}"
             
@@ -88,6 +157,24 @@ class WebSearchTool(Tool):
             return "\n".join(lines)
         except Exception as e:
             return f"Error: {e}"
+    
+    def _cached(self, query: str, count: int) -> list[dict[str, Any]] | None:
+        key = (query.strip().lower(), count)
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+    
+    def _store(self, query: str, count: int, results: list[dict[str, Any]]) -> None:
+        if self.cache_ttl <= 0:
+            return
+        self._cache[(query.strip().lower(), count)] = (time.monotonic(), results)
+        while len(self._cache) > SEARCH_CACHE_SIZE:
+            self._cache.popitem(last=False)
 
 
 class WebFetchTool(Tool):
@@ -105,12 +192,17 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
     
-    def __init__(self, max_chars: int = 50000):
+    def __init__(
+        self,
+        max_chars: int = 50000,
+        max_response_bytes: int = MAX_RESPONSE_BYTES,
+        cache: HttpCache | None = None,
+    ):
         self.max_chars = max_chars
+        self.max_response_bytes = max_response_bytes
+        self.cache = cache
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
 
         # Validate URL before fetching
@@ -119,45 +211,147 @@ class WebFetchTool(Tool):
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
-            
-            ctype = r.headers.get("content-type", "")
+            final_url, status, ctype, body, cache_state, body_truncated = await self._fetch(url)
+            raw = _decode(body, ctype)
             
             # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
+            if "application/json" in ctype and not body_truncated:
+                text, extractor = json.dumps(json.loads(raw), indent=2), "json"
             # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
+            elif "text/html" in ctype or raw[:256].lower().startswith(("<!doctype", "<html")):
+                if len(raw) > MAX_EXTRACT_CHARS:
+                    raw, body_truncated = raw[:MAX_EXTRACT_CHARS], True
+                title, content = await _extract(raw, extractMode)
+                text = f"# {title}\n\n{content}" if title else content
                 extractor = "readability"
             else:
-                text, extractor = r.text, "raw"
+                text, extractor = raw, "raw"
             
-            truncated = len(text) > max_chars
-            if truncated:
+            truncated = body_truncated or len(text) > max_chars
+            if len(text) > max_chars:
                 text = text[:max_chars]
             
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text})
+            result = {"url": url, "finalUrl": final_url, "status": status,
+                      "extractor": extractor, "truncated": truncated, "length": len(text), "text": text}
+            if cache_state:
+                result["cache"] = cache_state
+            return json.dumps(result)
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
     
-    def _to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown."""
-        # Convert links, headings, lists before stripping tags
-        text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
-                      lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
-        text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
-                      lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
-        text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
-        text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
-        text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
-        return _normalize(_strip_tags(text))
+    async def _fetch(self, url: str) -> tuple[str, int, str, bytes, str | None, bool]:
+        """
+        GET a URL through the HTTP cache.
+        
+        Returns (final_url, status, content_type, body, cache_state, truncated)
+        where cache_state is "hit", "revalidated" or None for a network fetch.
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached and cached.fresh:
+            return cached.final_url, cached.status, cached.headers.get("content-type", ""), cached.body, "hit", False
+        
+        headers = {"User-Agent": USER_AGENT}
+        if cached:
+            headers.update(cached.validators())
+        
+        async with get_http_client().stream(
+            "GET", url, headers=headers, follow_redirects=True, timeout=30.0
+        ) as r:
+            if r.status_code == 304 and cached:
+                self.cache.revalidated(cached, r.headers)
+                return cached.final_url, cached.status, cached.headers.get("content-type", ""), cached.body, "revalidated", False
+            r.raise_for_status()
+            body, truncated = await _read_limited(r, self.max_response_bytes)
+        
+        if self.cache is not None and not truncated:
+            self.cache.put(url, str(r.url), r.status_code, r.headers, body)
+        return str(r.url), r.status_code, r.headers.get("content-type", ""), body, None, truncated
+
+
+class WebFetchManyTool(Tool):
+    """
+    Fetch several URLs concurrently in one tool call.
+    
+    Shares web_fetch's client, cache and extraction. Concurrency is bounded
+    overall and per host, the whole batch has a deadline, and each page is
+    cut to its own character budget so one long page can't crowd out the
+    rest.
+    """
+    
+    name = "web_fetch_many"
+    description = (
+        "Fetch up to 10 URLs at once and extract readable content from each. "
+        "Use instead of several web_fetch calls when you already know the URLs."
+    )
+    parameters = {
+        "type": "object",
+        "properties": {
+            "urls": {
+                "type": "array",
+                "items": {"type": "string"},
+                "minItems": 1,
+                "maxItems": 10,
+                "description": "URLs to fetch"
+            },
+            "extractMode": {"type": "string", "enum": ["markdown", "text"], "default": "markdown"},
+            "maxCharsPerPage": {"type": "integer", "minimum": 100, "description": "Character budget per page (default 8000)"}
+        },
+        "required": ["urls"]
+    }
+    
+    def __init__(
+        self,
+        fetcher: WebFetchTool,
+        max_chars_per_page: int = 8000,
+        max_concurrency: int = 6,
+        per_host: int = 2,
+        timeout_s: float = 60.0,
+    ):
+        self.fetcher = fetcher
+        self.max_chars_per_page = max_chars_per_page
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout_s = timeout_s
+    
+    async def execute(
+        self, urls: list[str], extractMode: str = "markdown", maxCharsPerPage: int | None = None, **kwargs: Any
+    ) -> str:
+        budget = maxCharsPerPage or self.max_chars_per_page
+        urls = list(dict.fromkeys(u.strip() for u in urls if u.strip()))
+        overall = asyncio.Semaphore(self.max_concurrency)
+        hosts: defaultdict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        
+        async def fetch(url: str) -> dict[str, Any]:
+            async with hosts[urlparse(url).netloc.lower()], overall:
+                return json.loads(await self.fetcher.execute(url, extractMode=extractMode, maxChars=budget))
+        
+        tasks = [asyncio.create_task(fetch(url)) for url in urls]
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout_s)
+        for task in pending:
+            task.cancel()
+        
+        results = []
+        for url, task in zip(urls, tasks):
+            if task in pending:
+                results.append({"url": url, "error": f"timed out after {self.timeout_s:g}s"})
+                continue
+            try:
+                page = task.result()
+            except Exception as e:
+                page = {"url": url, "error": str(e)}
+            if "error" in page:
+                results.append({"url": url, "error": page["error"]})
+                continue
+            entry = {"url": url, "status": page.get("status"), "text": page.get("text", "")}
+            if page.get("finalUrl") and page["finalUrl"] != url:
+                entry["finalUrl"] = page["finalUrl"]
+            if page.get("truncated"):
+                entry["truncated"] = True
+            results.append(entry)
+        
+        failed = sum(1 for r in results if "error" in r)
+        return json.dumps(
+            {"fetched": len(results) - failed, "failed": failed, "results": results},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
@@ -1,18 +1,129 @@
 """Telegram channel implementation using python-telegram-bot."""
 
 import asyncio
+import os
 import re
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Coroutine
 
+import httpx
 from loguru import logger
 from telegram import Update
+from telegram.error import RetryAfter
 from telegram.ext import Application, MessageHandler, filters, ContextTypes
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import TelegramConfig
+from nanobot.providers.ratelimit import TokenBucket
+from nanobot.providers.transcription import GroqTranscriptionProvider
+from nanobot.utils.http import get_http_client
 
 
+# How long to wait for the rest of an album after its first part arrives
+MEDIA_GROUP_WAIT_S = 0.8
+
+# Telegram's limit on the text of one message
+MAX_MESSAGE_LEN = 4096
+
+# Telegram's flood limits: about one message per second per chat (short
+# bursts are tolerated) and 30 per second across all chats
+CHAT_BURST = 3
+CHAT_MESSAGES_PER_S = 1.0
+GLOBAL_MESSAGES_PER_S = 30.0
+
+_FENCE_RE = re.compile(r"^\s*```")
+
+
+def _media_of(message: Any) -> tuple[Any, str] | None:
+    """The attachment of a message and its type, if any."""
+    if message.photo:
+        return message.photo[-1], "image"  # Largest photo
+    if message.voice:
+        return message.voice, "voice"
+    if message.audio:
+        return message.audio, "audio"
+    if message.document:
+        return message.document, "file"
+    return None
+
+
+def _split_markdown(text: str, limit: int = MAX_MESSAGE_LEN) -> list[str]:
+    """
+    Split markdown into chunks of at most `limit` characters.
+
+    Breaks between lines, preferring a blank line outside code in the
+    second half of a chunk; only lines longer than a chunk are cut, at a
+    space if possible. A code block spanning chunks is closed at the end of
+    one and reopened (with its language) at the top of the next, so every
+    chunk renders on its own.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    # (separator, text, starts a line); a cut line's pieces rejoin without a newline
+    room = max(1, limit - 200)  # Leaves space for a reopened fence
+    segments: list[tuple[str, str, bool]] = []
+    for line in text.split("\n"):
+        sep, starts_line = ("\n" if segments else ""), True
+        while len(line) > room:
+            cut = line.rfind(" ", room // 2, room)
+            if cut < 0:
+                segments.append((sep, line[:room], starts_line))
+                line, sep = line[room:], ""
+            else:
+                segments.append((sep, line[:cut], starts_line))
+                line, sep = line[cut + 1:], " "
+            starts_line = False
+        segments.append((sep, line, starts_line))
+
+    chunks: list[str] = []
+    current: list[tuple[str, str, str | None]] = []  # (separator, text, fence open after it)
+    opener: str | None = None  # Fence reopened at the top of the current chunk
+    fence: str | None = None
+    size = 0
+
+    def emit(count: int) -> None:
+        nonlocal current, opener, size
+        head, current = current[:count], current[count:]
+        body = head[0][1] + "".join(sep + part for sep, part, _ in head[1:])
+        if opener:
+            body = f"{opener}\n{body}"
+        if head[-1][2]:
+            body += "\n```"
+        if body.strip():
+            chunks.append(body.strip("\n"))
+        opener = head[-1][2]
+        size = (len(opener) + 1 if opener else 0) + sum(len(sep) + len(part) for sep, part, _ in current)
+
+    for sep, line, starts_line in segments:
+        if starts_line and _FENCE_RE.match(line):
+            fence = None if fence else line.strip()
+        closing = 4 if fence else 0  # "\n```"
+        while current and size + len(sep) + len(line) + closing > limit:
+            cut, used = len(current), size
+            for k in range(len(current) - 1, 0, -1):
+                used -= len(current[k][0]) + len(current[k][1])
+                if used < limit // 2:
+                    break
+                if not current[k][1].strip() and current[k][0] == "\n" and not current[k - 1][2]:
+                    cut = k
+                    break
+            emit(cut)
+        if not current:
+            sep = ""
+        current.append((sep, line, fence))
+        size += len(sep) + len(line)
+
+    if current:
+        emit(len(current))
+    return chunks
+
+
+@lru_cache(maxsize=256)
 def _markdown_to_telegram_html(text: str) -> str:
     """
     Convert markdown to Telegram-safe HTML.
@@ -61,17 +172,20 @@ def _markdown_to_telegram_html(text: str) -> str:
     # 10. Bullet lists - item -> • item
     text = re.sub(r'^[-*]\s+', '• ', text, flags=re.MULTILINE)
     
-    # 11. Restore inline code with HTML tags
-    for i, code in enumerate(inline_codes):
-        # Escape HTML in code content
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00IC{i}\x00", f"<code>{escaped}</code>")
+    # 11-12. Restore inline code, then code blocks (inline code may hold a block's
+    # placeholder), each in one pass: replacing placeholders one by one is quadratic
+    def restore(codes: list[str], template: str) -> Callable[[re.Match], str]:
+        def replace(m: re.Match) -> str:
+            i = int(m.group(1))
+            if i >= len(codes):
+                return m.group(0)
+            # Escape HTML in code content
+            escaped = codes[i].replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            return template.format(escaped)
+        return replace
     
-    # 12. Restore code blocks with HTML tags
-    for i, code in enumerate(code_blocks):
-        # Escape HTML in code content
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00CB{i}\x00", f"<pre><code>{escaped}</code></pre>")
+    text = re.sub(r'\x00IC(\d+)\x00', restore(inline_codes, "<code>{}</code>"), text)
+    text = re.sub(r'\x00CB(\d+)\x00', restore(code_blocks, "<pre><code>{}</code></pre>"), text)
     
     return text
 
@@ -91,6 +205,19 @@ class TelegramChannel(BaseChannel):
         self.groq_api_key = groq_api_key
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
+        self.media_dir = Path.home() / ".nanobot" / "media"
+        self.max_media_bytes = config.max_media_mb * 1024 * 1024
+        self._media_slots = asyncio.Semaphore(max(1, config.media_workers))
+        self._transcriber = GroqTranscriptionProvider(
+            api_key=groq_api_key,
+            cache_dir=Path.home() / ".nanobot" / "cache" / "transcripts",
+        )
+        self._downloads: dict[str, asyncio.Future] = {}  # file_unique_id -> in-flight download
+        self._media_groups: dict[str, list] = {}  # media_group_id -> parts received so far
+        self._chat_tails: dict[int, asyncio.Task] = {}  # chat_id -> last message being processed
+        self._send_locks: dict[int, asyncio.Lock] = {}
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._global_bucket = TokenBucket(GLOBAL_MESSAGES_PER_S, GLOBAL_MESSAGES_PER_S)
     
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -99,6 +226,7 @@ class TelegramChannel(BaseChannel):
             return
         
         self._running = True
+        self.media_dir.mkdir(parents=True, exist_ok=True)
         
         # Build the application with generous timeouts for slow connections (e.g. Pi)
         from telegram.request import HTTPXRequest
@@ -151,6 +279,8 @@ class TelegramChannel(BaseChannel):
     async def stop(self) -> None:
         """Stop the Telegram bot."""
         self._running = False
+        for task in list(self._chat_tails.values()):
+            task.cancel()
         
         if self._app:
             logger.info("Stopping Telegram bot...")
@@ -160,7 +290,13 @@ class TelegramChannel(BaseChannel):
             self._app = None
     
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Telegram."""
+        """
+        Send a message through Telegram.
+        
+        Long messages go out as several messages, split so code blocks stay
+        intact, paced to Telegram's flood limits. A chunk whose HTML is
+        rejected is resent as plain text on its own.
+        """
         if not self._app:
             logger.warning("Telegram bot not running")
             return
@@ -168,25 +304,46 @@ class TelegramChannel(BaseChannel):
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
-            # Convert markdown to Telegram HTML
-            html_content = _markdown_to_telegram_html(msg.content)
-            await self._app.bot.send_message(
-                chat_id=chat_id,
-                text=html_content,
-                parse_mode="HTML"
-            )
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
-        except Exception as e:
-            # Fallback to plain text if HTML parsing fails
-            logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+            return
+        
+        # One reply at a time per chat, so chunks of different replies don't interleave
+        lock = self._send_locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            for chunk in _split_markdown(msg.content):
+                try:
+                    await self._send_chunk(chat_id, _markdown_to_telegram_html(chunk), "HTML")
+                except Exception as e:
+                    # Fallback to plain text if HTML parsing fails
+                    logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+                    try:
+                        await self._send_chunk(chat_id, chunk, None)
+                    except Exception as e2:
+                        logger.error(f"Error sending Telegram message: {e2}")
+                        return
+    
+    async def _send_chunk(self, chat_id: int, text: str, parse_mode: str | None) -> None:
+        """Send one message once the rate limits allow, retrying once on flood control."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(CHAT_BURST, CHAT_MESSAGES_PER_S)
+        for attempt in range(2):
+            for b in (bucket, self._global_bucket):
+                while (delay := b.delay_for(1)) > 0:
+                    await asyncio.sleep(delay)
+                b.consume(1)
             try:
-                await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
-                )
-            except Exception as e2:
-                logger.error(f"Error sending Telegram message: {e2}")
+                await self._app.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                return
+            except RetryAfter as e:
+                if attempt:
+                    raise
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"Telegram flood control, retrying in {retry_after}s")
+                await asyncio.sleep(retry_after)
     
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -200,7 +357,14 @@ class TelegramChannel(BaseChannel):
         )
     
     async def _on_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Handle incoming messages (text, photos, voice, documents)."""
+        """
+        Handle incoming messages (text, photos, voice, documents).
+        
+        Messages with media are processed in the background so the handler
+        returns at once; each chat's messages still reach the bus in the
+        order they arrived. Album parts (same media_group_id) are collected
+        for MEDIA_GROUP_WAIT_S and published as one message.
+        """
         if not update.message or not update.effective_user:
             return
         
@@ -213,89 +377,187 @@ class TelegramChannel(BaseChannel):
         if user.username:
             sender_id = f"{sender_id}|{user.username}"
         
+        # Don't download or transcribe anything for senders we'd drop anyway
+        if not self.is_allowed(sender_id):
+            return
+        
         # Store chat_id for replies
         self._chat_ids[sender_id] = chat_id
         
-        # Build content from text and/or media
-        content_parts = []
-        media_paths = []
+        if message.media_group_id:
+            group = self._media_groups.get(message.media_group_id)
+            if group is not None:
+                group.append(message)
+                return
+            self._media_groups[message.media_group_id] = [message]
+            self._publish_in_order(chat_id, self._process_media_group(message.media_group_id, sender_id))
+        elif _media_of(message) or chat_id in self._chat_tails:
+            self._publish_in_order(chat_id, self._process_messages([message], sender_id))
+        else:
+            # Plain text with nothing pending for the chat: publish right away
+            content, media_paths = await self._build_content([message])
+            await self._publish(sender_id, [message], content, media_paths)
+    
+    def _publish_in_order(self, chat_id: int, work: Coroutine[Any, Any, tuple]) -> None:
+        """
+        Run work (which builds a message) in the background and publish its
+        result after everything queued earlier for the chat.
+        """
+        previous = self._chat_tails.get(chat_id)
         
-        # Text content
-        if message.text:
-            content_parts.append(message.text)
-        if message.caption:
-            content_parts.append(message.caption)
-        
-        # Handle media files
-        media_file = None
-        media_type = None
-        
-        if message.photo:
-            media_file = message.photo[-1]  # Largest photo
-            media_type = "image"
-        elif message.voice:
-            media_file = message.voice
-            media_type = "voice"
-        elif message.audio:
-            media_file = message.audio
-            media_type = "audio"
-        elif message.document:
-            media_file = message.document
-            media_type = "file"
-        
-        # Download media if present
-        if media_file and self._app:
+        async def run() -> None:
             try:
-                file = await self._app.bot.get_file(media_file.file_id)
-                ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
-                
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
-                
-                media_paths.append(str(file_path))
-                
-                # Handle voice transcription
-                if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
-                    if transcription:
-                        logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
-                        content_parts.append(f"[transcription: {transcription}]")
-                    else:
-                        content_parts.append(f"[{media_type}: {file_path}]")
-                else:
-                    content_parts.append(f"[{media_type}: {file_path}]")
-                    
-                logger.debug(f"Downloaded {media_type} to {file_path}")
+                result = await work
             except Exception as e:
-                logger.error(f"Failed to download media: {e}")
-                content_parts.append(f"[{media_type}: download failed]")
+                logger.error(f"Failed to process Telegram message: {e}")
+                result = None
+            if previous:
+                await asyncio.wait([previous])
+            if result:
+                await self._publish(*result)
         
-        content = "\n".join(content_parts) if content_parts else "[empty message]"
+        task = asyncio.create_task(run())
+        self._chat_tails[chat_id] = task
+        
+        def done(t: asyncio.Task) -> None:
+            if self._chat_tails.get(chat_id) is t:
+                del self._chat_tails[chat_id]
+        
+        task.add_done_callback(done)
+    
+    async def _process_media_group(self, group_id: str, sender_id: str) -> tuple:
+        await asyncio.sleep(MEDIA_GROUP_WAIT_S)
+        messages = self._media_groups.pop(group_id, [])
+        messages.sort(key=lambda m: m.message_id)
+        return await self._process_messages(messages, sender_id)
+    
+    async def _process_messages(self, messages: list, sender_id: str) -> tuple:
+        content, media_paths = await self._build_content(messages)
+        return sender_id, messages, content, media_paths
+    
+    async def _build_content(self, messages: list) -> tuple[str, list[str]]:
+        """Text of the messages plus their media, fetched concurrently."""
+        content_parts = []
+        for message in messages:
+            if message.text:
+                content_parts.append(message.text)
+            if message.caption:
+                content_parts.append(message.caption)
         
+        attachments = [m for m in map(_media_of, messages) if m]
+        results = await asyncio.gather(
+            *(self._fetch_media(media_file, media_type) for media_file, media_type in attachments)
+        )
+        media_paths = []
+        for path, description in results:
+            if path:
+                media_paths.append(path)
+            content_parts.append(description)
+        
+        content = "\n".join(content_parts) if content_parts else "[empty message]"
+        return content, media_paths
+    
+    async def _publish(self, sender_id: str, messages: list, content: str, media_paths: list[str]) -> None:
+        message = messages[0]
+        user = message.from_user
         logger.debug(f"Telegram message from {sender_id}: {content[:50]}...")
         
         # Forward to the message bus
         await self._handle_message(
             sender_id=sender_id,
-            chat_id=str(chat_id),
+            chat_id=str(message.chat_id),
             content=content,
             media=media_paths,
             metadata={
                 "message_id": message.message_id,
-                "user_id": user.id,
-                "username": user.username,
-                "first_name": user.first_name,
+                "user_id": user.id if user else None,
+                "username": user.username if user else None,
+                "first_name": user.first_name if user else None,
                 "is_group": message.chat.type != "private"
             }
         )
     
+    async def _fetch_media(self, media_file: Any, media_type: str) -> tuple[str | None, str]:
+        """
+        Download (and for audio, transcribe) one attachment.
+        
+        Returns (local path or None, text describing it for the agent).
+        """
+        size = getattr(media_file, "file_size", None) or 0
+        if size > self.max_media_bytes:
+            logger.info(f"Skipping {media_type} of {size} bytes (limit {self.max_media_bytes})")
+            return None, f"[{media_type}: too large to download ({size / (1024 * 1024):.1f} MB)]"
+        
+        try:
+            async with self._media_slots:
+                file_path = await self._download(media_file, media_type)
+                if media_type in ("voice", "audio"):
+                    transcription = await self._transcriber.transcribe(file_path)
+                    if transcription:
+                        logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
+                        return str(file_path), f"[transcription: {transcription}]"
+            return str(file_path), f"[{media_type}: {file_path}]"
+        except Exception as e:
+            logger.error(f"Failed to download {media_type} {media_file.file_id}: {e}")
+            return None, f"[{media_type}: download failed]"
+    
+    async def _download(self, media_file: Any, media_type: str) -> Path:
+        """
+        Download a file into the media directory, once per file_unique_id.
+        
+        Telegram keeps file_unique_id stable for the same content across
+        forwards and re-sends, so it names the local file: media seen
+        before is served from disk, and concurrent requests for the same
+        file share one download.
+        """
+        ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
+        file_path = self.media_dir / f"{media_file.file_unique_id}{ext}"
+        if file_path.exists():
+            logger.debug(f"Media cache hit: {file_path}")
+            return file_path
+        
+        key = media_file.file_unique_id
+        pending = self._downloads.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._download_to(media_file.file_id, file_path))
+            self._downloads[key] = pending
+            pending.add_done_callback(lambda _: self._downloads.pop(key, None))
+        await asyncio.shield(pending)
+        logger.debug(f"Downloaded {media_type} to {file_path}")
+        return file_path
+    
+    async def _download_to(self, file_id: str, file_path: Path) -> None:
+        """
+        Stream a file to a temp name under the size limit, then rename it into place.
+        
+        The download URL contains the bot token, so errors raised here
+        never include it (httpx errors and raise_for_status() would).
+        """
+        file = await self._app.bot.get_file(file_id)
+        tmp = file_path.with_name(f".{file_path.name}.part")
+        try:
+            if file.file_path and file.file_path.startswith(("http://", "https://")):
+                received = 0
+                client = get_http_client()
+                try:
+                    async with client.stream("GET", file.file_path, timeout=60.0) as response:
+                        if response.status_code != 200:
+                            raise RuntimeError(f"HTTP {response.status_code}")
+                        with open(tmp, "wb") as f:
+                            async for chunk in response.aiter_bytes(64 * 1024):
+                                received += len(chunk)
+                                if received > self.max_media_bytes:
+                                    raise ValueError(f"file exceeds {self.max_media_bytes} bytes")
+                                f.write(chunk)
+                except httpx.HTTPError as e:
+                    raise RuntimeError(type(e).__name__) from None
+            else:
+                # Local Bot API server: file_path is on this machine
+                await file.download_to_drive(str(tmp))
+            os.replace(tmp, file_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+    
     def _get_extension(self, media_type: str, mime_type: str | None) -> str:
         """Get file extension based on media type."""
         if mime_type:
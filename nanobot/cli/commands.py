@@ -158,14 +158,13 @@ def gateway(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
 ):
     """Start the nanobot gateway."""
-    from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
-    from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
     from nanobot.channels.manager import ChannelManager
+    from nanobot.config.loader import get_data_dir, load_config
     from nanobot.cron.service import CronService
-    from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.providers.factory import create_provider
     
     if verbose:
         import logging
@@ -180,7 +179,6 @@ def gateway(
     
     # Create provider (supports OpenRouter, Anthropic, OpenAI, Bedrock)
     api_key = config.get_api_key()
-    api_base = config.get_api_base()
     model = config.agents.defaults.model
     is_bedrock = model.startswith("bedrock/")
 
@@ -189,15 +187,17 @@ def gateway(
         console.print("Set one in ~/.nanobot/config.json under providers.openrouter.apiKey")
         raise typer.Exit(1)
     
-    provider = LiteLLMProvider(
-        api_key=api_key,
-        api_base=api_base,
-        default_model=config.agents.defaults.model
-    )
+    provider = create_provider(config)
     
     # Create cron service first (callback set after agent creation)
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron = CronService(
+        cron_store_path,
+        max_concurrent=config.cron.max_concurrent,
+        misfire=config.cron.misfire,
+        catch_up_limit=config.cron.catch_up_limit,
+        history_size=config.cron.history,
+    )
     
     # Create agent with cron service
     agent = AgentLoop(
@@ -208,39 +208,40 @@ def gateway(
         max_iterations=config.agents.defaults.max_tool_iterations,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        search_config=config.tools.search,
+        web_config=config.tools.web,
+        subagent_config=config.agents.subagents,
         cron_service=cron,
         solana_config=config.tools.solana_trading if config.tools.solana_trading.enabled else None,
+        model_routing=config.agents.defaults.models,
     )
     
     # Set cron callback (needs agent)
-    async def on_cron_job(job: CronJob) -> str | None:
-        """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
-            channel=job.payload.channel or "cli",
-            chat_id=job.payload.to or "direct",
-        )
-        if job.payload.deliver and job.payload.to:
-            from nanobot.bus.events import OutboundMessage
-            await bus.publish_outbound(OutboundMessage(
-                channel=job.payload.channel or "cli",
-                chat_id=job.payload.to,
-                content=response or ""
-            ))
-        return response
-    cron.on_job = on_cron_job
+    cron.on_job = agent.run_cron_job
     
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        return await agent.process_direct(prompt, session_key="heartbeat", purpose="heartbeat")
     
+    hb = config.heartbeat
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
         on_heartbeat=on_heartbeat,
-        interval_s=30 * 60,  # 30 minutes
-        enabled=True
+        interval_s=hb.interval_s,
+        enabled=hb.enabled,
+        watch=hb.watch,
+        debounce_s=hb.debounce_s,
+        poll_s=hb.poll_s,
+        ok_ttl_s=hb.ok_ttl_s,
+        adaptive=hb.adaptive,
+        min_interval_s=hb.min_interval_s,
+        max_interval_s=hb.max_interval_s,
+        backoff=hb.backoff,
+        active_hours=hb.active_hours,
+        timezone=hb.timezone,
+        jitter=hb.jitter,
+        status_path=get_data_dir() / "heartbeat" / "status.json",
     )
     
     # Create channel manager
@@ -255,7 +256,10 @@ def gateway(
     if cron_status["jobs"] > 0:
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
-    console.print(f"[green]✓[/green] Heartbeat: every 30m")
+    if hb.enabled:
+        on_edit = " and on edit" if hb.watch else ""
+        adaptive = f" (adaptive {hb.min_interval_s // 60}m-{hb.max_interval_s // 60}m)" if hb.adaptive else ""
+        console.print(f"[green]✓[/green] Heartbeat: every {hb.interval_s // 60}m{adaptive}{on_edit}")
     
     async def run():
         try:
@@ -288,15 +292,14 @@ def agent(
     session_id: str = typer.Option("cli:default", "--session", "-s", help="Session ID"),
 ):
     """Interact with the agent directly."""
-    from nanobot.config.loader import load_config
-    from nanobot.bus.queue import MessageBus
-    from nanobot.providers.litellm_provider import LiteLLMProvider
     from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import load_config
+    from nanobot.providers.factory import create_provider
     
     config = load_config()
     
     api_key = config.get_api_key()
-    api_base = config.get_api_base()
     model = config.agents.defaults.model
     is_bedrock = model.startswith("bedrock/")
 
@@ -305,11 +308,7 @@ def agent(
         raise typer.Exit(1)
 
     bus = MessageBus()
-    provider = LiteLLMProvider(
-        api_key=api_key,
-        api_base=api_base,
-        default_model=config.agents.defaults.model
-    )
+    provider = create_provider(config)
     
     agent_loop = AgentLoop(
         bus=bus,
@@ -317,7 +316,11 @@ def agent(
         workspace=config.workspace_path,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        search_config=config.tools.search,
+        web_config=config.tools.web,
+        subagent_config=config.agents.subagents,
         solana_config=config.tools.solana_trading if config.tools.solana_trading.enabled else None,
+        model_routing=config.agents.defaults.models,
     )
     
     if message:
@@ -495,6 +498,8 @@ def cron_list(
     table.add_column("Schedule")
     table.add_column("Status")
     table.add_column("Next Run")
+    table.add_column("Last Run")
+    table.add_column("p50/p95", justify="right")
     
     import time
     for job in jobs:
@@ -503,6 +508,8 @@ def cron_list(
             sched = f"every {(job.schedule.every_ms or 0) // 1000}s"
         elif job.schedule.kind == "cron":
             sched = job.schedule.expr or ""
+            if job.schedule.tz:
+                sched += f" ({job.schedule.tz})"
         else:
             sched = "one-time"
         
@@ -514,18 +521,116 @@ def cron_list(
         
         status = "[green]enabled[/green]" if job.enabled else "[dim]disabled[/dim]"
         
-        table.add_row(job.id, job.name, sched, status, next_run)
+        last_run = ""
+        if job.state.last_run_at_ms:
+            last_run = time.strftime("%Y-%m-%d %H:%M", time.localtime(job.state.last_run_at_ms / 1000))
+            if job.state.last_status == "error":
+                last_run += " [red]error[/red]"
+        
+        stats = service.run_stats(job.id)
+        durations = ""
+        if stats["runs"]:
+            durations = f"{_format_ms(stats['p50_ms'])} / {_format_ms(stats['p95_ms'])}"
+        
+        table.add_row(job.id, job.name, sched, status, next_run, last_run, durations)
+    
+    console.print(table)
+
+
+def _format_ms(ms: int) -> str:
+    """Format a duration for tables."""
+    if ms < 1000:
+        return f"{ms}ms"
+    if ms < 60_000:
+        return f"{ms / 1000:.1f}s"
+    return f"{ms / 60_000:.1f}m"
+
+
+@cron_app.command("history")
+def cron_history(
+    job_id: str = typer.Argument(None, help="Job ID (omit for a summary of all jobs)"),
+    limit: int = typer.Option(20, "--limit", "-l", help="Runs to show"),
+):
+    """Show recent runs and duration percentiles."""
+    from nanobot.config.loader import get_data_dir
+    from nanobot.cron.service import CronService
+    
+    store_path = get_data_dir() / "cron" / "jobs.json"
+    service = CronService(store_path)
+    
+    if not job_id:
+        table = Table(title="Cron Run Summary")
+        table.add_column("ID", style="cyan")
+        table.add_column("Name")
+        table.add_column("Runs", justify="right")
+        table.add_column("Errors", justify="right")
+        table.add_column("p50", justify="right")
+        table.add_column("p95", justify="right")
+        table.add_column("Avg Tokens", justify="right")
+        for job in service.list_jobs(include_disabled=True):
+            stats = service.run_stats(job.id)
+            if not stats["runs"]:
+                continue
+            table.add_row(
+                job.id,
+                job.name,
+                str(stats["runs"]),
+                str(stats["errors"]),
+                _format_ms(stats["p50_ms"]),
+                _format_ms(stats["p95_ms"]),
+                str(stats["avg_tokens"]),
+            )
+        if not table.row_count:
+            console.print("No recorded runs.")
+            return
+        console.print(table)
+        return
     
+    runs = service.get_history(job_id)
+    if not runs:
+        console.print(f"No recorded runs for job {job_id}")
+        return
+    
+    import time
+    table = Table(title=f"Runs of {job_id}")
+    table.add_column("Started")
+    table.add_column("Duration", justify="right")
+    table.add_column("Status")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Output")
+    for run in reversed(runs[-limit:]):
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run.started_at_ms / 1000))
+        status = "[green]ok[/green]" if run.status == "ok" else "[red]error[/red]"
+        text = run.error if run.status == "error" else run.output
+        table.add_row(
+            started,
+            _format_ms(run.duration_ms),
+            status,
+            str(run.prompt_tokens + run.completion_tokens),
+            (text or "").replace("\n", " ")[:80],
+        )
     console.print(table)
+    
+    stats = service.run_stats(job_id)
+    console.print(
+        f"{stats['runs']} runs, {stats['errors']} errors, "
+        f"p50 {_format_ms(stats['p50_ms'])}, p95 {_format_ms(stats['p95_ms'])}, "
+        f"avg {stats['avg_tokens']} tokens"
+    )
 
 
 @cron_app.command("add")
 def cron_add(
     name: str = typer.Option(..., "--name", "-n", help="Job name"),
-    message: str = typer.Option(..., "--message", "-m", help="Message for agent"),
+    message: str = typer.Option("", "--message", "-m", help="Message for agent (with --tool: prompt used on escalation)"),
     every: int = typer.Option(None, "--every", "-e", help="Run every N seconds"),
     cron_expr: str = typer.Option(None, "--cron", "-c", help="Cron expression (e.g. '0 9 * * *')"),
     at: str = typer.Option(None, "--at", help="Run once at time (ISO format)"),
+    tz: str = typer.Option(None, "--tz", help="Timezone for --cron (e.g. 'America/New_York')"),
+    misfire: str = typer.Option(None, "--misfire", help="Missed runs: skip, run_once or catch_up"),
+    tool: str = typer.Option(None, "--tool", help="Call this tool directly instead of running an agent turn"),
+    args: str = typer.Option("{}", "--args", help="Tool arguments as JSON (with --tool)"),
+    escalate_if: str = typer.Option(None, "--escalate-if", help="Regex; run an agent turn when the tool result matches"),
     deliver: bool = typer.Option(False, "--deliver", "-d", help="Deliver response to channel"),
     to: str = typer.Option(None, "--to", help="Recipient for delivery"),
     channel: str = typer.Option(None, "--channel", help="Channel for delivery (e.g. 'telegram', 'whatsapp')"),
@@ -539,7 +644,7 @@ def cron_add(
     if every:
         schedule = CronSchedule(kind="every", every_ms=every * 1000)
     elif cron_expr:
-        schedule = CronSchedule(kind="cron", expr=cron_expr)
+        schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
     elif at:
         import datetime
         dt = datetime.datetime.fromisoformat(at)
@@ -548,17 +653,47 @@ def cron_add(
         console.print("[red]Error: Must specify --every, --cron, or --at[/red]")
         raise typer.Exit(1)
     
+    if tool:
+        import json
+        try:
+            tool_args = json.loads(args)
+        except json.JSONDecodeError as e:
+            console.print(f"[red]Error: --args is not valid JSON: {e}[/red]")
+            raise typer.Exit(1)
+        if not isinstance(tool_args, dict):
+            console.print("[red]Error: --args must be a JSON object[/red]")
+            raise typer.Exit(1)
+        if escalate_if and not message:
+            console.print("[red]Error: --escalate-if needs --message for the escalation turn[/red]")
+            raise typer.Exit(1)
+    elif not message:
+        console.print("[red]Error: Must specify --message or --tool[/red]")
+        raise typer.Exit(1)
+    
+    if misfire:
+        if misfire not in ("skip", "run_once", "catch_up"):
+            console.print("[red]Error: --misfire must be skip, run_once or catch_up[/red]")
+            raise typer.Exit(1)
+        schedule.misfire = misfire
+    
     store_path = get_data_dir() / "cron" / "jobs.json"
     service = CronService(store_path)
     
-    job = service.add_job(
-        name=name,
-        schedule=schedule,
-        message=message,
-        deliver=deliver,
-        to=to,
-        channel=channel,
-    )
+    try:
+        job = service.add_job(
+            name=name,
+            schedule=schedule,
+            message=message,
+            deliver=deliver,
+            to=to,
+            channel=channel,
+            tool=tool,
+            tool_args=tool_args if tool else None,
+            escalate_if=escalate_if,
+        )
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
     
     console.print(f"[green]✓[/green] Added job '{job.name}' ({job.id})")
 
@@ -656,6 +791,34 @@ def status():
         console.print(f"Gemini API: {'[green]✓[/green]' if has_gemini else '[dim]not set[/dim]'}")
         vllm_status = f"[green]✓ {config.providers.vllm.api_base}[/green]" if has_vllm else "[dim]not set[/dim]"
         console.print(f"vLLM/Local: {vllm_status}")
+    
+    _print_heartbeat_status()
+
+
+def _print_heartbeat_status() -> None:
+    """Print the heartbeat status last saved by the gateway."""
+    import json
+    import time
+
+    from nanobot.config.loader import get_data_dir
+    
+    status_path = get_data_dir() / "heartbeat" / "status.json"
+    try:
+        hb = json.loads(status_path.read_text())
+    except (OSError, ValueError):
+        console.print("Heartbeat: [dim]no status (gateway not started)[/dim]")
+        return
+    
+    if not hb["enabled"]:
+        console.print(f"Heartbeat: [dim]stopped {time.strftime('%Y-%m-%d %H:%M', time.localtime(hb['updated_at']))}[/dim]")
+        return
+    mode = "adaptive" if hb["adaptive"] else "fixed"
+    next_tick = time.strftime("%H:%M", time.localtime(hb["next_tick_at"])) if hb["next_tick_at"] else "-"
+    console.print(f"Heartbeat: every {_format_ms(hb['interval_s'] * 1000)} ({mode}), next check {next_tick}")
+    console.print(
+        f"  {hb['ticks']} ticks, {hb['llm_calls']} LLM calls, {hb['memo_skips']} skipped unchanged, "
+        f"{hb['actions']} actions, {hb['llm_calls_saved']} calls saved vs fixed interval"
+    )
 
 
 if __name__ == "__main__":
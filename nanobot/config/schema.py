@@ -18,6 +18,8 @@ class TelegramConfig(BaseModel):
     token: str = ""  # Bot token from @BotFather
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs or usernames
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
+    media_workers: int = 4  # Attachments downloaded/transcribed at once
+    max_media_mb: int = 20  # Larger attachments are not downloaded (Bot API limit is 20 MB)
 
 
 class FeishuConfig(BaseModel):
@@ -37,6 +39,16 @@ class ChannelsConfig(BaseModel):
     feishu: FeishuConfig = Field(default_factory=FeishuConfig)
 
 
+class ModelRoutingConfig(BaseModel):
+    """Per-purpose model selection (empty = agents.defaults.model)."""
+    interactive: str = ""  # Chat turns from users
+    subagent: str = ""  # Background subagent tasks
+    heartbeat: str = ""  # HEARTBEAT.md checks
+    cron: str = ""  # Scheduled job turns
+    announce: str = ""  # Relaying subagent results back to the user
+    fast: str = ""  # Cheap model for simple interactive/cron turns (empty = no classifier)
+
+
 class AgentDefaults(BaseModel):
     """Default agent configuration."""
     workspace: str = "~/.nanobot/workspace"
@@ -44,11 +56,27 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    models: ModelRoutingConfig = Field(default_factory=ModelRoutingConfig)
+
+
+class SubagentConfig(BaseModel):
+    """Background subagent pool configuration."""
+    max_concurrent: int = 3  # Subagents running at once; the rest wait in the queue
+    max_queued: int = 20  # Spawns beyond this (running + waiting) are rejected
+    max_per_origin: int = 5  # Running + waiting subagents per chat
+    timeout_s: int = 900  # A subagent running longer than this is stopped
+    max_iterations: int = 15
+    history: int = 50  # Finished subagents kept for list/status
+    isolation: str = "inline"  # "inline" or "process" (each subagent in its own worker process)
+    max_memory_mb: int = 2048  # Address-space limit per worker process (0 = unlimited)
+    max_cpu_s: int = 0  # CPU-time limit per worker process (0 = unlimited)
+    max_restarts: int = 1  # Times a crashed worker is restarted (only before any tool ran)
 
 
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    subagents: SubagentConfig = Field(default_factory=SubagentConfig)
 
 
 class ProviderConfig(BaseModel):
@@ -57,6 +85,29 @@ class ProviderConfig(BaseModel):
     api_base: str | None = None
 
 
+class RateLimitConfig(BaseModel):
+    """Client-side LLM rate limits shared by all callers (0 = unlimited)."""
+    max_concurrency: int = 0  # Max simultaneous in-flight requests
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0  # Estimated from messages before sending, corrected from usage
+
+
+class FallbackConfig(BaseModel):
+    """Model fallback and hedged requests across providers."""
+    models: list[str] = Field(default_factory=list)  # Tried in order after agents.defaults.model
+    hedge_after_s: float = 0  # Duplicate a slow request to the next model after this many seconds (0 = off)
+    failure_threshold: int = 3  # Consecutive failures before a backend's circuit opens
+    cooldown_s: float = 30.0  # How long an open circuit skips the backend
+
+
+class ResponseCacheConfig(BaseModel):
+    """Exact-match LLM response cache (opt-in)."""
+    enabled: bool = False
+    ttl_s: int = 24 * 3600
+    max_bytes: int = 64 * 1024 * 1024  # Total on-disk budget, least recently used evicted first
+    max_entry_bytes: int = 1024 * 1024  # Larger responses are not cached
+
+
 class ProvidersConfig(BaseModel):
     """Configuration for LLM providers."""
     anthropic: ProviderConfig = Field(default_factory=ProviderConfig)
@@ -67,6 +118,9 @@ class ProvidersConfig(BaseModel):
     zhipu: ProviderConfig = Field(default_factory=ProviderConfig)
     vllm: ProviderConfig = Field(default_factory=ProviderConfig)
     gemini: ProviderConfig = Field(default_factory=ProviderConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    fallback: FallbackConfig = Field(default_factory=FallbackConfig)
+    cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
 
 
 class GatewayConfig(BaseModel):
@@ -75,21 +129,58 @@ class GatewayConfig(BaseModel):
     port: int = 18790
 
 
+class CronConfig(BaseModel):
+    """Scheduled job execution."""
+    max_concurrent: int = 4  # Due jobs running at once; the rest wait for a slot
+    misfire: str = "run_once"  # Missed runs (downtime, long runs): "skip", "run_once" or "catch_up"
+    catch_up_limit: int = 10  # Most recent missed runs replayed under "catch_up"
+    history: int = 50  # Runs kept per job in cron/runs.json
+
+
+class HeartbeatConfig(BaseModel):
+    """Periodic HEARTBEAT.md checks."""
+    enabled: bool = True
+    interval_s: int = 30 * 60
+    watch: bool = True  # Also check promptly when HEARTBEAT.md is edited
+    debounce_s: float = 2.0  # Quiet period after an edit before checking
+    poll_s: float = 5.0  # Change polling interval where inotify is unavailable
+    ok_ttl_s: int = 2 * 3600  # Skip checks of an unchanged file this long after HEARTBEAT_OK
+    adaptive: bool = False  # Back off while idle (up to maxIntervalS), tighten after actions
+    min_interval_s: int = 5 * 60  # Interval right after a tick that took action
+    max_interval_s: int = 4 * 3600  # Longest interval reached by backing off
+    backoff: float = 2.0  # Interval multiplier per idle tick
+    active_hours: str = ""  # e.g. "08:00-22:00": interval capped at intervalS during these hours
+    timezone: str = ""  # IANA timezone for activeHours (empty = local time)
+    jitter: float = 0.1  # Random +/- fraction applied to each delay
+
+
 class WebSearchConfig(BaseModel):
     """Web search tool configuration."""
     api_key: str = ""  # Brave Search API key
     max_results: int = 5
+    cache_ttl: int = 600  # Seconds to reuse results for a repeated query (0 = off)
+
+
+class WebFetchConfig(BaseModel):
+    """Web fetch tool configuration."""
+    max_response_bytes: int = 5 * 1024 * 1024  # Bodies are cut off at this size while downloading
+    cache: bool = True  # Disk cache honoring ETag/Last-Modified/Cache-Control (~/.nanobot/cache/http)
+    cache_max_bytes: int = 64 * 1024 * 1024
 
 
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    fetch: WebFetchConfig = Field(default_factory=WebFetchConfig)
 
 
 class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
     timeout: int = 60
     restrict_to_workspace: bool = False  # If true, block commands accessing paths outside workspace
+    progress_interval: int = 15  # Seconds between progress messages for long-running commands (0 = off)
+    persistent_shell: bool = False  # Keep one bash per chat so cwd/env/venv persist between commands
+    shell_idle_timeout: int = 600  # Seconds before an idle persistent shell is closed
 
 
 class SolanaRiskLimits(BaseModel):
@@ -122,10 +213,18 @@ class SolanaTradingConfig(BaseModel):
     exit_check_seconds: int = 120  # How often to check SL/TP
 
 
+class SearchToolConfig(BaseModel):
+    """Workspace search tool configuration."""
+    index: bool = False  # Keep an in-memory trigram index of the workspace to speed up repeated searches
+    max_file_bytes: int = 2 * 1024 * 1024  # Larger files are skipped
+    max_results: int = 100
+
+
 class ToolsConfig(BaseModel):
     """Tools configuration."""
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
+    search: SearchToolConfig = Field(default_factory=SearchToolConfig)
     solana_trading: SolanaTradingConfig = Field(default_factory=SolanaTradingConfig)
 
 
@@ -135,6 +234,8 @@ class Config(BaseSettings):
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
+    cron: CronConfig = Field(default_factory=CronConfig)
+    heartbeat: HeartbeatConfig = Field(default_factory=HeartbeatConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
     
     @property
@@ -156,6 +257,25 @@ class Config(BaseSettings):
             None
         )
     
+    def get_provider_for_model(self, model: str) -> ProviderConfig | None:
+        """Get the configured provider whose API serves the given model, if any."""
+        m = model.lower()
+        p = self.providers
+        candidates = [
+            (m.startswith("openrouter/"), p.openrouter),
+            ("deepseek" in m, p.deepseek),
+            ("anthropic" in m or "claude" in m, p.anthropic),
+            ("openai" in m or "gpt" in m, p.openai),
+            ("gemini" in m, p.gemini),
+            ("zhipu" in m or "glm" in m or "zai" in m, p.zhipu),
+            ("groq" in m, p.groq),
+            ("vllm" in m, p.vllm),
+        ]
+        for matches, provider in candidates:
+            if matches and (provider.api_key or provider.api_base):
+                return provider
+        return None
+    
     def get_api_base(self) -> str | None:
         """Get API base URL if using OpenRouter, Zhipu or vLLM."""
         if self.providers.openrouter.api_key:
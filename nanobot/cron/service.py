@@ -1,56 +1,269 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
+import heapq
 import json
+import math
+import re
 import time
 import uuid
+from collections import deque
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Coroutine
+from zoneinfo import ZoneInfo
 
 from loguru import logger
 
-from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronRun, CronSchedule, CronStore
+from nanobot.utils.helpers import atomic_write
+
+# Longest the scheduler sleeps without re-checking, so wall-clock jumps are noticed
+MAX_SLEEP_S = 60.0
+
+# Runs less late than this count as on time rather than missed
+MISFIRE_GRACE_MS = 1000
+
+# State changes from job runs are coalesced into one write per this many seconds
+SAVE_DELAY_S = 1.0
+
+# Characters of each run's response kept in the run history
+OUTPUT_PREVIEW_CHARS = 300
 
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
-def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
-    """Compute next run time in ms."""
+def _cron_iter(schedule: CronSchedule, start_ms: int):
+    from croniter import croniter
+    
+    if schedule.tz:
+        start = datetime.fromtimestamp(start_ms / 1000, ZoneInfo(schedule.tz))
+        return croniter(schedule.expr, start)
+    return croniter(schedule.expr, start_ms / 1000)
+
+
+def _next_slot(schedule: CronSchedule, anchor_ms: int, after_ms: int) -> int | None:
+    """First scheduled time strictly after after_ms, in ms."""
     if schedule.kind == "at":
-        return schedule.at_ms if schedule.at_ms and schedule.at_ms > now_ms else None
+        return schedule.at_ms if schedule.at_ms and schedule.at_ms > after_ms else None
     
     if schedule.kind == "every":
         if not schedule.every_ms or schedule.every_ms <= 0:
             return None
-        # Next interval from now
-        return now_ms + schedule.every_ms
+        # Aligned to the anchor, so run time never shifts the cadence
+        if after_ms < anchor_ms:
+            return anchor_ms
+        return anchor_ms + ((after_ms - anchor_ms) // schedule.every_ms + 1) * schedule.every_ms
     
     if schedule.kind == "cron" and schedule.expr:
         try:
-            from croniter import croniter
-            cron = croniter(schedule.expr, time.time())
-            next_time = cron.get_next()
-            return int(next_time * 1000)
+            return int(_cron_iter(schedule, after_ms).get_next(float) * 1000)
         except Exception:
             return None
     
     return None
 
 
+def _recent_slots(schedule: CronSchedule, anchor_ms: int, now_ms: int, n: int) -> list[int]:
+    """Up to n most recent scheduled times at or before now_ms, newest first."""
+    if schedule.kind == "at":
+        return [schedule.at_ms] if schedule.at_ms and schedule.at_ms <= now_ms else []
+    
+    if schedule.kind == "every":
+        if not schedule.every_ms or schedule.every_ms <= 0 or now_ms < anchor_ms:
+            return []
+        k = (now_ms - anchor_ms) // schedule.every_ms
+        return [anchor_ms + (k - i) * schedule.every_ms for i in range(min(n, k + 1))]
+    
+    if schedule.kind == "cron" and schedule.expr:
+        try:
+            it = _cron_iter(schedule, now_ms + 1)
+            return [int(it.get_prev(float) * 1000) for _ in range(n)]
+        except Exception:
+            return []
+    
+    return []
+
+
+def _resolve_next_run(
+    schedule: CronSchedule,
+    anchor_ms: int,
+    after_ms: int,
+    now_ms: int,
+    misfire: str,
+    catch_up_limit: int,
+) -> int | None:
+    """
+    Next run time after after_ms (the last slot handled), applying the
+    misfire policy if slots between after_ms and now were missed.
+    
+    skip: resume at the next slot that isn't already past.
+    run_once: run once for the most recent missed slot.
+    catch_up: run each missed slot in turn, at most catch_up_limit of the
+    most recent ones.
+    
+    Slots less than MISFIRE_GRACE_MS late aren't treated as missed.
+    """
+    first = _next_slot(schedule, anchor_ms, after_ms)
+    if first is None or first >= now_ms - MISFIRE_GRACE_MS:
+        return first
+    if misfire == "skip":
+        return _next_slot(schedule, anchor_ms, now_ms - MISFIRE_GRACE_MS - 1)
+    keep = max(1, catch_up_limit) if misfire == "catch_up" else 1
+    missed = [t for t in _recent_slots(schedule, anchor_ms, now_ms, keep) if t >= first]
+    return min(missed) if missed else first
+
+
+def _percentile(values: list[int], pct: float) -> int | None:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+def _run_to_dict(r: CronRun) -> dict[str, Any]:
+    return {
+        "startedAtMs": r.started_at_ms,
+        "finishedAtMs": r.finished_at_ms,
+        "status": r.status,
+        "error": r.error,
+        "output": r.output,
+        "promptTokens": r.prompt_tokens,
+        "completionTokens": r.completion_tokens,
+    }
+
+
+def _run_from_dict(r: dict[str, Any]) -> CronRun:
+    return CronRun(
+        started_at_ms=r["startedAtMs"],
+        finished_at_ms=r.get("finishedAtMs", r["startedAtMs"]),
+        status=r.get("status", "ok"),
+        error=r.get("error"),
+        output=r.get("output", ""),
+        prompt_tokens=r.get("promptTokens", 0),
+        completion_tokens=r.get("completionTokens", 0),
+    )
+
+
+def _job_to_dict(j: CronJob) -> dict[str, Any]:
+    return {
+        "id": j.id,
+        "name": j.name,
+        "enabled": j.enabled,
+        "schedule": {
+            "kind": j.schedule.kind,
+            "atMs": j.schedule.at_ms,
+            "everyMs": j.schedule.every_ms,
+            "anchorMs": j.schedule.anchor_ms,
+            "expr": j.schedule.expr,
+            "tz": j.schedule.tz,
+            "misfire": j.schedule.misfire,
+        },
+        "payload": {
+            "kind": j.payload.kind,
+            "message": j.payload.message,
+            "deliver": j.payload.deliver,
+            "channel": j.payload.channel,
+            "to": j.payload.to,
+            "tool": j.payload.tool,
+            "args": j.payload.args,
+            "escalateIf": j.payload.escalate_if,
+        },
+        "state": {
+            "nextRunAtMs": j.state.next_run_at_ms,
+            "lastRunAtMs": j.state.last_run_at_ms,
+            "lastStatus": j.state.last_status,
+            "lastError": j.state.last_error,
+        },
+        "createdAtMs": j.created_at_ms,
+        "updatedAtMs": j.updated_at_ms,
+        "deleteAfterRun": j.delete_after_run,
+    }
+
+
+def _job_from_dict(j: dict[str, Any]) -> CronJob:
+    return CronJob(
+        id=j["id"],
+        name=j["name"],
+        enabled=j.get("enabled", True),
+        schedule=CronSchedule(
+            kind=j["schedule"]["kind"],
+            at_ms=j["schedule"].get("atMs"),
+            every_ms=j["schedule"].get("everyMs"),
+            anchor_ms=j["schedule"].get("anchorMs"),
+            expr=j["schedule"].get("expr"),
+            tz=j["schedule"].get("tz"),
+            misfire=j["schedule"].get("misfire"),
+        ),
+        payload=CronPayload(
+            kind=j["payload"].get("kind", "agent_turn"),
+            message=j["payload"].get("message", ""),
+            deliver=j["payload"].get("deliver", False),
+            channel=j["payload"].get("channel"),
+            to=j["payload"].get("to"),
+            tool=j["payload"].get("tool"),
+            args=j["payload"].get("args") or {},
+            escalate_if=j["payload"].get("escalateIf"),
+        ),
+        state=CronJobState(
+            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
+            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
+            last_status=j.get("state", {}).get("lastStatus"),
+            last_error=j.get("state", {}).get("lastError"),
+        ),
+        created_at_ms=j.get("createdAtMs", 0),
+        updated_at_ms=j.get("updatedAtMs", 0),
+        delete_after_run=j.get("deleteAfterRun", False),
+    )
+
+
 class CronService:
-    """Service for managing and executing scheduled jobs."""
+    """
+    Service for managing and executing scheduled jobs.
+    
+    Due times live in a min-heap of (next_run_at_ms, job_id) entries, so
+    finding due jobs and the next wake-up doesn't scan every job. Entries
+    are invalidated lazily: one whose time no longer matches the job's
+    state is dropped when it reaches the top. Due jobs run concurrently,
+    at most max_concurrent at once, and a job never overlaps with itself.
+    While the scheduler runs, saves are coalesced into one write per
+    SAVE_DELAY_S, and runs.json is only rewritten when a history changed.
+    
+    The last history_size runs of each job are kept in runs.json next to
+    the job store.
+    """
     
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        max_concurrent: int = 4,
+        misfire: str = "run_once",
+        catch_up_limit: int = 10,
+        history_size: int = 50,
     ):
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
+        self.max_concurrent = max(1, max_concurrent)
+        self.misfire = misfire  # Policy for jobs whose schedule doesn't set one
+        self.catch_up_limit = catch_up_limit
+        self.history_size = max(1, history_size)
+        self.runs_path = store_path.with_name("runs.json")
         self._store: CronStore | None = None
+        self._jobs: dict[str, CronJob] = {}
+        self._heap: list[tuple[int, str]] = []
+        self._active: dict[str, asyncio.Task] = {}  # job_id -> running (or slot-waiting) execution
+        self._slots: asyncio.Semaphore | None = None
+        self._wake: asyncio.Event | None = None
         self._timer_task: asyncio.Task | None = None
+        self._save_task: asyncio.Task | None = None
+        self._dirty = False  # Jobs changed since the last save
+        self._runs: dict[str, deque[CronRun]] | None = None
+        self._runs_dirty = False  # Run histories changed since the last save
+        self._in_flight: dict[str, CronRun] = {}  # job_id -> run being executed
         self._running = False
     
     def _load_store(self) -> CronStore:
@@ -61,97 +274,92 @@ class CronService:
         if self.store_path.exists():
             try:
                 data = json.loads(self.store_path.read_text())
-                jobs = []
-                for j in data.get("jobs", []):
-                    jobs.append(CronJob(
-                        id=j["id"],
-                        name=j["name"],
-                        enabled=j.get("enabled", True),
-                        schedule=CronSchedule(
-                            kind=j["schedule"]["kind"],
-                            at_ms=j["schedule"].get("atMs"),
-                            every_ms=j["schedule"].get("everyMs"),
-                            expr=j["schedule"].get("expr"),
-                            tz=j["schedule"].get("tz"),
-                        ),
-                        payload=CronPayload(
-                            kind=j["payload"].get("kind", "agent_turn"),
-                            message=j["payload"].get("message", ""),
-                            deliver=j["payload"].get("deliver", False),
-                            channel=j["payload"].get("channel"),
-                            to=j["payload"].get("to"),
-                        ),
-                        state=CronJobState(
-                            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
-                            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
-                            last_status=j.get("state", {}).get("lastStatus"),
-                            last_error=j.get("state", {}).get("lastError"),
-                        ),
-                        created_at_ms=j.get("createdAtMs", 0),
-                        updated_at_ms=j.get("updatedAtMs", 0),
-                        delete_after_run=j.get("deleteAfterRun", False),
-                    ))
-                self._store = CronStore(jobs=jobs)
+                self._store = CronStore(jobs=[_job_from_dict(j) for j in data.get("jobs", [])])
             except Exception as e:
                 logger.warning(f"Failed to load cron store: {e}")
                 self._store = CronStore()
         else:
             self._store = CronStore()
         
+        self._jobs = {j.id: j for j in self._store.jobs}
+        self._rebuild_heap()
         return self._store
     
+    def _mark_dirty(self) -> None:
+        """Flag the job table for the next coalesced save of jobs.json."""
+        self._dirty = True
+    
     def _save_store(self) -> None:
-        """Save jobs to disk."""
+        """Save jobs to disk, and run histories if they changed."""
         if not self._store:
             return
-        
-        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._save_task:
+            self._save_task.cancel()
+            self._save_task = None
         
         data = {
             "version": self._store.version,
-            "jobs": [
-                {
-                    "id": j.id,
-                    "name": j.name,
-                    "enabled": j.enabled,
-                    "schedule": {
-                        "kind": j.schedule.kind,
-                        "atMs": j.schedule.at_ms,
-                        "everyMs": j.schedule.every_ms,
-                        "expr": j.schedule.expr,
-                        "tz": j.schedule.tz,
-                    },
-                    "payload": {
-                        "kind": j.payload.kind,
-                        "message": j.payload.message,
-                        "deliver": j.payload.deliver,
-                        "channel": j.payload.channel,
-                        "to": j.payload.to,
-                    },
-                    "state": {
-                        "nextRunAtMs": j.state.next_run_at_ms,
-                        "lastRunAtMs": j.state.last_run_at_ms,
-                        "lastStatus": j.state.last_status,
-                        "lastError": j.state.last_error,
-                    },
-                    "createdAtMs": j.created_at_ms,
-                    "updatedAtMs": j.updated_at_ms,
-                    "deleteAfterRun": j.delete_after_run,
-                }
-                for j in self._store.jobs
-            ]
+            "jobs": [_job_to_dict(j) for j in self._store.jobs],
+        }
+        atomic_write(self.store_path, json.dumps(data, indent=2))
+        self._dirty = False
+        if self._runs_dirty:
+            self._save_runs()
+    
+    def _load_runs(self) -> dict[str, deque[CronRun]]:
+        """Load run histories from disk."""
+        if self._runs is not None:
+            return self._runs
+        
+        self._runs = {}
+        if self.runs_path.exists():
+            try:
+                data = json.loads(self.runs_path.read_text())
+                for job_id, runs in data.get("jobs", {}).items():
+                    self._runs[job_id] = deque(
+                        (_run_from_dict(r) for r in runs), maxlen=self.history_size
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to load cron run history: {e}")
+        return self._runs
+    
+    def _save_runs(self) -> None:
+        """Save run histories to disk."""
+        data = {
+            "version": 1,
+            "jobs": {
+                job_id: [_run_to_dict(r) for r in runs]
+                for job_id, runs in self._load_runs().items()
+            },
         }
+        atomic_write(self.runs_path, json.dumps(data, separators=(",", ":")))
+        self._runs_dirty = False
+    
+    def _request_save(self) -> None:
+        """Save soon: coalesced while the scheduler runs, immediately otherwise."""
+        if not self._running:
+            self._save_store()
+            return
+        if self._save_task and not self._save_task.done():
+            return
         
-        self.store_path.write_text(json.dumps(data, indent=2))
+        async def save_later():
+            await asyncio.sleep(SAVE_DELAY_S)
+            self._save_task = None
+            self._save_store()
+        
+        self._save_task = asyncio.create_task(save_later())
     
     async def start(self) -> None:
         """Start the cron service."""
         self._running = True
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._wake = asyncio.Event()
         self._load_store()
         self._recompute_next_runs()
         self._save_store()
-        self._arm_timer()
-        logger.info(f"Cron service started with {len(self._store.jobs if self._store else [])} jobs")
+        self._timer_task = asyncio.create_task(self._run_loop())
+        logger.info(f"Cron service started with {len(self._jobs)} jobs")
     
     def stop(self) -> None:
         """Stop the cron service."""
@@ -159,63 +367,113 @@ class CronService:
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
+        for task in self._active.values():
+            task.cancel()
+        self._active.clear()
+        if self._store and (self._dirty or self._runs_dirty or self._save_task):
+            self._save_store()
+    
+    def _next_run(self, job: CronJob, after_ms: int) -> int | None:
+        """Next run time of a job after after_ms, with its misfire policy applied."""
+        return _resolve_next_run(
+            job.schedule,
+            job.schedule.anchor_ms or job.created_at_ms,
+            after_ms,
+            _now_ms(),
+            job.schedule.misfire or self.misfire,
+            self.catch_up_limit,
+        )
     
     def _recompute_next_runs(self) -> None:
-        """Recompute next run times for all enabled jobs."""
+        """Bring next run times up to date, applying misfire policies to runs missed while stopped."""
         if not self._store:
             return
         now = _now_ms()
         for job in self._store.jobs:
-            if job.enabled:
-                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+            if not job.enabled:
+                continue
+            stored = job.state.next_run_at_ms
+            # A stored time is the first slot not yet run; resolve from just before it
+            job.state.next_run_at_ms = self._next_run(job, stored - 1 if stored else now)
+            if stored and stored < now - MISFIRE_GRACE_MS:
+                policy = job.schedule.misfire or self.misfire
+                since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stored / 1000))
+                logger.info(f"Cron: job '{job.name}' missed runs since {since} (misfire policy: {policy})")
+            if job.state.next_run_at_ms != stored:
+                self._mark_dirty()
+        self._rebuild_heap()
+    
+    # ========== Scheduling ==========
+    
+    def _rebuild_heap(self) -> None:
+        self._heap = [
+            (j.state.next_run_at_ms, j.id) for j in self._jobs.values()
+            if j.enabled and j.state.next_run_at_ms
+        ]
+        heapq.heapify(self._heap)
+    
+    def _push(self, job: CronJob) -> None:
+        """Queue a job at its current next_run_at_ms and wake the scheduler."""
+        if job.enabled and job.state.next_run_at_ms:
+            heapq.heappush(self._heap, (job.state.next_run_at_ms, job.id))
+        self._arm_timer()
+    
+    def _is_current(self, entry: tuple[int, str]) -> bool:
+        run_at, job_id = entry
+        job = self._jobs.get(job_id)
+        return job is not None and job.enabled and job.state.next_run_at_ms == run_at
     
     def _get_next_wake_ms(self) -> int | None:
         """Get the earliest next run time across all jobs."""
-        if not self._store:
-            return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs 
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
     
     def _arm_timer(self) -> None:
-        """Schedule the next timer tick."""
-        if self._timer_task:
-            self._timer_task.cancel()
-        
-        next_wake = self._get_next_wake_ms()
-        if not next_wake or not self._running:
-            return
-        
-        delay_ms = max(0, next_wake - _now_ms())
-        delay_s = delay_ms / 1000
-        
-        async def tick():
-            await asyncio.sleep(delay_s)
-            if self._running:
-                await self._on_timer()
-        
-        self._timer_task = asyncio.create_task(tick())
+        """Wake the scheduler so it re-reads the heap."""
+        if self._running and self._wake:
+            self._wake.set()
     
-    async def _on_timer(self) -> None:
-        """Handle timer tick - run due jobs."""
-        if not self._store:
-            return
-        
+    async def _run_loop(self) -> None:
+        """Sleep until the earliest due time (or a wake-up), then dispatch due jobs."""
+        while self._running:
+            self._dispatch_due()
+            next_wake = self._get_next_wake_ms()
+            delay_s = MAX_SLEEP_S if next_wake is None else max(0, next_wake - _now_ms()) / 1000
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=min(delay_s, MAX_SLEEP_S))
+            except asyncio.TimeoutError:
+                pass
+    
+    def _dispatch_due(self) -> None:
+        """Pop every due job off the heap and start it in the background."""
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
-        
-        for job in due_jobs:
-            await self._execute_job(job)
-        
-        self._save_store()
-        self._arm_timer()
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+            job = self._jobs[entry[1]]
+            if job.id in self._active:
+                # Only reachable through run_job(); the scheduler re-queues a job when it finishes
+                logger.debug(f"Cron: job '{job.name}' is still running, skipping this run")
+                continue
+            self._active[job.id] = asyncio.create_task(self._run_job_task(job))
+    
+    async def _run_job_task(self, job: CronJob) -> None:
+        try:
+            async with self._slots:
+                await self._execute_job(job)
+        finally:
+            self._active.pop(job.id, None)
+        self._request_save()
+        self._push(job)
     
     async def _execute_job(self, job: CronJob) -> None:
         """Execute a single job."""
         start_ms = _now_ms()
+        slot_ms = job.state.next_run_at_ms
+        run = self._in_flight[job.id] = CronRun(started_at_ms=start_ms)
         logger.info(f"Cron: executing job '{job.name}' ({job.id})")
         
         try:
@@ -225,26 +483,56 @@ class CronService:
             
             job.state.last_status = "ok"
             job.state.last_error = None
+            run.output = (response or "")[:OUTPUT_PREVIEW_CHARS]
             logger.info(f"Cron: job '{job.name}' completed")
             
         except Exception as e:
             job.state.last_status = "error"
             job.state.last_error = str(e)
+            run.status = "error"
+            run.error = str(e)[:OUTPUT_PREVIEW_CHARS]
             logger.error(f"Cron: job '{job.name}' failed: {e}")
         
+        finally:
+            self._in_flight.pop(job.id, None)
+        
+        run.finished_at_ms = _now_ms()
+        self._record_run(job.id, run)
         job.state.last_run_at_ms = start_ms
         job.updated_at_ms = _now_ms()
+        self._mark_dirty()
         
         # Handle one-shot jobs
         if job.schedule.kind == "at":
             if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                self._delete(job.id)
             else:
                 job.enabled = False
                 job.state.next_run_at_ms = None
+        elif slot_ms is None:
+            job.state.next_run_at_ms = self._next_run(job, _now_ms())
         else:
-            # Compute next run
-            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            # Continue from the slot that ran, not from now, so runs don't drift by their
+            # duration. A manual run ahead of schedule leaves the pending slot in place.
+            job.state.next_run_at_ms = self._next_run(job, slot_ms if slot_ms <= start_ms else slot_ms - 1)
+    
+    def _delete(self, job_id: str) -> bool:
+        if self._jobs.pop(job_id, None) is None:
+            return False
+        self._store.jobs = [j for j in self._store.jobs if j.id != job_id]
+        self._dirty = True
+        if self._load_runs().pop(job_id, None) is not None:
+            self._runs_dirty = True
+        return True
+    
+    def _record_run(self, job_id: str, run: CronRun) -> None:
+        if job_id not in self._jobs:
+            return  # Removed while running
+        runs = self._load_runs()
+        if job_id not in runs:
+            runs[job_id] = deque(maxlen=self.history_size)
+        runs[job_id].append(run)
+        self._runs_dirty = True
     
     # ========== Public API ==========
     
@@ -263,10 +551,29 @@ class CronService:
         channel: str | None = None,
         to: str | None = None,
         delete_after_run: bool = False,
+        tool: str | None = None,
+        tool_args: dict[str, Any] | None = None,
+        escalate_if: str | None = None,
     ) -> CronJob:
-        """Add a new job."""
+        """
+        Add a new job.
+        
+        With tool set, the job calls that tool directly with tool_args
+        instead of running an agent turn; message then becomes the prompt
+        of an agent turn that runs only when the result matches escalate_if.
+        """
         store = self._load_store()
         now = _now_ms()
+        if schedule.tz:
+            try:
+                ZoneInfo(schedule.tz)
+            except (KeyError, ValueError):
+                raise ValueError(f"Unknown timezone: {schedule.tz}")
+        if escalate_if:
+            try:
+                re.compile(escalate_if)
+            except re.error as e:
+                raise ValueError(f"Invalid escalate_if pattern: {e}")
         
         job = CronJob(
             id=str(uuid.uuid4())[:8],
@@ -274,34 +581,38 @@ class CronService:
             enabled=True,
             schedule=schedule,
             payload=CronPayload(
-                kind="agent_turn",
+                kind="tool_call" if tool else "agent_turn",
                 message=message,
                 deliver=deliver,
                 channel=channel,
                 to=to,
+                tool=tool,
+                args=tool_args or {},
+                escalate_if=escalate_if,
             ),
-            state=CronJobState(next_run_at_ms=_compute_next_run(schedule, now)),
             created_at_ms=now,
             updated_at_ms=now,
             delete_after_run=delete_after_run,
         )
+        job.state.next_run_at_ms = self._next_run(job, now)
         
         store.jobs.append(job)
-        self._save_store()
-        self._arm_timer()
+        self._jobs[job.id] = job
+        self._mark_dirty()
+        self._request_save()
+        self._push(job)
         
         logger.info(f"Cron: added job '{name}' ({job.id})")
         return job
     
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        self._load_store()
+        removed = self._delete(job_id)
         
         if removed:
-            self._save_store()
+            # Its heap entry is dropped lazily
+            self._request_save()
             self._arm_timer()
             logger.info(f"Cron: removed job {job_id}")
         
@@ -309,38 +620,71 @@ class CronService:
     
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        self._load_store()
+        job = self._jobs.get(job_id)
+        if not job:
+            return None
+        job.enabled = enabled
+        job.updated_at_ms = _now_ms()
+        if enabled:
+            job.state.next_run_at_ms = self._next_run(job, _now_ms())
+        else:
+            job.state.next_run_at_ms = None
+        self._mark_dirty()
+        self._request_save()
+        if job.id not in self._active:
+            self._push(job)
+        return job
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
-        """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
-        return False
+        """Manually run a job. Fails if the job is disabled (unless forced) or already running."""
+        self._load_store()
+        job = self._jobs.get(job_id)
+        if not job or (not force and not job.enabled):
+            return False
+        if job.id in self._active:
+            logger.warning(f"Cron: job '{job.name}' is already running")
+            return False
+        self._active[job.id] = asyncio.current_task()
+        try:
+            await self._execute_job(job)
+        finally:
+            self._active.pop(job.id, None)
+        self._request_save()
+        self._push(job)
+        return True
+    
+    def add_usage(self, job_id: str, usage: dict[str, int]) -> None:
+        """Add LLM token usage to a job's in-progress run (call from on_job)."""
+        run = self._in_flight.get(job_id)
+        if run:
+            run.prompt_tokens += usage.get("prompt_tokens", 0)
+            run.completion_tokens += usage.get("completion_tokens", 0)
+    
+    def get_history(self, job_id: str) -> list[CronRun]:
+        """Recorded runs of a job, oldest first."""
+        return list(self._load_runs().get(job_id, ()))
+    
+    def run_stats(self, job_id: str) -> dict[str, Any]:
+        """Summary of a job's recorded runs: counts, p50/p95 duration and token averages."""
+        runs = self.get_history(job_id)
+        durations = [r.duration_ms for r in runs]
+        return {
+            "runs": len(runs),
+            "errors": sum(1 for r in runs if r.status == "error"),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+            "avg_tokens": (
+                sum(r.prompt_tokens + r.completion_tokens for r in runs) // len(runs) if runs else 0
+            ),
+        }
     
     def status(self) -> dict:
         """Get service status."""
-        store = self._load_store()
+        self._load_store()
         return {
             "enabled": self._running,
-            "jobs": len(store.jobs),
+            "jobs": len(self._jobs),
+            "running": len(self._active),
             "next_wake_at_ms": self._get_next_wake_ms(),
         }
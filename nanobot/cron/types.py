@@ -1,7 +1,7 @@
 """Cron types."""
 
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Any, Literal
 
 
 @dataclass
@@ -12,17 +12,28 @@ class CronSchedule:
     at_ms: int | None = None
     # For "every": interval in ms
     every_ms: int | None = None
+    # For "every": runs happen at anchor_ms + k * every_ms (defaults to the job's creation time)
+    anchor_ms: int | None = None
     # For "cron": cron expression (e.g. "0 9 * * *")
     expr: str | None = None
-    # Timezone for cron expressions
+    # Timezone for cron expressions (IANA name, e.g. "America/New_York"; default UTC)
     tz: str | None = None
+    # What to do with runs missed while down or busy: "skip", "run_once" or "catch_up"
+    # (None = the service default)
+    misfire: Literal["skip", "run_once", "catch_up"] | None = None
 
 
 @dataclass
 class CronPayload:
     """What to do when the job runs."""
-    kind: Literal["system_event", "agent_turn"] = "agent_turn"
+    kind: Literal["system_event", "agent_turn", "tool_call"] = "agent_turn"
+    # For "agent_turn": the prompt. For "tool_call": the prompt of the escalation turn
     message: str = ""
+    # For "tool_call": registered tool invoked directly with fixed arguments, no LLM involved
+    tool: str | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+    # For "tool_call": regex; an agent turn runs only when the tool result matches it
+    escalate_if: str | None = None
     # Deliver response to channel
     deliver: bool = False
     channel: str | None = None  # e.g. "whatsapp"
@@ -38,6 +49,22 @@ class CronJobState:
     last_error: str | None = None
 
 
+@dataclass
+class CronRun:
+    """One execution of a job, kept in the job's run history."""
+    started_at_ms: int
+    finished_at_ms: int = 0
+    status: Literal["ok", "error"] = "ok"
+    error: str | None = None
+    output: str = ""  # Truncated response
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    
+    @property
+    def duration_ms(self) -> int:
+        return self.finished_at_ms - self.started_at_ms
+
+
 @dataclass
 class CronJob:
     """A scheduled job."""
@@ -1,11 +1,21 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
 import asyncio
+import hashlib
+import json
+import random
+import time
+from datetime import datetime
+from datetime import time as dt_time
 from pathlib import Path
 from typing import Any, Callable, Coroutine
+from zoneinfo import ZoneInfo
 
 from loguru import logger
 
+from nanobot.heartbeat.watcher import FileWatcher
+from nanobot.utils.helpers import atomic_write
+
 # Default interval: 30 minutes
 DEFAULT_HEARTBEAT_INTERVAL_S = 30 * 60
 
@@ -18,6 +28,17 @@ If nothing needs attention, reply with just: HEARTBEAT_OK"""
 HEARTBEAT_OK_TOKEN = "HEARTBEAT_OK"
 
 
+def _parse_active_hours(spec: str) -> tuple[dt_time, dt_time] | None:
+    """Parse "HH:MM-HH:MM" (may wrap past midnight); empty means no active hours."""
+    if not spec:
+        return None
+    try:
+        start, end = spec.split("-")
+        return dt_time.fromisoformat(start.strip()), dt_time.fromisoformat(end.strip())
+    except ValueError:
+        raise ValueError(f"Invalid active hours {spec!r}, expected HH:MM-HH:MM")
+
+
 def _is_heartbeat_empty(content: str | None) -> bool:
     """Check if HEARTBEAT.md has no actionable content."""
     if not content:
@@ -41,6 +62,21 @@ class HeartbeatService:
     
     The agent reads HEARTBEAT.md from the workspace and executes any
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
+    
+    With watch enabled, edits to HEARTBEAT.md trigger a tick once the file
+    has been quiet for debounce_s, instead of waiting for the interval.
+    After a HEARTBEAT_OK, ticks are skipped without calling the agent while
+    the file's content hash is unchanged, for up to ok_ttl_s (so time-based
+    tasks in an unchanged file are still rechecked).
+    
+    With adaptive enabled (off by default), the interval doubles (by
+    backoff) after each idle tick, up to max_interval_s, and drops to
+    min_interval_s after a tick that took action. During active_hours it
+    never exceeds interval_s. Each delay is jittered by +/- jitter so ticks
+    don't line up with cron bursts.
+    
+    With status_path set, status() is written there after every tick, for
+    `nanobot status` to read.
     """
     
     def __init__(
@@ -49,13 +85,46 @@ class HeartbeatService:
         on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
+        watch: bool = True,
+        debounce_s: float = 2.0,
+        poll_s: float = 5.0,
+        ok_ttl_s: int = 2 * 3600,
+        adaptive: bool = False,
+        min_interval_s: int = 5 * 60,
+        max_interval_s: int = 4 * 3600,
+        backoff: float = 2.0,
+        active_hours: str = "",
+        timezone: str = "",
+        jitter: float = 0.1,
+        status_path: Path | None = None,
     ):
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
         self.interval_s = interval_s
         self.enabled = enabled
+        self.watch = watch
+        self.debounce_s = debounce_s
+        self.poll_s = poll_s
+        self.ok_ttl_s = ok_ttl_s
+        self.adaptive = adaptive
+        self.min_interval_s = min(min_interval_s, interval_s)
+        self.max_interval_s = max(max_interval_s, interval_s)
+        self.backoff = max(1.0, backoff)
+        self.active_hours = _parse_active_hours(active_hours)
+        self.tz = ZoneInfo(timezone) if timezone else None
+        self.jitter = min(max(jitter, 0.0), 0.5)
+        self.status_path = status_path
+        self._interval = float(interval_s)  # Current (adapted) interval
+        self._idle_streak = 0
+        self._next_tick_at: float | None = None
+        self._started_at = 0.0
+        self._stats = {"ticks": 0, "llm_calls": 0, "memo_skips": 0, "empty": 0, "actions": 0}
         self._running = False
         self._task: asyncio.Task | None = None
+        self._watcher: FileWatcher | None = None
+        self._ok_hash: str | None = None  # Content hash at the last HEARTBEAT_OK
+        self._tick_hash: str | None = None  # Content hash when the last tick finished
+        self._ok_at = 0.0
     
     @property
     def heartbeat_file(self) -> Path:
@@ -70,6 +139,10 @@ class HeartbeatService:
                 return None
         return None
     
+    def _content_hash(self) -> str | None:
+        content = self._read_heartbeat_file()
+        return hashlib.sha256(content.encode("utf-8")).hexdigest() if content is not None else None
+    
     async def start(self) -> None:
         """Start the heartbeat service."""
         if not self.enabled:
@@ -77,8 +150,13 @@ class HeartbeatService:
             return
         
         self._running = True
+        self._started_at = time.time()
+        if self.watch:
+            self._watcher = FileWatcher(self.heartbeat_file, poll_s=self.poll_s)
+            self._watcher.start()
         self._task = asyncio.create_task(self._run_loop())
-        logger.info(f"Heartbeat started (every {self.interval_s}s)")
+        watching = f", watching HEARTBEAT.md via {self._watcher.backend}" if self._watcher else ""
+        logger.info(f"Heartbeat started (every {self.interval_s}s{watching})")
     
     def stop(self) -> None:
         """Stop the heartbeat service."""
@@ -86,42 +164,148 @@ class HeartbeatService:
         if self._task:
             self._task.cancel()
             self._task = None
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+        self._save_status()
     
     async def _run_loop(self) -> None:
         """Main heartbeat loop."""
         while self._running:
             try:
-                await asyncio.sleep(self.interval_s)
+                await self._wait_for_tick()
                 if self._running:
-                    await self._tick()
+                    self._adapt(await self._tick())
+                    # Edits made during the tick (usually the agent's own) don't trigger another
+                    self._tick_hash = self._content_hash()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
     
-    async def _tick(self) -> None:
-        """Execute a single heartbeat tick."""
+    def _in_active_hours(self) -> bool:
+        if not self.active_hours:
+            return False
+        now = datetime.now(self.tz).time()
+        start, end = self.active_hours
+        if start <= end:
+            return start <= now < end
+        return now >= start or now < end  # Wraps past midnight
+    
+    def _next_delay(self) -> float:
+        interval = self._interval
+        if self._in_active_hours():
+            interval = min(interval, self.interval_s)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+    
+    def _adapt(self, outcome: str) -> None:
+        """Update the interval after a tick: "action", "ok", "memo", "empty" or "error"."""
+        if not self.adaptive or outcome == "error":
+            return
+        if outcome == "action":
+            self._idle_streak = 0
+            self._interval = float(self.min_interval_s)
+            reason = "action taken, tightening"
+        else:
+            self._idle_streak += 1
+            self._interval = min(self.max_interval_s, self._interval * self.backoff)
+            reason = f"idle x{self._idle_streak}, backing off"
+        active = " (capped: active hours)" if self._in_active_hours() else ""
+        logger.info(f"Heartbeat: interval now {self._interval / 60:.0f}m ({reason}){active}")
+    
+    def status(self) -> dict[str, Any]:
+        """Current interval, tick outcomes and LLM calls saved versus a fixed interval."""
+        uptime = time.time() - self._started_at if self._started_at else 0.0
+        fixed_calls = int(uptime // self.interval_s)
+        return {
+            "enabled": self._running,
+            "watching": self._watcher.backend if self._watcher else None,
+            "interval_s": round(self._interval),
+            "adaptive": self.adaptive,
+            "active_hours": self._in_active_hours(),
+            "idle_streak": self._idle_streak,
+            "next_tick_at": self._next_tick_at,
+            **self._stats,
+            # Each fixed-interval tick on a non-empty file would have been an LLM call
+            "llm_calls_saved": max(0, fixed_calls - self._stats["llm_calls"]),
+        }
+    
+    def _save_status(self) -> None:
+        if not self.status_path:
+            return
+        try:
+            atomic_write(self.status_path, json.dumps({**self.status(), "updated_at": time.time()}))
+        except OSError as e:
+            logger.warning(f"Failed to save heartbeat status: {e}")
+    
+    async def _wait_for_tick(self) -> None:
+        """Sleep for the next delay, or until HEARTBEAT.md changes and then settles."""
+        delay = self._next_delay()
+        self._next_tick_at = time.time() + delay
+        self._save_status()
+        logger.debug(f"Heartbeat: next check in {delay:.0f}s")
+        if not self._watcher:
+            await asyncio.sleep(delay)
+            return
+        
+        changed = self._watcher.changed
+        deadline = time.monotonic() + delay
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                return
+            # Wait for a quiet period so a burst of writes yields one tick
+            while True:
+                changed.clear()
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=self.debounce_s)
+                except asyncio.TimeoutError:
+                    break
+            if self._content_hash() != self._tick_hash:
+                logger.debug("Heartbeat: HEARTBEAT.md changed")
+                return
+            logger.debug("Heartbeat: HEARTBEAT.md unchanged since the last tick, ignoring")
+    
+    async def _tick(self) -> str:
+        """Execute a single heartbeat tick. Returns its outcome (see _adapt)."""
+        self._stats["ticks"] += 1
         content = self._read_heartbeat_file()
         
         # Skip if HEARTBEAT.md is empty or doesn't exist
         if _is_heartbeat_empty(content):
             logger.debug("Heartbeat: no tasks (HEARTBEAT.md empty)")
-            return
+            self._stats["empty"] += 1
+            return "empty"
+        
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if content_hash == self._ok_hash and time.time() - self._ok_at < self.ok_ttl_s:
+            logger.debug("Heartbeat: HEARTBEAT.md unchanged since last HEARTBEAT_OK, skipping")
+            self._stats["memo_skips"] += 1
+            return "memo"
         
         logger.info("Heartbeat: checking for tasks...")
         
-        if self.on_heartbeat:
-            try:
-                response = await self.on_heartbeat(HEARTBEAT_PROMPT)
+        if not self.on_heartbeat:
+            return "ok"
+        try:
+            self._stats["llm_calls"] += 1
+            response = await self.on_heartbeat(HEARTBEAT_PROMPT)
+            
+            # Check if agent said "nothing to do"
+            if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
+                logger.info("Heartbeat: OK (no action needed)")
+                self._ok_hash = content_hash
+                self._ok_at = time.time()
+                return "ok"
+            logger.info(f"Heartbeat: completed task")
+            self._ok_hash = None
+            self._stats["actions"] += 1
+            return "action"
                 
-                # Check if agent said "nothing to do"
-                if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
-                    logger.info("Heartbeat: OK (no action needed)")
-                else:
-                    logger.info(f"Heartbeat: completed task")
-                    
-            except Exception as e:
-                logger.error(f"Heartbeat execution failed: {e}")
+        except Exception as e:
+            logger.error(f"Heartbeat execution failed: {e}")
+            return "error"
     
     async def trigger_now(self) -> str | None:
         """Manually trigger a heartbeat."""
@@ -0,0 +1,153 @@
+"""File change notification: inotify on Linux, stat polling elsewhere."""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+from pathlib import Path
+
+from loguru import logger
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    name = ctypes.util.find_library("c")
+    if not name:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+    except OSError:
+        return None
+    if not (hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch")):
+        return None  # Not Linux
+    return libc
+
+
+class FileWatcher:
+    """
+    Sets `changed` when a file is created, written, replaced or deleted.
+
+    Watches the file's directory with inotify so atomic replaces (write to
+    a temp file, rename over) are seen too. Falls back to comparing stat
+    results every poll_s seconds when inotify is unavailable or the
+    directory doesn't exist. Events are not debounced; callers clear
+    `changed` and decide how long to wait for more.
+    """
+
+    def __init__(self, path: Path, poll_s: float = 5.0):
+        self.path = path
+        self.poll_s = poll_s
+        self.changed = asyncio.Event()
+        self.backend: str | None = None  # "inotify" or "polling" once started
+        self._fd: int | None = None
+        self._poll_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start watching (from within the event loop)."""
+        if self.backend:
+            return
+        if not self._start_inotify():
+            self._start_polling()
+        logger.debug(f"Watching {self.path} ({self.backend})")
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop_inotify()
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+        self.backend = None
+
+    def _start_inotify(self) -> bool:
+        libc = _load_libc()
+        if libc is None or not self.path.parent.is_dir():
+            return False
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        if libc.inotify_add_watch(fd, os.fsencode(self.path.parent), _WATCH_MASK) < 0:
+            logger.debug(f"inotify_add_watch failed: {os.strerror(ctypes.get_errno())}")
+            os.close(fd)
+            return False
+        self._fd = fd
+        asyncio.get_running_loop().add_reader(fd, self._on_inotify)
+        self.backend = "inotify"
+        return True
+
+    def _stop_inotify(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._fd)
+        except RuntimeError:
+            pass
+        os.close(self._fd)
+        self._fd = None
+
+    def _on_inotify(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.warning(f"inotify read failed ({e}), switching to polling")
+            self._fallback()
+            return
+
+        name = os.fsencode(self.path.name)
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            start = offset + _EVENT_HEADER.size
+            event_name = data[start:start + length].rstrip(b"\0")
+            offset = start + length
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                # The directory itself went away; polling copes with it coming back
+                self.changed.set()
+                self._fallback()
+                return
+            if event_name == name:
+                self.changed.set()
+
+    def _fallback(self) -> None:
+        self._stop_inotify()
+        self._start_polling()
+
+    def _start_polling(self) -> None:
+        self.backend = "polling"
+        self._poll_task = asyncio.create_task(self._poll())
+
+    def _signature(self) -> tuple[int, int, int] | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    async def _poll(self) -> None:
+        last = self._signature()
+        while True:
+            await asyncio.sleep(self.poll_s)
+            current = self._signature()
+            if current != last:
+                last = current
+                self.changed.set()
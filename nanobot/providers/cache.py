@@ -0,0 +1,208 @@
+"""Exact-match LLM response cache."""
+
+import hashlib
+import json
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterator
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.utils.disk_lru import DiskLRU
+
+_bypass: ContextVar[bool] = ContextVar("nanobot_llm_cache_bypass", default=False)
+_unkeyed: ContextVar[tuple[re.Pattern[str], ...]] = ContextVar("nanobot_llm_cache_unkeyed", default=())
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """
+    Skip the response cache for LLM calls made inside this block.
+
+    Use it around non-idempotent work, e.g. a live conversation where the
+    user expects a fresh answer even if they repeat themselves.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+@contextmanager
+def unkeyed(*patterns: re.Pattern[str]) -> Iterator[None]:
+    """
+    Leave text matching these patterns out of the cache key of LLM calls made
+    inside this block.
+    
+    For context that changes on every call without changing which answer
+    should be reused, e.g. the current time in a background check's prompt.
+    """
+    token = _unkeyed.set(_unkeyed.get() + patterns)
+    try:
+        yield
+    finally:
+        _unkeyed.reset(token)
+
+
+def _strip_unkeyed(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    patterns = _unkeyed.get()
+    if not patterns:
+        return messages
+    stripped = []
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, str):
+            for pattern in patterns:
+                content = pattern.sub("", content)
+            m = {**m, "content": content}
+        stripped.append(m)
+    return stripped
+
+
+def cache_key(
+    model: str,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    max_tokens: int,
+    temperature: float,
+) -> str:
+    """Hash everything that determines the response of a chat request."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "tools": tools or [],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk LRU store of LLM responses with a TTL and a total byte budget.
+
+    Each entry is one JSON file; file mtime doubles as the last-access time
+    so LRU order survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_s: float = 24 * 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+    ):
+        self.ttl_s = ttl_s
+        self.max_entry_bytes = max_entry_bytes
+        self.store = DiskLRU(directory, ".json", max_bytes)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Get a cached entry, or None if missing or expired."""
+        if key not in self.store:
+            return None
+        try:
+            entry = json.loads(self.store.path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.store.drop(key)
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl_s:
+            self.store.drop(key)
+            return None
+        self.store.touch(key)
+        return entry.get("response")
+
+    def put(self, key: str, response: dict[str, Any]) -> None:
+        """Store an entry, evicting least recently used ones over budget."""
+        data = json.dumps({"created_at": time.time(), "response": response}, ensure_ascii=False)
+        encoded = data.encode("utf-8")
+        if len(encoded) > self.max_entry_bytes:
+            return
+        try:
+            self.store.write(key, encoded)
+        except OSError as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def total_bytes(self) -> int:
+        return self.store.total_bytes
+
+
+class CachedProvider(LLMProvider):
+    """
+    LLMProvider decorator that serves repeated identical requests from cache.
+
+    Only successful responses are stored. Calls made inside bypass_cache()
+    always go to the wrapped provider and are not stored; inside unkeyed(),
+    the given volatile text doesn't count towards the key.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: ResponseCache):
+        super().__init__(provider.api_key, provider.api_base)
+        self.provider = provider
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        if _bypass.get():
+            return await self.provider.chat(
+                messages=messages, tools=tools, model=model,
+                max_tokens=max_tokens, temperature=temperature,
+            )
+
+        key = cache_key(
+            model or self.provider.get_default_model(),
+            _strip_unkeyed(messages), tools, max_tokens, temperature,
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.debug(f"LLM cache hit {key[:12]}")
+            return LLMResponse(
+                content=cached.get("content"),
+                tool_calls=[ToolCallRequest(**tc) for tc in cached.get("tool_calls", [])],
+                finish_reason=cached.get("finish_reason", "stop"),
+                usage={},  # Nothing was spent on this call
+            )
+
+        self.misses += 1
+        response = await self.provider.chat(
+            messages=messages, tools=tools, model=model,
+            max_tokens=max_tokens, temperature=temperature,
+        )
+        if response.finish_reason != "error":
+            self.cache.put(key, asdict(response))
+        return response
+
+    def get_default_model(self) -> str:
+        return self.provider.get_default_model()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache hit/miss and size stats."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.cache),
+            "bytes": self.cache.total_bytes,
+        }
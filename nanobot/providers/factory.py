@@ -0,0 +1,101 @@
+"""Build the configured LLM provider."""
+
+from typing import Callable
+
+from nanobot.config.schema import Config, RateLimitConfig
+from nanobot.providers.base import LLMProvider
+from nanobot.providers.cache import CachedProvider, ResponseCache
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.ratelimit import RateLimiter
+from nanobot.providers.router import Backend, CircuitBreaker, RoutingProvider
+from nanobot.utils.helpers import get_data_path
+
+
+def create_rate_limiter(config: RateLimitConfig) -> RateLimiter | None:
+    """Create a rate limiter, or None if no limit is configured."""
+    if not (config.max_concurrency or config.requests_per_minute or config.tokens_per_minute):
+        return None
+    return RateLimiter(
+        max_concurrency=config.max_concurrency,
+        requests_per_minute=config.requests_per_minute,
+        tokens_per_minute=config.tokens_per_minute,
+    )
+
+
+def _credentials_for(config: Config, model: str) -> tuple[str | None, str | None]:
+    """Get (api_key, api_base) for a fallback model."""
+    provider = config.get_provider_for_model(model)
+    if not provider:
+        return config.get_api_key(), config.get_api_base()
+    api_base = provider.api_base
+    if provider is config.providers.openrouter:
+        api_base = api_base or "https://openrouter.ai/api/v1"
+    return provider.api_key or None, api_base
+
+
+def create_provider(config: Config) -> LLMProvider:
+    """
+    Create the LLM provider described by the config.
+
+    A single instance should be shared by the agent loop, subagents, cron
+    and heartbeat so that client-side limits apply to all of them. When
+    fallback models are configured, the result is a RoutingProvider whose
+    first backend is the default model. The response cache, if enabled,
+    wraps whatever was built.
+    """
+    limiters: dict[tuple[str | None, str | None], RateLimiter | None] = {}
+
+    def build(model: str, api_key: str | None, api_base: str | None) -> LiteLLMProvider:
+        # Backends on the same account share one set of limits
+        account = (api_key, api_base)
+        if account not in limiters:
+            limiters[account] = create_rate_limiter(config.providers.rate_limit)
+        return LiteLLMProvider(
+            api_key=api_key,
+            api_base=api_base,
+            default_model=model,
+            rate_limiter=limiters[account],
+        )
+
+    model = config.agents.defaults.model
+    provider: LLMProvider = build(model, config.get_api_key(), config.get_api_base())
+
+    fallback = config.providers.fallback
+    if fallback.models:
+        provider = _with_fallbacks(config, provider, build)
+
+    cache = config.providers.cache
+    if cache.enabled:
+        provider = CachedProvider(provider, ResponseCache(
+            get_data_path() / "cache" / "llm",
+            ttl_s=cache.ttl_s,
+            max_bytes=cache.max_bytes,
+            max_entry_bytes=cache.max_entry_bytes,
+        ))
+
+    return provider
+
+
+def _with_fallbacks(
+    config: Config,
+    primary: LLMProvider,
+    build: Callable[[str, str | None, str | None], LLMProvider],
+) -> RoutingProvider:
+    """Put the primary provider in front of the configured fallback models."""
+    model = config.agents.defaults.model
+    fallback = config.providers.fallback
+
+    def breaker() -> CircuitBreaker:
+        return CircuitBreaker(fallback.failure_threshold, fallback.cooldown_s)
+
+    backends = [Backend(name=model, provider=primary, breaker=breaker())]
+    for fallback_model in fallback.models:
+        api_key, api_base = _credentials_for(config, fallback_model)
+        backends.append(Backend(
+            name=fallback_model,
+            provider=build(fallback_model, api_key, api_base),
+            model=fallback_model,
+            breaker=breaker(),
+        ))
+
+    return RoutingProvider(backends, hedge_after_s=fallback.hedge_after_s)
@@ -11,6 +11,7 @@ import litellm
 from litellm import acompletion
 
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.ratelimit import RateLimiter, estimate_tokens
 
 
 class LiteLLMProvider(LLMProvider):
@@ -19,16 +20,22 @@ class LiteLLMProvider(LLMProvider):
 
     For models that don't support native tool calling (Groq/Llama),
     tools are injected into the system prompt and parsed from text output.
+
+    An optional RateLimiter throttles requests client-side so that every
+    caller sharing this provider (agent loop, subagents, cron, heartbeat)
+    queues for capacity instead of tripping the provider's 429s.
     """
 
     def __init__(
         self,
         api_key: str | None = None,
         api_base: str | None = None,
-        default_model: str = "anthropic/claude-opus-4-5"
+        default_model: str = "anthropic/claude-opus-4-5",
+        rate_limiter: RateLimiter | None = None,
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
+        self.rate_limiter = rate_limiter
 
         # Detect OpenRouter by api_key prefix, api_base, or model prefix
         self.is_openrouter = (
@@ -62,8 +69,8 @@ class LiteLLMProvider(LLMProvider):
             elif self.is_groq:
                 os.environ.setdefault("GROQ_API_KEY", api_key)
 
-        if api_base:
-            litellm.api_base = api_base
+        # api_base is passed per request rather than set on the litellm module,
+        # so several providers with different endpoints can coexist
 
         # Disable LiteLLM logging noise
         litellm.suppress_debug_info = True
@@ -189,7 +196,7 @@ class LiteLLMProvider(LLMProvider):
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = await acompletion(**kwargs)
+                response = await self._complete(kwargs)
                 result = self._parse_response(response)
 
                 # For Groq: parse tool calls from text output
@@ -213,7 +220,11 @@ class LiteLLMProvider(LLMProvider):
                 if "rate_limit" in err_str.lower() or "429" in err_str:
                     wait = self._parse_retry_delay(err_str)
                     if attempt < max_retries - 1:
-                        await asyncio.sleep(wait)
+                        if self.rate_limiter:
+                            # Hold every queued caller, not just this one
+                            self.rate_limiter.pause(wait)
+                        else:
+                            await asyncio.sleep(wait)
                         continue
 
                 return LLMResponse(
@@ -223,6 +234,19 @@ class LiteLLMProvider(LLMProvider):
 
         return LLMResponse(content="Rate limited after retries. Try again shortly.", finish_reason="error")
 
+    async def _complete(self, kwargs: dict[str, Any]) -> Any:
+        """Call LiteLLM, waiting for rate limiter capacity first if configured."""
+        if not self.rate_limiter:
+            return await acompletion(**kwargs)
+
+        estimated = estimate_tokens(kwargs["messages"], kwargs.get("tools"))
+        async with self.rate_limiter.acquire(estimated) as ticket:
+            response = await acompletion(**kwargs)
+            usage = getattr(response, "usage", None)
+            if usage and getattr(usage, "total_tokens", None):
+                ticket.report_usage(usage.total_tokens)
+            return response
+
     @staticmethod
     def _parse_retry_delay(err_str: str) -> float:
         """Extract retry delay from rate limit error, default 30s."""
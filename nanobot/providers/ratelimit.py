@@ -0,0 +1,197 @@
+"""Client-side rate limiting for LLM providers."""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+
+def estimate_tokens(
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None = None,
+) -> int:
+    """
+    Roughly estimate the prompt tokens of a chat request.
+
+    Uses the common ~4 characters per token heuristic over the serialized
+    messages and tool definitions. Good enough for budgeting, not billing.
+    """
+    chars = 0
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif content:
+            # Multimodal parts: count text, charge a flat amount per image
+            for part in content:
+                if part.get("type") == "text":
+                    chars += len(part.get("text", ""))
+                else:
+                    chars += 3000
+        if m.get("tool_calls"):
+            chars += len(json.dumps(m["tool_calls"]))
+    if tools:
+        chars += len(json.dumps(tools))
+    return max(1, chars // 4)
+
+
+class TokenBucket:
+    """
+    Token bucket that refills continuously up to its capacity.
+
+    The level may go negative when usage is reconciled after the fact,
+    which simply delays the next acquisition until the debt is repaid.
+    """
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.per_second)
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self.per_second
+
+    def consume(self, amount: float) -> None:
+        """Take `amount` from the bucket (may leave it in debt)."""
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Add (positive) or charge (negative) tokens after the fact."""
+        self._refill()
+        self._level = min(self.capacity, self._level + delta)
+
+
+class RateLimiter:
+    """
+    Concurrency + requests/min + tokens/min limiter shared by all callers.
+
+    Callers queue in FIFO order: the head of the queue waits for a free
+    concurrency slot and for both buckets to have capacity, so a large
+    request is never starved by a stream of small ones. Limits set to 0
+    are disabled.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 0,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self._requests = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60)
+            if requests_per_minute > 0 else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+            if tokens_per_minute > 0 else None
+        )
+        self._queue = asyncio.Lock()  # asyncio.Lock wakes waiters in FIFO order
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._in_flight = 0
+        self._acquired = 0
+        self._waited = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0) -> AsyncIterator["RateLimitTicket"]:
+        """
+        Wait for capacity to send one request of roughly `tokens` tokens.
+
+        Yields a ticket that can be used to report actual usage afterwards.
+        """
+        start = time.monotonic()
+        self._waiting += 1
+        try:
+            async with self._queue:
+                if self._slots:
+                    await self._slots.acquire()
+                try:
+                    await self._wait_for_buckets(tokens)
+                except BaseException:
+                    if self._slots:
+                        self._slots.release()
+                    raise
+        finally:
+            self._waiting -= 1
+
+        self._record_wait(time.monotonic() - start)
+        self._in_flight += 1
+        try:
+            yield RateLimitTicket(self, tokens)
+        finally:
+            self._in_flight -= 1
+            if self._slots:
+                self._slots.release()
+
+    async def _wait_for_buckets(self, tokens: int) -> None:
+        while True:
+            delay = max(0.0, self._paused_until - time.monotonic())
+            if self._requests:
+                delay = max(delay, self._requests.delay_for(1))
+            if self._tokens and tokens:
+                delay = max(delay, self._tokens.delay_for(tokens))
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+
+        if self._requests:
+            self._requests.consume(1)
+        if self._tokens and tokens:
+            self._tokens.consume(tokens)
+
+    def _record_wait(self, waited: float) -> None:
+        self._acquired += 1
+        if waited >= 0.001:
+            self._waited += 1
+            self._wait_total_s += waited
+            self._wait_max_s = max(self._wait_max_s, waited)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage of a request is known."""
+        if self._tokens and actual:
+            self._tokens.adjust(estimated - actual)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every queued request for `seconds` (e.g. after a 429)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict[str, Any]:
+        """Get limiter metrics."""
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "requests": self._acquired,
+            "delayed": self._waited,
+            "wait_total_s": round(self._wait_total_s, 3),
+            "wait_avg_s": round(self._wait_total_s / self._waited, 3) if self._waited else 0.0,
+            "wait_max_s": round(self._wait_max_s, 3),
+            "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 3),
+        }
+
+
+class RateLimitTicket:
+    """Handle for a request admitted by a RateLimiter."""
+
+    def __init__(self, limiter: RateLimiter, estimated: int):
+        self._limiter = limiter
+        self.estimated = estimated
+
+    def report_usage(self, total_tokens: int) -> None:
+        """Report the tokens the request actually consumed."""
+        self._limiter.reconcile(self.estimated, total_tokens)
@@ -0,0 +1,231 @@
+"""Routing provider: ordered fallback and hedged requests across backends."""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `cooldown_s`. After the cooldown a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_s:
+            return "half_open"
+        return "open"
+
+    def available(self) -> bool:
+        """Check whether a call could be sent right now."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._trial_in_flight)
+
+    def allow(self) -> bool:
+        """Check whether a call may be sent, claiming the half-open trial."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a half-open trial that was cancelled before finishing."""
+        self._trial_in_flight = False
+
+
+@dataclass
+class Backend:
+    """An LLM provider participating in routing."""
+    name: str
+    provider: LLMProvider
+    model: str | None = None  # None: use the requested model (primary only)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    latencies_ms: deque[float] = field(default_factory=lambda: deque(maxlen=100))
+    calls: int = 0
+    errors: int = 0
+
+    def latency_percentile(self, pct: float) -> float | None:
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class RoutingProvider(LLMProvider):
+    """
+    LLM provider that routes each request across several backends.
+
+    Backends are tried in order; a backend whose request errors is skipped
+    in favour of the next one, and backends with an open circuit are not
+    tried at all while healthier ones remain. With `hedge_after_s` set, a
+    duplicate request is sent to the next backend if the current one has
+    not answered within that time, and whichever succeeds first wins.
+    """
+
+    def __init__(self, backends: list[Backend], hedge_after_s: float = 0):
+        if not backends:
+            raise ValueError("RoutingProvider needs at least one backend")
+        super().__init__()
+        self.backends = backends
+        self.hedge_after_s = hedge_after_s
+
+    async def _call(
+        self,
+        backend: Backend,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+    ) -> LLMResponse:
+        start = time.monotonic()
+        backend.calls += 1
+        try:
+            response = await backend.provider.chat(
+                messages=messages,
+                tools=tools,
+                model=backend.model or model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        except asyncio.CancelledError:
+            backend.breaker.release()
+            raise
+        except Exception as e:
+            response = LLMResponse(content=f"Error calling LLM: {e}", finish_reason="error")
+
+        if response.finish_reason == "error":
+            backend.errors += 1
+            backend.breaker.record_failure()
+            logger.warning(f"LLM backend '{backend.name}' failed: {(response.content or '')[:200]}")
+        else:
+            backend.latencies_ms.append((time.monotonic() - start) * 1000)
+            backend.breaker.record_success()
+        return response
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        pending = deque(self.backends)
+        tripped: list[Backend] = []  # Skipped because their circuit wouldn't let a call through
+        in_flight: dict[asyncio.Task[LLMResponse], Backend] = {}
+        last_error: LLMResponse | None = None
+        launched = False
+        force = False
+
+        def launch() -> Backend | None:
+            """Start the next backend whose breaker allows a call, if any is left."""
+            nonlocal launched
+            while pending:
+                backend = pending.popleft()
+                # Checked at launch, not up front: a concurrent chat may have claimed
+                # the half-open trial since this one started
+                if not force and not backend.breaker.allow():
+                    tripped.append(backend)
+                    continue
+                task = asyncio.create_task(
+                    self._call(backend, messages, tools, model, max_tokens, temperature)
+                )
+                in_flight[task] = backend
+                launched = True
+                return backend
+            return None
+
+        try:
+            while True:
+                if not in_flight and not launch():
+                    if launched or force or not tripped:
+                        break
+                    # Every circuit is tripped: better to try than to fail outright
+                    force = True
+                    pending.extend(tripped)
+                    tripped.clear()
+                    continue
+
+                can_hedge = self.hedge_after_s > 0 and bool(pending) and len(in_flight) < 2
+                done, _ = await asyncio.wait(
+                    in_flight,
+                    timeout=self.hedge_after_s if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    slow = next(iter(in_flight.values()))
+                    if hedge := launch():
+                        logger.info(
+                            f"LLM backend '{slow.name}' slower than {self.hedge_after_s}s, "
+                            f"hedging to '{hedge.name}'"
+                        )
+                    continue
+
+                for task in done:
+                    in_flight.pop(task)
+                    response = task.result()
+                    if response.finish_reason != "error":
+                        return response
+                    last_error = response
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        return last_error or LLMResponse(
+            content="Error calling LLM: no backend available", finish_reason="error"
+        )
+
+    def get_default_model(self) -> str:
+        """Get the default model of the primary backend."""
+        return self.backends[0].model or self.backends[0].provider.get_default_model()
+
+    def health(self) -> list[dict[str, Any]]:
+        """Get per-backend health and latency stats."""
+        return [
+            {
+                "name": b.name,
+                "model": b.model or b.provider.get_default_model(),
+                "state": b.breaker.state,
+                "calls": b.calls,
+                "errors": b.errors,
+                "consecutive_failures": b.breaker.failures,
+                "p50_ms": b.latency_percentile(0.5),
+                "p95_ms": b.latency_percentile(0.95),
+            }
+            for b in self.backends
+        ]
@@ -1,65 +1,266 @@
 """Voice transcription provider using Groq."""
 
+import asyncio
+import hashlib
 import os
+import re
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
 
-import httpx
 from loguru import logger
 
+from nanobot.utils.disk_lru import DiskLRU
+from nanobot.utils.http import get_http_client
+
+# Audio longer than this is split at silences and the pieces transcribed concurrently
+CHUNK_S = 120.0
+
+# Smaller files are sent whole without probing (about 2 minutes of a Telegram voice note)
+PROBE_MIN_BYTES = 256 * 1024
+
+# In-memory transcripts kept
+MEMORY_CACHE_SIZE = 256
+
+# Byte budget of the on-disk transcript cache, least recently used evicted first
+DISK_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?\d+(?:\.\d+)?)")
+
+
+class TranscriptionBackend(ABC):
+    """Turns one piece of audio into text."""
+
+    @abstractmethod
+    async def transcribe(self, audio: bytes, filename: str) -> str:
+        """Transcribe audio given as file bytes (any container ffmpeg/Whisper accepts)."""
+        pass
+
+
+class GroqWhisperBackend(TranscriptionBackend):
+    """Groq's Whisper API, over the shared HTTP client."""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str = "https://api.groq.com/openai/v1/audio/transcriptions",
+        model: str = "whisper-large-v3",
+        timeout_s: float = 120.0,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.timeout_s = timeout_s
+
+    async def transcribe(self, audio: bytes, filename: str) -> str:
+        response = await get_http_client().post(
+            self.api_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            files={
+                "file": (filename, audio),
+                "model": (None, self.model),
+            },
+            timeout=self.timeout_s,
+        )
+        response.raise_for_status()
+        return response.json().get("text", "")
+
+
+def split_points(duration: float, silences: list[tuple[float, float]], chunk_s: float) -> list[float]:
+    """
+    Cut points (seconds) splitting audio into pieces of about chunk_s.
+
+    Each cut goes in the middle of the silence closest to the ideal
+    boundary, looking no further than half a chunk back, so words aren't
+    cut in half. Without a usable silence the cut is made at the boundary.
+    """
+    cuts: list[float] = []
+    start = 0.0
+    while duration - start > chunk_s * 1.5:
+        target = start + chunk_s
+        best = None
+        for silence_start, silence_end in silences:
+            middle = (silence_start + silence_end) / 2
+            if start + chunk_s / 2 <= middle <= target + chunk_s / 2:
+                if best is None or abs(middle - target) < abs(best - target):
+                    best = middle
+        cut = best if best is not None else target
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def parse_silencedetect(stderr: str) -> tuple[float | None, list[tuple[float, float]]]:
+    """Duration and (start, end) silences from ffmpeg's silencedetect output."""
+    duration = None
+    if m := _DURATION_RE.search(stderr):
+        hours, minutes, seconds = m.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    silences = []
+    start = None
+    for kind, value in _SILENCE_RE.findall(stderr):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return duration, silences
+
 
 class GroqTranscriptionProvider:
     """
     Voice transcription provider using Groq's Whisper API.
-    
+
     Groq offers extremely fast transcription with a generous free tier.
+
+    Long audio is split at silences (found with ffmpeg's silencedetect)
+    into pieces of about CHUNK_S seconds that are transcribed concurrently
+    and joined in order, so no single request has to carry a long voice
+    note. Without ffmpeg the file is sent whole. Transcripts are cached by
+    the SHA-256 of the audio, in memory and (with cache_dir) on disk under
+    cache_max_bytes. The backend can be swapped, e.g. for a local stand-in
+    in tests.
     """
-    
-    def __init__(self, api_key: str | None = None):
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        backend: TranscriptionBackend | None = None,
+        cache_dir: Path | None = None,
+        cache_max_bytes: int = DISK_CACHE_MAX_BYTES,
+        chunk_s: float = CHUNK_S,
+        max_concurrency: int = 4,
+    ):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
-    
+        self.backend = backend or (
+            GroqWhisperBackend(self.api_key, self.api_url) if self.api_key else None
+        )
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self._disk: DiskLRU | None = None  # Opened on first use
+        self.chunk_s = chunk_s
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._memory: OrderedDict[str, str] = OrderedDict()
+
     async def transcribe(self, file_path: str | Path) -> str:
         """
         Transcribe an audio file using Groq.
-        
+
         Args:
             file_path: Path to the audio file.
-            
+
         Returns:
             Transcribed text.
         """
-        if not self.api_key:
+        if not self.backend:
             logger.warning("Groq API key not configured for transcription")
             return ""
-        
+
         path = Path(file_path)
         if not path.exists():
             logger.error(f"Audio file not found: {file_path}")
             return ""
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
-                    
+            audio = await asyncio.to_thread(path.read_bytes)
+            key = hashlib.sha256(audio).hexdigest()
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.debug(f"Transcript cache hit for {path.name}")
+                return cached
+
+            text = await self._transcribe_audio(path, audio)
+            if text:
+                self._cache_put(key, text)
+            return text
+
         except Exception as e:
             logger.error(f"Groq transcription error: {e}")
             return ""
+
+    async def _transcribe_audio(self, path: Path, audio: bytes) -> str:
+        if len(audio) < PROBE_MIN_BYTES or not shutil.which("ffmpeg"):
+            return await self._transcribe_piece(audio, path.name)
+
+        duration, silences = await self._detect_silences(path)
+        cuts = split_points(duration, silences, self.chunk_s) if duration else []
+        if not cuts:
+            return await self._transcribe_piece(audio, path.name)
+
+        bounds = list(zip([0.0] + cuts, cuts + [None]))
+        logger.info(f"Transcribing {path.name} ({duration:.0f}s) in {len(bounds)} pieces")
+        with tempfile.TemporaryDirectory(prefix="nanobot-audio-") as tmp:
+            pieces = await asyncio.gather(*(
+                self._transcribe_range(path, Path(tmp) / f"{i}.flac", start, end)
+                for i, (start, end) in enumerate(bounds)
+            ))
+        return " ".join(p.strip() for p in pieces if p.strip())
+
+    async def _transcribe_piece(self, audio: bytes, filename: str) -> str:
+        async with self._slots:
+            return await self.backend.transcribe(audio, filename)
+
+    async def _transcribe_range(self, path: Path, out: Path, start: float, end: float | None) -> str:
+        """Cut [start, end) out as mono 16 kHz FLAC and transcribe it."""
+        args = ["-ss", f"{start:.3f}"] + (["-to", f"{end:.3f}"] if end is not None else [])
+        await _ffmpeg(*args, "-i", str(path), "-vn", "-ac", "1", "-ar", "16000", "-c:a", "flac", str(out))
+        return await self._transcribe_piece(await asyncio.to_thread(out.read_bytes), out.name)
+
+    async def _detect_silences(self, path: Path) -> tuple[float | None, list[tuple[float, float]]]:
+        stderr = await _ffmpeg(
+            "-i", str(path), "-af", "silencedetect=noise=-30dB:d=0.4", "-f", "null", "-"
+        )
+        return parse_silencedetect(stderr)
+
+    @property
+    def disk_cache(self) -> DiskLRU | None:
+        if self._disk is None and self.cache_dir:
+            self._disk = DiskLRU(self.cache_dir, ".txt", self.cache_max_bytes)
+        return self._disk
+
+    def _cache_get(self, key: str) -> str | None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        disk = self.disk_cache
+        if disk is not None and key in disk:
+            try:
+                text = disk.path(key).read_text(encoding="utf-8")
+            except OSError:
+                disk.drop(key)
+                return None
+            disk.touch(key)
+            self._remember(key, text)
+            return text
+        return None
+
+    def _cache_put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if (disk := self.disk_cache) is not None:
+            try:
+                disk.write(key, text.encode("utf-8"))
+            except OSError as e:
+                logger.warning(f"Transcript cache write failed: {e}")
+
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        while len(self._memory) > MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+
+
+async def _ffmpeg(*args: str) -> str:
+    """Run ffmpeg quietly; returns stderr (where it reports), raises on failure."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-nostdin", "-y", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    text = stderr.decode("utf-8", errors="replace")
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {text.strip().splitlines()[-1] if text.strip() else process.returncode}")
+    return text
@@ -0,0 +1,85 @@
+"""Directory of cache files kept under a byte budget, least recently used evicted first."""
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from nanobot.utils.helpers import atomic_write
+
+
+class DiskLRU:
+    """
+    One file per key in a directory, with a total byte budget.
+
+    File mtime doubles as the last-access time, so LRU order survives
+    restarts. Callers own the file format; this only tracks, writes and
+    evicts files.
+    """
+
+    def __init__(self, directory: Path, suffix: str, max_bytes: int):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._load_index()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def _load_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path.name[:-len(self.suffix)], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as just used."""
+        self._index.move_to_end(key)
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+
+    def write(self, key: str, data: bytes) -> None:
+        """Store an entry atomically, evicting older ones over budget. Raises OSError."""
+        if len(data) > self.max_bytes:
+            return
+        atomic_write(self.path(key), data)
+        self._total_bytes -= self._index.pop(key, 0)
+        self._index[key] = len(data)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def drop(self, key: str) -> None:
+        self._total_bytes -= self._index.pop(key, 0)
+        try:
+            self.path(key).unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._index:
+            self.drop(next(iter(self._index)))
+
+    def keys(self) -> list[str]:
+        """Keys from least to most recently used."""
+        return list(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
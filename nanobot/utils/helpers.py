@@ -1,7 +1,11 @@
 """Utility functions for nanobot."""
 
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
+from typing import BinaryIO, Iterator
 
 
 def ensure_dir(path: Path) -> Path:
@@ -10,6 +14,63 @@ def ensure_dir(path: Path) -> Path:
     return path
 
 
+def atomic_write(path: Path, data: bytes | str, fsync: bool = False) -> None:
+    """
+    Replace a file's contents atomically.
+    
+    Writes to a temp file in the same directory and renames it over the
+    target, so readers and crashes see either the old or the new contents,
+    never a truncated file. The existing file mode is kept. With fsync, the
+    data and the directory entry are flushed to disk before returning.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with atomic_writer(path, fsync=fsync) as f:
+        f.write(data)
+
+
+@contextmanager
+def atomic_writer(path: Path, fsync: bool = False) -> Iterator[BinaryIO]:
+    """
+    Yield a binary file that replaces `path` when the block exits cleanly.
+    
+    A symlink is written through: its target is replaced, not the link.
+    """
+    path = path.resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+        if fsync and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once: os.umask() can only be queried by setting it, which races with threads
+_UMASK = _read_umask()
+
+
 def get_data_path() -> Path:
     """Get the nanobot data directory (~/.nanobot)."""
     return ensure_dir(Path.home() / ".nanobot")
@@ -66,6 +127,15 @@ def truncate_string(s: str, max_len: int = 100, suffix: str = "...") -> str:
     return s[: max_len - len(suffix)] + suffix
 
 
+def format_size(n: float) -> str:
+    """Format a byte count for humans (e.g. 512B, 12KB, 3MB, 1.5GB)."""
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
 def safe_filename(name: str) -> str:
     """Convert a string to a safe filename."""
     # Replace unsafe characters
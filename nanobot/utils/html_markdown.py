@@ -0,0 +1,108 @@
+"""Streaming HTML to markdown/text conversion and readable-content extraction.
+
+Kept free of heavy nanobot imports: it is loaded in extraction worker
+processes.
+"""
+
+import re
+
+from lxml import etree
+
+# Elements whose content is never shown
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+
+# Closing these ends a paragraph
+_BLOCK_TAGS = {"p", "div", "section", "article"}
+
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+class _MarkdownTarget:
+    """
+    lxml parser target converting HTML while it is tokenized.
+
+    Links become [text](href), headings "# text", list items "- text",
+    block ends blank lines and br/hr line breaks; everything else is
+    reduced to its text. With markdown=False only the text and line
+    structure are kept. No tree is built.
+    """
+
+    def __init__(self, markdown: bool = True):
+        self.markdown = markdown
+        self.out: list[str] = []
+        self._skip = 0
+        self._links: list[tuple[str | None, int]] = []  # (href, out index where link text starts)
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        if tag in ("br", "hr"):
+            self.out.append("\n")
+        elif tag in _HEADINGS:
+            self.out.append("\n" + ("#" * _HEADINGS[tag] + " " if self.markdown else ""))
+        elif tag == "li":
+            self.out.append("\n- " if self.markdown else "\n")
+        elif tag == "a":
+            self._links.append((attrib.get("href") if self.markdown else None, len(self.out)))
+
+    def end(self, tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip:
+            return
+        if tag in _BLOCK_TAGS:
+            self.out.append("\n\n")
+        elif tag in _HEADINGS:
+            self.out.append("\n")
+        elif tag == "a" and self._links:
+            href, start = self._links.pop()
+            if href:
+                text = "".join(self.out[start:]).strip()
+                del self.out[start:]
+                self.out.append(f"[{text}]({href})")
+
+    def data(self, data: str) -> None:
+        if not self._skip:
+            self.out.append(data)
+
+    def close(self) -> str:
+        text = re.sub(r"[ \t]+", " ", "".join(self.out))
+        text = re.sub(r" *\n *", "\n", text)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _convert(html: str, markdown: bool) -> str:
+    if not html.strip():
+        return ""
+    parser = etree.HTMLParser(target=_MarkdownTarget(markdown))
+    parser.feed(html)
+    return parser.close()
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert HTML to markdown."""
+    return _convert(html, markdown=True)
+
+
+def html_to_text(html: str) -> str:
+    """Convert HTML to plain text, keeping line structure."""
+    return _convert(html, markdown=False)
+
+
+def extract_readable(html: str, mode: str = "markdown") -> tuple[str, str]:
+    """
+    Extract the main content of a page with Readability.
+
+    Returns (title, content) with content in markdown or plain text. Runs
+    in a worker; everything it returns must be picklable.
+    """
+    from readability import Document
+
+    doc = Document(html)
+    summary = doc.summary()
+    content = html_to_markdown(summary) if mode == "markdown" else html_to_text(summary)
+    return doc.title() or "", content
@@ -0,0 +1,53 @@
+"""Shared HTTP client."""
+
+import asyncio
+import weakref
+
+import httpx
+from loguru import logger
+
+# Redirects followed by requests that opt into follow_redirects
+MAX_REDIRECTS = 5
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client for the running event loop.
+
+    Connections are kept alive and reused across tool calls (and
+    multiplexed over HTTP/2 when the `h2` package is installed), so
+    repeated requests to the same host skip DNS, TCP and TLS setup. Pass
+    timeouts and follow_redirects per request; don't close the client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        http2 = _http2_available()
+        client = httpx.AsyncClient(
+            http2=http2,
+            max_redirects=MAX_REDIRECTS,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+        )
+        _clients[loop] = client
+        logger.debug(f"Created shared HTTP client (http2={http2})")
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared client of the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
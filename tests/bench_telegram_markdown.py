@@ -0,0 +1,45 @@
+"""
+Micro-benchmark: markdown-to-Telegram-HTML conversion time by input size.
+
+Run with `python tests/bench_telegram_markdown.py`. Time per KB should stay
+flat as the input grows.
+"""
+
+import timeit
+
+from nanobot.channels.telegram import _markdown_to_telegram_html
+
+SAMPLE = """## Results
+
+Here is a **summary** of the _analysis_ with `inline code` and a [link](https://example.com/a_b).
+
+- item one with ~~old~~ new text
+- item two & more <tags>
+> quoted line
+>
+> second paragraph of the quote
+
+```python
+def foo(x):
+    return x < 3 and x > 1
+```
+
+1. numbered __strong__ item
+Some text with snake_case_name and more words to make it longer.
+"""
+
+
+def main() -> None:
+    convert = _markdown_to_telegram_html.__wrapped__  # Bypass the lru_cache
+    for copies in (1, 10, 100, 1000):
+        text = SAMPLE * copies
+        number = max(3, 2000 // copies)
+        elapsed = min(timeit.repeat(lambda: convert(text), number=number, repeat=3)) / number
+        print(
+            f"{len(text):>8} chars  {elapsed * 1000:9.3f} ms  "
+            f"{elapsed * 1000 / (len(text) / 1024):6.3f} ms/KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.base import Tool
+from nanobot.bus.queue import MessageBus
+from nanobot.cron.service import CronService, _now_ms, _resolve_next_run
+from nanobot.cron.types import CronSchedule
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+class MessagingProvider(LLMProvider):
+    """Sends one message with the message tool, slowly, then finishes the turn."""
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        if messages[-1]["role"] == "tool":
+            return LLMResponse(content="sent")
+        await asyncio.sleep(0.1)  # Lets the other turns set up their chats meanwhile
+        task = messages[-1]["content"]
+        return LLMResponse(
+            content="",
+            tool_calls=[ToolCallRequest(id="call_1", name="message", arguments={"content": task})],
+        )
+
+    def get_default_model(self) -> str:
+        return "fake-model"
+
+
+class RecordingProvider(LLMProvider):
+    """Answers every turn the same way and records the prompts it saw."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.prompts.append(messages[-1]["content"])
+        return LLMResponse(content="closed the position", usage={"prompt_tokens": 7, "completion_tokens": 3})
+
+    def get_default_model(self) -> str:
+        return "fake-model"
+
+
+class ExitsTool(Tool):
+    """Reports a fixed number of exits."""
+
+    def __init__(self, exited: int):
+        self.exited = exited
+
+    @property
+    def name(self) -> str:
+        return "check_exits"
+
+    @property
+    def description(self) -> str:
+        return "Check exits"
+
+    @property
+    def parameters(self) -> dict:
+        return {"type": "object", "properties": {}}
+
+    async def execute(self, **kwargs) -> str:
+        return f"exited: {self.exited}" if self.exited >= 0 else "Error: no price feed"
+
+
+def _tool_job_setup(tmp_path, monkeypatch, exited: int, **job):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    bus = MessageBus()
+    provider = RecordingProvider()
+    service = CronService(tmp_path / "jobs.json")
+    agent = AgentLoop(bus, provider, tmp_path / "workspace", cron_service=service)
+    agent.tools.register(ExitsTool(exited))
+    service.on_job = agent.run_cron_job
+    job = service.add_job(
+        "exits", CronSchedule(kind="every", every_ms=60_000), "Review the exits",
+        deliver=True, channel="telegram", to="42", tool="check_exits", **job,
+    )
+    return bus, provider, service, job
+
+
+async def test_due_jobs_run_concurrently_without_overlap(tmp_path) -> None:
+    store = tmp_path / "jobs.json"
+    running: set[str] = set()
+    peak = 0
+    calls: dict[str, int] = {}
+
+    async def on_job(job):
+        nonlocal peak
+        assert job.id not in running  # A job never overlaps with itself
+        running.add(job.id)
+        peak = max(peak, len(running))
+        calls[job.name] = calls.get(job.name, 0) + 1
+        await asyncio.sleep(0.2)
+        running.discard(job.id)
+        return "ok"
+
+    service = CronService(store, on_job=on_job, max_concurrent=2)
+    await service.start()
+    for i in range(1000):
+        service.add_job(f"idle{i}", CronSchedule(kind="every", every_ms=3600_000), "later")
+    for i in range(3):
+        service.add_job(f"job{i}", CronSchedule(kind="at", at_ms=_now_ms() + 50), "hi")
+    await asyncio.sleep(0.1)
+    assert service.status()["running"] == 3  # Two executing, one waiting for a slot
+    assert await service.run_job(next(iter(service._active))) is False
+    await asyncio.sleep(0.5)
+    service.stop()
+
+    assert calls == {"job0": 1, "job1": 1, "job2": 1}
+    assert peak == 2
+    data = json.loads(store.read_text())
+    assert len(data["jobs"]) == 1003
+    finished = [j for j in data["jobs"] if j["name"].startswith("job")]
+    assert all(j["state"]["lastStatus"] == "ok" and not j["enabled"] for j in finished)
+
+
+async def test_concurrent_agent_turns_message_their_own_chats(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    bus = MessageBus()
+    agent = AgentLoop(bus, MessagingProvider(), tmp_path / "workspace")
+
+    async def on_job(job):
+        return await agent.process_direct(
+            job.payload.message, session_key=f"cron:{job.id}",
+            channel="telegram", chat_id=job.payload.to, purpose="cron",
+        )
+
+    service = CronService(tmp_path / "jobs.json", on_job=on_job, max_concurrent=3)
+    jobs = [
+        service.add_job(f"job{i}", CronSchedule(kind="every", every_ms=3600_000),
+                        f"report for chat {i}", channel="telegram", to=str(i))
+        for i in range(3)
+    ]
+    await asyncio.gather(*(service.run_job(job.id) for job in jobs))
+
+    sent = sorted((m.chat_id, m.content) for m in [bus.outbound.get_nowait() for _ in range(3)])
+    assert sent == [(str(i), f"report for chat {i}") for i in range(3)]
+
+
+async def test_removed_and_disabled_jobs_leave_the_heap(tmp_path) -> None:
+    service = CronService(tmp_path / "jobs.json")
+    a = service.add_job("a", CronSchedule(kind="every", every_ms=1000), "a")
+    b = service.add_job("b", CronSchedule(kind="every", every_ms=2000), "b")
+
+    assert service.status()["next_wake_at_ms"] == a.state.next_run_at_ms
+    service.remove_job(a.id)
+    assert service.status()["next_wake_at_ms"] == b.state.next_run_at_ms
+    service.enable_job(b.id, enabled=False)
+    assert service.status()["next_wake_at_ms"] is None
+
+
+def test_interval_slots_are_anchored_and_misfires_follow_policy() -> None:
+    every = CronSchedule(kind="every", every_ms=10_000)
+    # Runs stay on anchor + k * every regardless of when the previous run finished
+    assert _resolve_next_run(every, 5000, 15_000, 19_000, "skip", 10) == 25_000
+
+    # Slots 25_000..95_000 were missed (now = 100_000)
+    assert _resolve_next_run(every, 5000, 15_000, 100_000, "skip", 10) == 105_000
+    assert _resolve_next_run(every, 5000, 15_000, 100_000, "run_once", 10) == 95_000
+    assert _resolve_next_run(every, 5000, 15_000, 100_000, "catch_up", 3) == 75_000
+    assert _resolve_next_run(every, 5000, 75_000, 100_000, "catch_up", 3) == 85_000
+    assert _resolve_next_run(every, 5000, 15_000, 100_000, "catch_up", 100) == 25_000
+
+
+def test_cron_expressions_honor_timezone() -> None:
+    schedule = CronSchedule(kind="cron", expr="0 9 * * *", tz="America/New_York")
+    now = int(datetime(2026, 1, 5, 12, tzinfo=timezone.utc).timestamp() * 1000)
+    next_run = _resolve_next_run(schedule, 0, now, now, "skip", 10)
+    assert datetime.fromtimestamp(next_run / 1000, timezone.utc) == datetime(2026, 1, 5, 14, tzinfo=timezone.utc)
+
+    # Missed 09:00 runs on the 5th-7th, checked on the 8th at 12:00 New York time
+    later = now + 3 * 86400_000
+    assert _resolve_next_run(schedule, 0, now - 1, later, "catch_up", 2) == next_run + 86400_000
+
+
+async def test_run_history_is_a_persisted_ring_buffer(tmp_path) -> None:
+    service = CronService(tmp_path / "jobs.json", history_size=3)
+
+    async def on_job(job):
+        service.add_usage(job.id, {"prompt_tokens": 10, "completion_tokens": 2})
+        if job.name == "bad":
+            raise RuntimeError("boom")
+        return "x" * 1000
+
+    service.on_job = on_job
+    good = service.add_job("good", CronSchedule(kind="every", every_ms=3600_000), "m")
+    bad = service.add_job("bad", CronSchedule(kind="every", every_ms=3600_000), "m")
+    for _ in range(5):
+        assert await service.run_job(good.id)
+    assert await service.run_job(bad.id)
+
+    reloaded = CronService(tmp_path / "jobs.json", history_size=3)
+    runs = reloaded.get_history(good.id)
+    assert len(runs) == 3
+    assert runs[-1].prompt_tokens == 10 and runs[-1].completion_tokens == 2
+    assert len(runs[-1].output) < 1000
+    assert reloaded.get_history(bad.id)[0].error == "boom"
+    stats = reloaded.run_stats(good.id)
+    assert stats["runs"] == 3 and stats["errors"] == 0 and stats["avg_tokens"] == 12
+
+    reloaded.remove_job(bad.id)
+    assert reloaded.get_history(bad.id) == []
+
+
+def test_tool_call_payload_round_trips(tmp_path) -> None:
+    service = CronService(tmp_path / "jobs.json")
+    job = service.add_job(
+        "exits",
+        CronSchedule(kind="every", every_ms=60_000),
+        "Exits triggered, review the positions",
+        tool="solana_trader",
+        tool_args={"action": "check_exits"},
+        escalate_if=r"exited: [1-9]",
+    )
+    with pytest.raises(ValueError):
+        service.add_job("bad", CronSchedule(kind="every", every_ms=1000), "m", tool="x", escalate_if="(")
+
+    payload = CronService(tmp_path / "jobs.json").list_jobs()[0].payload
+    assert payload.kind == "tool_call" and payload.tool == "solana_trader"
+    assert payload.args == {"action": "check_exits"} and payload.escalate_if == job.payload.escalate_if
+
+
+async def test_tool_call_job_runs_without_the_llm(tmp_path, monkeypatch) -> None:
+    bus, provider, service, job = _tool_job_setup(tmp_path, monkeypatch, 0, escalate_if=r"exited: [1-9]")
+    await service.run_job(job.id)
+
+    assert provider.prompts == []
+    assert bus.outbound.empty()  # Unmatched results aren't delivered
+    run = service.get_history(job.id)[-1]
+    assert (run.status, run.output, run.prompt_tokens) == ("ok", "exited: 0", 0)
+
+    # Without escalate_if the result itself is delivered
+    plain = service.add_job("plain", CronSchedule(kind="every", every_ms=60_000), "",
+                            deliver=True, channel="telegram", to="42", tool="check_exits")
+    await service.run_job(plain.id)
+    assert provider.prompts == []
+    msg = bus.outbound.get_nowait()
+    assert (msg.chat_id, msg.content) == ("42", "exited: 0")
+
+
+async def test_tool_call_job_escalates_on_match(tmp_path, monkeypatch) -> None:
+    bus, provider, service, job = _tool_job_setup(tmp_path, monkeypatch, 2, escalate_if=r"exited: [1-9]")
+    await service.run_job(job.id)
+
+    assert provider.prompts == ["Review the exits\n\n[check_exits returned]\nexited: 2"]
+    msg = bus.outbound.get_nowait()
+    assert (msg.channel, msg.chat_id, msg.content) == ("telegram", "42", "closed the position")
+    run = service.get_history(job.id)[-1]
+    assert (run.output, run.prompt_tokens, run.completion_tokens) == ("closed the position", 7, 3)
+
+
+async def test_tool_call_job_fails_on_tool_error(tmp_path, monkeypatch) -> None:
+    bus, provider, service, job = _tool_job_setup(tmp_path, monkeypatch, -1)
+    await service.run_job(job.id)
+
+    assert provider.prompts == [] and bus.outbound.empty()
+    run = service.get_history(job.id)[-1]
+    assert (run.status, run.error) == ("error", "Error: no price feed")
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+from nanobot.agent.tools import shell
+from nanobot.agent.tools.shell import ExecTool, OutputCapture
+
+posix_only = pytest.mark.skipif(
+    sys.platform == "win32" or not shutil.which("sh"), reason="needs a POSIX shell"
+)
+
+
+def test_capture_keeps_head_and_tail_and_marks_the_gap() -> None:
+    capture = OutputCapture(head_bytes=4, tail_bytes=4)
+    for chunk in (b"0123", b"4567", b"89ab", b"cdef"):
+        capture.feed(chunk)
+
+    assert capture.total == 16
+    assert capture.omitted == 8
+    assert capture.text() == "0123\n... (8 bytes omitted) ...\ncdef"
+    assert capture.last_line() == "cdef"
+
+
+def test_small_output_is_returned_whole(tmp_path) -> None:
+    capture = OutputCapture(head_bytes=4, tail_bytes=4, spill_path=tmp_path / "out.log")
+    capture.feed(b"hello\n")
+    capture.close()
+    assert capture.text() == "hello\n"
+    assert not (tmp_path / "out.log").exists()
+
+
+def test_overflow_spills_the_full_stream_to_a_file(tmp_path) -> None:
+    spill = tmp_path / "out.log"
+    capture = OutputCapture(head_bytes=4, tail_bytes=4, spill_path=spill)
+    data = bytes(range(48, 58)) * 10
+    for i in range(0, len(data), 7):
+        capture.feed(data[i:i + 7])
+    capture.close()
+
+    assert spill.read_bytes() == data
+    assert f"full output in {spill}" in capture.text()
+
+
+def test_spill_file_size_is_capped(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(shell, "MAX_SPILL_BYTES", 20)
+    spill = tmp_path / "out.log"
+    capture = OutputCapture(head_bytes=4, tail_bytes=4, spill_path=spill)
+    capture.feed(b"x" * 100)
+    capture.close()
+    assert spill.stat().st_size == 20
+    assert "(first 20B)" in capture.text()
+
+
+def test_old_spill_files_are_pruned(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(shell, "MAX_SPILL_FILES", 3)
+    for i in range(5):
+        path = tmp_path / f"{i}.log"
+        path.write_text("x")
+        os.utime(path, (i, i))
+    shell._prune_spill_dir(tmp_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2.log", "3.log", "4.log"]
+
+
+@posix_only
+async def test_large_command_output_is_truncated_and_spilled(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), spill_dir=tmp_path / "spill")
+    result = await tool.execute("seq 1 20000")
+
+    assert result.startswith("1\n2\n")
+    assert result.rstrip().endswith("20000")
+    assert "bytes omitted; full output in" in result
+    (stdout_log,) = (tmp_path / "spill").glob("*.stdout.log")
+    assert stdout_log.read_text().splitlines() == [str(i) for i in range(1, 20001)]
+
+
+@posix_only
+async def test_timeout_kills_the_whole_process_group(tmp_path) -> None:
+    tool = ExecTool(timeout=1, working_dir=str(tmp_path), spill_dir=tmp_path / "spill")
+    start = time.monotonic()
+    result = await tool.execute("sleep 30 & echo $! > child.pid; wait")
+
+    assert result.startswith("Error: Command timed out after 1 seconds")
+    assert time.monotonic() - start < 10
+    child = int((tmp_path / "child.pid").read_text())
+    for _ in range(50):
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("background child survived the timeout")
+
+
+@posix_only
+async def test_cancel_kills_the_whole_process_group(tmp_path) -> None:
+    tool = ExecTool(timeout=60, working_dir=str(tmp_path), spill_dir=tmp_path / "spill")
+    task = asyncio.create_task(tool.execute("sleep 30 & echo $! > child.pid; wait"))
+    pid_file = tmp_path / "child.pid"
+    for _ in range(100):
+        if pid_file.exists() and pid_file.read_text().strip():
+            break
+        await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    child = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        await asyncio.sleep(0.05)
+    else:
+        pytest.fail("background child survived the cancellation")
@@ -0,0 +1,49 @@
+from nanobot.agent.tools import filesystem
+from nanobot.agent.tools.filesystem import EditFileTool, WriteFileTool
+from nanobot.utils.helpers import atomic_writer
+
+
+async def test_edit_file_batches_and_streams_large_files(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "big.txt"
+    original = "".join(f"row {i}\n" for i in range(5000))
+    path.write_text(original, encoding="utf-8")
+    edits = [
+        {"old_text": "row 10\n", "new_text": "ten\n"},
+        {"old_text": "row 4999\n", "new_text": "last\n"},
+    ]
+    tool = EditFileTool()
+
+    assert await tool.execute(str(path), edits=edits) == f"Successfully applied 2 edits to {path}"
+    expected = path.read_text(encoding="utf-8")
+
+    # Same result when the file is streamed in chunks smaller than an edit
+    monkeypatch.setattr(filesystem, "STREAMING_EDIT_BYTES", 1024)
+    monkeypatch.setattr(filesystem, "EDIT_CHUNK_BYTES", 5)
+    path.write_text(original, encoding="utf-8")
+    assert await tool.execute(str(path), edits=edits) == f"Successfully applied 2 edits to {path}"
+    assert path.read_text(encoding="utf-8") == expected
+
+    result = await tool.execute(str(path), edits=[edits[0], {"old_text": "row 1", "new_text": "x"}])
+    assert result.startswith("Error: edits[0]: old_text not found")
+    assert path.read_text(encoding="utf-8") == expected
+    assert [p.name for p in tmp_path.iterdir()] == ["big.txt"]
+
+
+async def test_write_file_goes_through_symlinks_and_fails_cleanly(tmp_path) -> None:
+    target = tmp_path / "real.txt"
+    target.write_text("old", encoding="utf-8")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    assert (await WriteFileTool().execute(str(link), "new")).startswith("Successfully wrote")
+    assert link.is_symlink()
+    assert target.read_text(encoding="utf-8") == "new"
+
+    try:
+        with atomic_writer(target) as f:
+            f.write(b"partial")
+            raise RuntimeError("crash")
+    except RuntimeError:
+        pass
+    assert target.read_text(encoding="utf-8") == "new"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["link.txt", "real.txt"]
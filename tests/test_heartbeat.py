@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from nanobot.heartbeat.service import HeartbeatService, _parse_active_hours
+from nanobot.heartbeat.watcher import FileWatcher
+
+
+async def test_watcher_sees_writes_and_atomic_replaces(tmp_path) -> None:
+    target = tmp_path / "HEARTBEAT.md"
+    for backend in ("inotify", "polling"):
+        watcher = FileWatcher(target, poll_s=0.05)
+        if backend == "polling":
+            watcher._start_polling()
+        else:
+            watcher.start()
+        await asyncio.sleep(0.06)
+
+        target.write_text(f"- task {backend}")
+        await asyncio.wait_for(watcher.changed.wait(), timeout=2)
+        watcher.changed.clear()
+
+        (tmp_path / "other.txt").write_text("unrelated")
+        await asyncio.sleep(0.2)
+        assert not watcher.changed.is_set()
+
+        tmp = tmp_path / ".HEARTBEAT.md.tmp"
+        tmp.write_text("- replaced")
+        tmp.replace(target)
+        await asyncio.wait_for(watcher.changed.wait(), timeout=2)
+        watcher.stop()
+
+
+async def test_edits_trigger_ticks_and_ok_is_memoized(tmp_path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- [ ] water the plants")
+    calls = 0
+
+    async def on_heartbeat(prompt: str) -> str:
+        nonlocal calls
+        calls += 1
+        return "HEARTBEAT_OK"
+
+    service = HeartbeatService(tmp_path, on_heartbeat, interval_s=3600, debounce_s=0.05, poll_s=0.05)
+    await service._tick()
+    await service._tick()
+    assert calls == 1  # Unchanged since HEARTBEAT_OK
+
+    await service.start()
+    await asyncio.sleep(0.1)
+    (tmp_path / "HEARTBEAT.md").write_text("- [ ] water the plants\n- [ ] call mom")
+    for _ in range(100):
+        if calls == 2:
+            break
+        await asyncio.sleep(0.02)
+    service.stop()
+    assert calls == 2
+
+
+async def test_agent_edits_during_a_tick_do_not_trigger_another(tmp_path) -> None:
+    heartbeat = tmp_path / "HEARTBEAT.md"
+    heartbeat.write_text("- [ ] water the plants")
+    calls = 0
+
+    async def on_heartbeat(prompt: str) -> str:
+        nonlocal calls
+        calls += 1
+        heartbeat.write_text(f"- [x] water the plants (tick {calls})")
+        await asyncio.sleep(0.1)
+        return "Watered the plants"
+
+    service = HeartbeatService(tmp_path, on_heartbeat, interval_s=3600, debounce_s=0.05, poll_s=0.05)
+    await service.start()
+    await asyncio.sleep(0.1)
+    heartbeat.write_text("- [ ] water the plants\n- [ ] feed the cat")
+    for _ in range(100):
+        if calls == 1:
+            break
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.5)
+    assert calls == 1
+
+    heartbeat.write_text("- [ ] feed the cat")  # Someone else's edit still triggers a tick
+    for _ in range(100):
+        if calls == 2:
+            break
+        await asyncio.sleep(0.02)
+    service.stop()
+    assert calls == 2
+
+
+async def test_interval_backs_off_when_idle_and_tightens_after_actions(tmp_path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- [ ] check the deploy")
+    responses = iter(["HEARTBEAT_OK", "Restarted the deploy", "HEARTBEAT_OK"])
+
+    async def on_heartbeat(prompt: str) -> str:
+        return next(responses)
+
+    service = HeartbeatService(
+        tmp_path, on_heartbeat, interval_s=600, adaptive=True, min_interval_s=60, max_interval_s=1800, jitter=0
+    )
+    service._adapt(await service._tick())
+    assert service._interval == 1200
+    service._adapt(await service._tick())  # Memo hit: still idle
+    assert service._interval == 1800
+    (tmp_path / "HEARTBEAT.md").write_text("- [ ] check the deploy again")
+    service._adapt(await service._tick())
+    assert service._interval == 60
+    service._adapt(await service._tick())
+    assert service._interval == 120
+
+    status = service.status()
+    assert status["llm_calls"] == 3 and status["memo_skips"] == 1 and status["actions"] == 1
+
+    now = datetime.now()
+    hours = f"{now - timedelta(hours=1):%H:%M}-{now + timedelta(hours=1):%H:%M}"
+    service.active_hours = _parse_active_hours(hours)
+    service._interval = 1800
+    assert service._next_delay() == 600  # Capped at interval_s during active hours
+
+
+async def test_status_is_saved_for_the_status_command(tmp_path, monkeypatch) -> None:
+    from typer.testing import CliRunner
+
+    from nanobot.cli.commands import app
+    from nanobot.utils.helpers import get_data_path
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    (tmp_path / "HEARTBEAT.md").write_text("- [ ] check the deploy")
+
+    async def on_heartbeat(prompt: str) -> str:
+        return "HEARTBEAT_OK"
+
+    status_path = get_data_path() / "heartbeat" / "status.json"
+    service = HeartbeatService(tmp_path, on_heartbeat, interval_s=1, jitter=0, status_path=status_path)
+    assert service.adaptive is False  # Fixed interval unless configured
+    await service.start()
+    await asyncio.sleep(1.3)
+
+    output = CliRunner().invoke(app, ["status"]).output
+    assert "Heartbeat: every 1.0s (fixed)" in output
+    assert "1 ticks, 1 LLM calls" in output
+
+    service.stop()
+    assert "Heartbeat: stopped" in CliRunner().invoke(app, ["status"]).output
@@ -0,0 +1,21 @@
+from nanobot.utils.html_markdown import html_to_markdown, html_to_text
+
+SAMPLE = (
+    "<div><h2 id=x>Title &amp; more</h2><p>Some <b>bold</b> text with "
+    "<a href=\"https://e.com/a?b=1&amp;c=2\">a <i>link</i></a>.</p>"
+    "<ul><li>one</li><li>two</li></ul><script>var a = '<p>';</script>"
+    "<p>line<br/>break</p></div>"
+)
+
+
+def test_html_to_markdown() -> None:
+    assert html_to_markdown(SAMPLE) == (
+        "## Title & more\n"
+        "Some bold text with [a link](https://e.com/a?b=1&c=2).\n\n"
+        "- one\n- twoline\nbreak"
+    )
+
+
+def test_html_to_text() -> None:
+    assert html_to_text(SAMPLE) == "Title & more\nSome bold text with a link.\n\none\ntwoline\nbreak"
+    assert html_to_text("") == ""
@@ -0,0 +1,21 @@
+from nanobot.agent.tools.http_cache import HttpCache, freshness
+
+
+def test_freshness_follows_cache_control() -> None:
+    assert freshness({"cache-control": "public, max-age=300"}) == (True, 300.0)
+    assert freshness({"cache-control": "no-cache", "etag": '"a"'}) == (True, None)
+    assert freshness({"cache-control": "no-store, max-age=300"}) == (False, None)
+
+
+def test_cache_keeps_revalidatable_entries(tmp_path) -> None:
+    cache = HttpCache(tmp_path)
+    cache.put("https://a/", "https://a/", 200, {"etag": '"v1"', "content-type": "text/plain"}, b"body")
+    cache.put("https://b/", "https://b/", 200, {"content-type": "text/plain"}, b"no validators")
+
+    entry = cache.get("https://a/")
+    assert entry is not None and entry.body == b"body" and not entry.fresh
+    assert entry.validators() == {"If-None-Match": '"v1"'}
+    assert cache.get("https://b/") is None
+
+    cache.revalidated(entry, {"cache-control": "max-age=60"})
+    assert HttpCache(tmp_path).get("https://a/").fresh
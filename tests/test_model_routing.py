@@ -0,0 +1,53 @@
+import pytest
+
+from nanobot.agent.routing import ModelRouter, is_simple_turn
+from nanobot.config.schema import ModelRoutingConfig
+
+
+@pytest.mark.parametrize("message", ["thanks!", "good morning :)", "ok cool", "Nice one, ty"])
+def test_chit_chat_is_simple(message: str) -> None:
+    assert is_simple_turn(message)
+
+
+@pytest.mark.parametrize("message", [
+    "",
+    "search for flights to Oslo",
+    "what's in notes.md",
+    "look at https://example.com",
+    "what is 12 * 7",
+    "run `ls`",
+    "remind me tomorrow",
+    "why is the sky blue",
+    "hi\nthere\nhow\nare you",
+    "hey " * 60,
+])
+def test_work_is_not_simple(message: str) -> None:
+    assert not is_simple_turn(message)
+
+
+def test_attachments_are_never_simple() -> None:
+    assert not is_simple_turn("thanks!", media=["/tmp/photo.jpg"])
+
+
+def test_each_purpose_gets_its_model_or_the_default() -> None:
+    router = ModelRouter("big", ModelRoutingConfig(heartbeat="small", subagent="mid"))
+    assert router.model_for("heartbeat") == "small"
+    assert router.model_for("subagent") == "mid"
+    assert router.model_for("interactive") == "big"
+    assert router.model_for("unknown") == "big"
+    assert ModelRouter("big").model_for("heartbeat") == "big"
+
+
+def test_fast_model_only_for_simple_classified_turns() -> None:
+    router = ModelRouter("big", ModelRoutingConfig(fast="fast", cron="cron-model", heartbeat="hb"))
+    assert router.initial_model("interactive", "thanks!") == "fast"
+    assert router.initial_model("cron", "good morning") == "fast"
+    assert router.initial_model("interactive", "fix the failing test") == "big"
+    assert router.initial_model("cron", "summarize the news") == "cron-model"
+    # Heartbeat turns are not classified
+    assert router.initial_model("heartbeat", "ok") == "hb"
+
+
+def test_no_fast_model_means_no_classification() -> None:
+    router = ModelRouter("big", ModelRoutingConfig(interactive="chat"))
+    assert router.initial_model("interactive", "thanks!") == "chat"
@@ -0,0 +1,46 @@
+import asyncio
+
+from nanobot.providers.ratelimit import RateLimiter, TokenBucket, estimate_tokens
+
+
+def test_estimate_tokens_counts_messages_and_tools() -> None:
+    messages = [{"role": "user", "content": "x" * 400}]
+    assert estimate_tokens(messages) == 100
+    tools = [{"type": "function", "function": {"name": "t", "description": "d" * 400}}]
+    assert estimate_tokens(messages, tools) > 200
+
+
+def test_token_bucket_delay_and_debt() -> None:
+    bucket = TokenBucket(capacity=60, per_second=1)
+    assert bucket.delay_for(60) == 0
+    bucket.consume(60)
+    assert 9 < bucket.delay_for(10) <= 10
+    bucket.adjust(-30)
+    assert bucket.delay_for(10) > 30
+
+
+async def test_concurrency_limit_queues_in_order() -> None:
+    limiter = RateLimiter(max_concurrency=1)
+    order: list[int] = []
+
+    async def call(i: int) -> None:
+        async with limiter.acquire():
+            order.append(i)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call(i) for i in range(5)))
+    assert order == [0, 1, 2, 3, 4]
+    stats = limiter.stats()
+    assert stats["requests"] == 5
+    assert stats["delayed"] >= 3
+    assert stats["in_flight"] == 0
+
+
+async def test_pause_delays_next_request() -> None:
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.pause(0.05)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    async with limiter.acquire(10):
+        pass
+    assert loop.time() - start >= 0.04
@@ -0,0 +1,33 @@
+from nanobot.agent.tools import filesystem
+from nanobot.agent.tools.filesystem import ReadFileTool
+
+
+async def test_read_file_ranges_and_binary_detection(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(filesystem, "LINE_INDEX_STRIDE", 64)
+    path = tmp_path / "log.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 1001)), encoding="utf-8")
+    tool = ReadFileTool()
+
+    result = await tool.execute(str(path), offset=500, limit=2)
+    assert result.startswith("line 500\nline 501\n[lines 500-501 of 1000")
+    assert "offset=502" in result
+
+    result = await tool.execute(str(path), offset=-2)
+    assert result.startswith("line 999\nline 1000\n[lines 999-1000 of 1000")
+
+    binary = tmp_path / "blob.bin"
+    binary.write_bytes(b"\x89PNG\x00\x00")
+    assert "binary file" in await tool.execute(str(binary))
+
+
+async def test_line_longer_than_the_cap_is_cut_and_paging_moves_on(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(filesystem, "MAX_READ_BYTES", 100)
+    path = tmp_path / "min.js"
+    path.write_text("short\n" + "x" * 500 + "\nafter\n", encoding="utf-8")
+    tool = ReadFileTool()
+
+    result = await tool.execute(str(path), offset=2)
+    assert result.startswith("x" * 100 + "\n[lines 2-2 of 3")
+    assert "line 2 cut at 100B" in result
+    assert "offset=3" in result
+    assert (await tool.execute(str(path), offset=3)).startswith("after\n")
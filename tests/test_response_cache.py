@@ -0,0 +1,132 @@
+import os
+
+from nanobot.agent.context import CURRENT_TIME_RE
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.providers import cache as cache_module
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.cache import CachedProvider, ResponseCache, bypass_cache, unkeyed
+
+
+class CountingProvider(LLMProvider):
+    """Answers with a running call count."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.calls += 1
+        return LLMResponse(content=f"answer {self.calls}", usage={"total_tokens": 10})
+
+    def get_default_model(self) -> str:
+        return "fake-model"
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+async def test_repeated_request_is_a_hit(tmp_path) -> None:
+    backend = CountingProvider()
+    provider = CachedProvider(backend, ResponseCache(tmp_path))
+
+    first = await provider.chat(MESSAGES)
+    second = await provider.chat(MESSAGES)
+    assert first.content == second.content == "answer 1"
+    assert second.usage == {}  # Nothing spent on a hit
+    assert backend.calls == 1
+
+    # Anything that changes the response is a miss
+    await provider.chat(MESSAGES, temperature=0.2)
+    await provider.chat([{"role": "user", "content": "bye"}])
+    assert backend.calls == 3
+    assert provider.stats()["hits"] == 1
+    assert provider.stats()["misses"] == 3
+
+
+async def test_bypass_skips_lookup_and_store(tmp_path) -> None:
+    backend = CountingProvider()
+    provider = CachedProvider(backend, ResponseCache(tmp_path))
+    with bypass_cache():
+        await provider.chat(MESSAGES)
+        await provider.chat(MESSAGES)
+    assert backend.calls == 2
+    assert len(provider.cache) == 0
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = ResponseCache(tmp_path, ttl_s=60)
+    cache.put("k", {"content": "x"})
+    now[0] += 30
+    assert cache.get("k") == {"content": "x"}
+    now[0] += 31
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert not (tmp_path / "k.json").exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path) -> None:
+    entry = {"content": "x" * 100}
+    cache = ResponseCache(tmp_path, max_bytes=500)
+    for key in ("a", "b", "c"):
+        cache.put(key, entry)
+    cache.get("a")  # Now b is the oldest
+    cache.put("d", entry)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) == entry for key in ("a", "c", "d"))
+    assert cache.total_bytes <= 500
+
+
+def test_index_survives_restart_in_access_order(tmp_path) -> None:
+    cache = ResponseCache(tmp_path)
+    cache.put("old", {"content": "1"})
+    cache.put("new", {"content": "2"})
+    cache.get("old")  # Touches the file
+    os.utime(tmp_path / "new.json", (1, 1))
+    assert ResponseCache(tmp_path).store.keys() == ["new", "old"]
+
+
+async def test_interactive_direct_turns_bypass_the_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    backend = CountingProvider()
+    provider = CachedProvider(backend, ResponseCache(tmp_path / "llm"))
+    agent = AgentLoop(MessageBus(), provider, tmp_path / "workspace")
+
+    await agent.process_direct("hello")
+    await agent.process_direct("hello again")
+    assert backend.calls == 2
+    assert len(provider.cache) == 0  # Neither looked up nor stored
+
+    await agent.process_direct("check the feeds", purpose="cron")
+    assert len(provider.cache) == 1
+
+
+async def test_unkeyed_text_does_not_change_the_key(tmp_path) -> None:
+    backend = CountingProvider()
+    provider = CachedProvider(backend, ResponseCache(tmp_path))
+
+    def at(minute: str) -> list[dict]:
+        return [{"role": "system", "content": f"# Bot\n\n## Current Time\n2026-01-01 09:{minute} (Thursday)\n\nBe brief"}]
+
+    with unkeyed(CURRENT_TIME_RE):
+        await provider.chat(at("00"))
+        await provider.chat(at("30"))
+    assert backend.calls == 1
+    await provider.chat(at("45"))  # Outside the block the time is part of the key
+    assert backend.calls == 2
+
+
+async def test_repeated_heartbeat_turns_hit_the_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    backend = CountingProvider()
+    provider = CachedProvider(backend, ResponseCache(tmp_path / "llm"))
+    agent = AgentLoop(MessageBus(), provider, tmp_path / "workspace")
+
+    for _ in range(3):
+        response = await agent.process_direct("check HEARTBEAT.md", session_key="heartbeat", purpose="heartbeat")
+        assert response == "answer 1"
+    assert backend.calls == 1
+    assert (provider.hits, provider.misses) == (2, 1)
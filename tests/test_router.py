@@ -0,0 +1,150 @@
+import asyncio
+
+from nanobot.providers import router
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.router import Backend, CircuitBreaker, RoutingProvider
+
+
+class FakeProvider(LLMProvider):
+    """Answers with its name after `delay` seconds, or fails."""
+
+    def __init__(self, name: str, delay: float = 0, fail: bool = False):
+        super().__init__()
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return LLMResponse(content=self.name)
+
+    def get_default_model(self) -> str:
+        return self.name
+
+
+def _router(*providers: FakeProvider, hedge_after_s: float = 0, **breaker) -> RoutingProvider:
+    return RoutingProvider(
+        [Backend(p.name, p, breaker=CircuitBreaker(**breaker)) for p in providers],
+        hedge_after_s=hedge_after_s,
+    )
+
+
+async def test_fails_over_in_order() -> None:
+    first, second, third = FakeProvider("a", fail=True), FakeProvider("b", fail=True), FakeProvider("c")
+    response = await _router(first, second, third).chat([{"role": "user", "content": "hi"}])
+    assert response.content == "c"
+    assert (first.calls, second.calls, third.calls) == (1, 1, 1)
+
+
+async def test_all_backends_failing_returns_last_error() -> None:
+    response = await _router(FakeProvider("a", fail=True), FakeProvider("b", fail=True)).chat([])
+    assert response.finish_reason == "error"
+    assert "b is down" in response.content
+
+
+async def test_hedge_wins_and_slow_request_is_cancelled() -> None:
+    slow, fast = FakeProvider("slow", delay=1), FakeProvider("fast")
+    routing = _router(slow, fast, hedge_after_s=0.02)
+    response = await routing.chat([])
+    await asyncio.sleep(0)
+
+    assert response.content == "fast"
+    assert slow.cancelled == 1
+    # A cancelled call is neither a success nor a failure for the breaker
+    assert routing.backends[0].breaker.state == "closed"
+    assert routing.backends[0].errors == 0
+
+
+async def test_no_hedge_when_primary_answers_in_time() -> None:
+    primary, spare = FakeProvider("a", delay=0.01), FakeProvider("b")
+    response = await _router(primary, spare, hedge_after_s=0.5).chat([])
+    assert response.content == "a"
+    assert spare.calls == 0
+
+
+async def test_breaker_opens_skips_backend_and_recovers(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    flaky, spare = FakeProvider("flaky", fail=True), FakeProvider("spare")
+    routing = _router(flaky, spare, failure_threshold=2, cooldown_s=30)
+    breaker = routing.backends[0].breaker
+
+    for _ in range(2):
+        assert (await routing.chat([])).content == "spare"
+    assert breaker.state == "open"
+
+    # Open: the flaky backend is not tried at all
+    await routing.chat([])
+    assert flaky.calls == 2
+
+    # Half-open after the cooldown: one trial, which fails and re-opens
+    now[0] += 30
+    assert breaker.state == "half_open"
+    await routing.chat([])
+    assert flaky.calls == 3
+    assert breaker.state == "open"
+
+    # The next trial succeeds and closes the circuit
+    now[0] += 30
+    flaky.fail = False
+    assert (await routing.chat([])).content == "flaky"
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_half_open_lets_a_single_trial_through(monkeypatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=5)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 5
+    assert breaker.allow()
+    assert not breaker.allow()  # Trial already in flight
+    breaker.release()
+    assert breaker.available()
+
+
+async def test_half_open_trial_in_flight_is_not_duplicated() -> None:
+    flaky, spare = FakeProvider("flaky", delay=0.2), FakeProvider("spare")
+    routing = _router(flaky, spare, failure_threshold=1, cooldown_s=0)
+    routing.backends[0].breaker.record_failure()  # Half-open right away
+
+    # The first chat takes the half-open trial; the concurrent one must skip it
+    trial = asyncio.create_task(routing.chat([]))
+    await asyncio.sleep(0.01)
+    assert (await routing.chat([])).content == "spare"
+    assert flaky.calls == 1
+    assert (await trial).content == "flaky"
+
+
+async def test_hedge_skips_a_backend_whose_trial_was_taken_meanwhile() -> None:
+    slow, flaky, spare = FakeProvider("slow", delay=1), FakeProvider("flaky"), FakeProvider("spare")
+    routing = _router(slow, flaky, spare, hedge_after_s=0.05, failure_threshold=1, cooldown_s=0)
+    routing.backends[1].breaker.record_failure()  # Half-open right away
+
+    chat = asyncio.create_task(routing.chat([]))
+    await asyncio.sleep(0.01)
+    assert routing.backends[1].breaker.allow()  # Another chat claims the trial before the hedge
+    assert (await chat).content == "spare"
+    assert flaky.calls == 0
+
+
+async def test_all_circuits_open_still_tries_in_order() -> None:
+    first, second = FakeProvider("a", fail=True), FakeProvider("b")
+    routing = _router(first, second, failure_threshold=1, cooldown_s=30)
+    for backend in routing.backends:
+        backend.breaker.record_failure()
+
+    assert (await routing.chat([])).content == "b"
+    assert (first.calls, second.calls) == (1, 1)
@@ -0,0 +1,42 @@
+import os
+
+from nanobot.agent.tools.search import SearchTool, required_literals
+
+
+def test_required_literals_are_conservative() -> None:
+    assert required_literals(r"def \w+_tool\(") == ["def ", "_tool("]
+    assert required_literals("colou?r") == ["colo"]
+    assert required_literals("foo|bar") == []
+    assert required_literals("foo(bar)?baz") == []
+
+
+async def test_indexed_search_sees_file_changes(tmp_path) -> None:
+    (tmp_path / "a.py").write_text("alpha = 1\nbeta = 2\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("alpha in text\n", encoding="utf-8")
+    tool = SearchTool(tmp_path, use_index=True)
+
+    assert await tool.execute("alpha", glob="*.py") == "a.py:1: alpha = 1"
+    assert "b.txt:1" in await tool.execute("ALPHA", ignore_case=True)
+
+    path = tmp_path / "a.py"
+    path.write_text("gamma = 3\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert await tool.execute("gamma") == "a.py:1: gamma = 3"
+    assert "a.py" not in await tool.execute("alpha")
+
+
+def test_group_syntax_is_not_a_literal() -> None:
+    assert required_literals(r"(?P<word>\w+)_tool") == ["_tool"]
+    assert required_literals(r"(?:abc)def") == ["abc", "def"]
+    assert required_literals(r"(?!foo)bar\w+") == []
+    assert required_literals(r"(?i)Alpha") == []
+
+
+async def test_indexed_and_plain_search_agree(tmp_path) -> None:
+    (tmp_path / "a.py").write_text("my_tool = 1\nbarrel = 2\nALPHA = 3\n", encoding="utf-8")
+    indexed = SearchTool(tmp_path, use_index=True)
+    plain = SearchTool(tmp_path, use_index=False)
+    for pattern in [r"(?P<w>\w+)_tool", r"(?:my)_tool", r"(?!foo)bar\w+", r"(?i)alpha", r"(?<=my)_tool"]:
+        expected = await plain.execute(pattern)
+        assert expected.startswith("a.py:")
+        assert await indexed.execute(pattern) == expected
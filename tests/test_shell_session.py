@@ -0,0 +1,54 @@
+import shutil
+import sys
+
+import pytest
+
+from nanobot.agent.tools.shell import ExecTool
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32" or not shutil.which("bash"), reason="needs a POSIX bash"
+)
+
+
+async def test_persistent_shell_keeps_state_and_survives_timeout(tmp_path) -> None:
+    from nanobot.agent.tools.shell_session import ShellSessionPool
+
+    pool = ShellSessionPool()
+    tool = ExecTool(timeout=1, working_dir=str(tmp_path), session_pool=pool)
+    try:
+        assert await tool.execute("export NB_TEST=42; cd /") == "(no output)"
+        assert await tool.execute("echo $NB_TEST; pwd") == "42\n/\n"
+        assert "Exit code: 3" in await tool.execute("(exit 3)")
+
+        result = await tool.execute("sleep 30")
+        assert result.startswith("Error: Command timed out after 1 seconds")
+        assert await tool.execute("echo $NB_TEST") == "42\n"
+    finally:
+        pool.close_all()
+
+
+async def test_restricted_persistent_shell_starts_each_command_in_the_workspace(tmp_path) -> None:
+    from nanobot.agent.tools.shell_session import ShellSessionPool
+
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    pool = ShellSessionPool()
+    tool = ExecTool(working_dir=str(workspace), restrict_to_workspace=True, session_pool=pool)
+    try:
+        await tool.execute("cd ..")
+        assert await tool.execute("pwd") == f"{workspace.resolve()}\n"
+        await tool.execute("cd /")
+        assert await tool.execute("pwd") == f"{workspace.resolve()}\n"
+    finally:
+        pool.close_all()
+
+
+async def test_long_command_larger_than_the_pty_buffer(tmp_path) -> None:
+    from nanobot.agent.tools.shell_session import ShellSessionPool
+
+    pool = ShellSessionPool()
+    tool = ExecTool(timeout=10, working_dir=str(tmp_path), session_pool=pool)
+    try:
+        assert await tool.execute(f"echo {'x' * 200_000} | wc -c") == "200001\n"
+    finally:
+        pool.close_all()
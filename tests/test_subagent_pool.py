@@ -0,0 +1,36 @@
+import asyncio
+
+from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.spawn import SpawnTool
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import SubagentConfig
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class SlowProvider(LLMProvider):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        await asyncio.sleep(0.05)
+        return LLMResponse(content="done", usage={"prompt_tokens": 7, "completion_tokens": 3})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_pool_queues_limits_and_cancels(tmp_path) -> None:
+    bus = MessageBus()
+    config = SubagentConfig(max_concurrent=1, max_per_origin=2)
+    manager = SubagentManager(SlowProvider(), tmp_path, bus, config=config)
+    tool = SpawnTool(manager)
+    tool.set_context("telegram", "42")
+
+    assert "started" in await tool.execute(task="first")
+    assert "queued" in await tool.execute(task="second")
+    assert (await tool.execute(task="third")).startswith("Error: this chat already has 2")
+
+    first, second = manager.list()
+    assert await tool.execute(action="cancel", task_id=second.id) == f"Cancelled subagent {second.id}"
+    await first.handle
+
+    assert first.status == "ok" and first.prompt_tokens == 7 and first.completion_tokens == 3
+    assert second.status == "cancelled"
+    assert bus.inbound.qsize() == 1  # Only the finished subagent announces
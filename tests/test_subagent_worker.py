@@ -0,0 +1,119 @@
+import functools
+import subprocess
+import sys
+
+import pytest
+
+from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.subagent_worker import limit_resources
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import SubagentConfig
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX rlimits")
+
+
+class ScriptedProvider(LLMProvider):
+    """Plays back responses and records the requests it was given."""
+
+    def __init__(self, *responses: LLMResponse):
+        super().__init__()
+        self.responses = list(responses)
+        self.requests: list[dict] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.requests.append({"messages": messages, "tools": tools, "model": model})
+        return self.responses.pop(0)
+
+    def get_default_model(self) -> str:
+        return "parent-model"
+
+
+def _tool_call(name: str, **arguments) -> LLMResponse:
+    return LLMResponse(
+        content="",
+        tool_calls=[ToolCallRequest(id="call_1", name=name, arguments=arguments)],
+        usage={"prompt_tokens": 10, "completion_tokens": 5},
+    )
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    # Workers load the config from ~/.nanobot; keep them off the real one
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    return tmp_path
+
+
+async def _run(provider: LLMProvider, workspace, **config):
+    manager = SubagentManager(
+        provider, workspace, MessageBus(), config=SubagentConfig(isolation="process", **config)
+    )
+    attempts = []
+    run_worker = manager._run_worker
+
+    async def counting_run_worker(record):
+        attempts.append(record.id)
+        return await run_worker(record)
+
+    manager._run_worker = counting_run_worker
+    await manager.spawn("write a greeting")
+    (record,) = manager.list()
+    await record.handle
+    return record, len(attempts)
+
+
+async def test_worker_proxies_llm_calls_to_the_parent(home) -> None:
+    workspace = home / "workspace"
+    workspace.mkdir()
+    provider = ScriptedProvider(
+        _tool_call("write_file", path=str(workspace / "hello.txt"), content="hi"),
+        LLMResponse(content="wrote hello.txt", usage={"prompt_tokens": 20, "completion_tokens": 3}),
+    )
+    record, attempts = await _run(provider, workspace)
+
+    assert (record.status, record.result) == ("ok", "wrote hello.txt")
+    assert (workspace / "hello.txt").read_text() == "hi"
+    # Both calls were made by the parent's provider, which saw the tool result
+    assert [r["model"] for r in provider.requests] == ["parent-model", "parent-model"]
+    assert provider.requests[1]["messages"][-1]["role"] == "tool"
+    assert (record.llm_calls, record.tool_calls, record.prompt_tokens) == (2, 1, 30)
+    assert attempts == 1
+
+
+async def test_crash_after_a_tool_ran_is_not_restarted(home) -> None:
+    workspace = home / "workspace"
+    workspace.mkdir()
+    provider = ScriptedProvider(_tool_call("exec", command="kill -9 $PPID"))
+    record, attempts = await _run(provider, workspace, max_restarts=3)
+
+    assert record.status == "error"
+    assert "crashed after running tools (killed by signal 9)" in record.result
+    assert attempts == 1
+
+
+async def test_crash_before_any_tool_is_restarted(home) -> None:
+    # Too little address space for the worker to even import its modules
+    record, attempts = await _run(ScriptedProvider(), home, max_restarts=2, max_memory_mb=30)
+
+    assert record.status == "error"
+    assert record.result == "Error: worker process crashed (exit code 1)"
+    assert attempts == 3
+
+
+def test_resource_limits_apply_to_the_child() -> None:
+    script = (
+        "import os, resource; "
+        "print(resource.getrlimit(resource.RLIMIT_AS)[0], "
+        "resource.getrlimit(resource.RLIMIT_CPU)[0], os.nice(0))"
+    )
+    before = subprocess.run([sys.executable, "-c", "import os; print(os.nice(0))"],
+                            capture_output=True, text=True).stdout.split()
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        preexec_fn=functools.partial(limit_resources, 512, 30),
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+
+    assert output[:2] == [str(512 * 1024 * 1024), "30"]
+    assert int(output[2]) == min(19, int(before[0]) + 10)
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels import telegram
+from nanobot.channels.telegram import TelegramChannel, _split_markdown
+from nanobot.config.schema import TelegramConfig
+
+
+def _update(message_id: int, text: str | None = None, photo: str | None = None, group: str | None = None):
+    user = SimpleNamespace(id=7, username="alice", first_name="Alice")
+    message = SimpleNamespace(
+        message_id=message_id,
+        chat_id=42,
+        chat=SimpleNamespace(type="private"),
+        from_user=user,
+        text=text,
+        caption=None,
+        photo=[SimpleNamespace(file_id=photo, file_unique_id=photo)] if photo else None,
+        voice=None,
+        audio=None,
+        document=None,
+        media_group_id=group,
+    )
+    return SimpleNamespace(message=message, effective_user=user)
+
+
+async def test_albums_are_merged_and_chat_order_is_kept(monkeypatch) -> None:
+    monkeypatch.setattr(telegram, "MEDIA_GROUP_WAIT_S", 0.05)
+    bus = MessageBus()
+    channel = TelegramChannel(TelegramConfig(media_workers=2), bus)
+    fetched = []
+
+    async def fake_fetch(media_file, media_type):
+        fetched.append(media_file.file_id)
+        await asyncio.sleep(0.1)
+        return f"/media/{media_file.file_id}.jpg", f"[image: {media_file.file_id}]"
+
+    channel._fetch_media = fake_fetch
+
+    await channel._on_message(_update(1, photo="a", group="g"), None)
+    await channel._on_message(_update(2, photo="b", group="g"), None)
+    await channel._on_message(_update(3, text="what are these?"), None)
+    while channel._chat_tails:
+        await asyncio.sleep(0.01)
+
+    album = await bus.consume_inbound()
+    follow_up = await bus.consume_inbound()
+    assert sorted(fetched) == ["a", "b"]
+    assert album.media == ["/media/a.jpg", "/media/b.jpg"]
+    assert album.content == "[image: a]\n[image: b]"
+    assert follow_up.content == "what are these?"
+
+
+def test_long_markdown_is_split_without_breaking_code_blocks() -> None:
+    code = "\n".join(f"print({i})" for i in range(100))
+    text = "Intro paragraph.\n\n```python\n" + code + "\n```\n\n" + "word " * 300
+    chunks = _split_markdown(text, limit=500)
+
+    assert all(len(c) <= 500 for c in chunks)
+    assert chunks[0].startswith("Intro paragraph.")
+    for chunk in chunks:
+        fences = [line for line in chunk.split("\n") if line.startswith("```")]
+        assert len(fences) % 2 == 0  # Every chunk closes what it opens
+        if "print(" in chunk:
+            assert chunk.startswith(("Intro", "```python"))
+    assert "".join(chunks).count("print(") == 100
+    assert _split_markdown("short") == ["short"]
+
+
+async def test_send_falls_back_to_plain_text_per_chunk() -> None:
+    channel = TelegramChannel(TelegramConfig(), MessageBus())
+    sent = []
+
+    async def send_message(chat_id, text, parse_mode):
+        if parse_mode == "HTML" and "<b>" in text:
+            raise RuntimeError("can't parse entities")
+        sent.append((parse_mode, text))
+
+    channel._app = SimpleNamespace(bot=SimpleNamespace(send_message=send_message))
+    content = "a " * 1500 + "\n\n**bold** " + "b " * 1500 + "\n\n" + "c " * 1500
+    await channel.send(OutboundMessage(channel="telegram", chat_id="42", content=content))
+
+    assert [mode for mode, _ in sent] == ["HTML", None, "HTML"]  # Only the bad chunk degrades
+    assert sent[1][1].startswith("**bold**")
+    assert all(len(text) <= 4096 for _, text in sent)
+
+
+async def test_download_errors_do_not_log_the_bot_token(monkeypatch, tmp_path) -> None:
+    import httpx
+    from loguru import logger
+
+    channel = TelegramChannel(TelegramConfig(token="123:SECRET"), MessageBus())
+    channel.media_dir = tmp_path
+
+    async def get_file(file_id):
+        return SimpleNamespace(file_path=f"https://api.telegram.org/file/bot123:SECRET/photos/{file_id}.jpg")
+
+    channel._app = SimpleNamespace(bot=SimpleNamespace(get_file=get_file))
+    logs: list[str] = []
+    sink = logger.add(logs.append, level="ERROR")
+    try:
+        for handler in (
+            lambda request: httpx.Response(404, request=request),
+            lambda request: (_ for _ in ()).throw(httpx.ConnectError(f"failed: {request.url}", request=request)),
+        ):
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            monkeypatch.setattr(telegram, "get_http_client", lambda: client)
+            photo = SimpleNamespace(file_id="f1", file_unique_id="u1", file_size=10)
+            assert await channel._fetch_media(photo, "image") == (None, "[image: download failed]")
+            await client.aclose()
+    finally:
+        logger.remove(sink)
+
+    assert len(logs) == 2
+    assert "image f1: HTTP 404" in logs[0] and "image f1: ConnectError" in logs[1]
+    assert not any("SECRET" in line for line in logs)
@@ -0,0 +1,81 @@
+import random
+import re
+
+import pytest
+
+from nanobot.channels.telegram import _markdown_to_telegram_html
+
+
+@pytest.mark.parametrize("text, html", [
+    (
+        "## Results\n\nA **bold** and _italic_ [link](https://example.com/a_b) with `x < 1`.",
+        'Results\n\nA <b>bold</b> and <i>italic</i> <a href="https://example.com/a_b">link</a> '
+        "with <code>x &lt; 1</code>.",
+    ),
+    ("- one ~~old~~ new\n* two __strong__\n\n> quoted", "• one <s>old</s> new\n• two <b>strong</b>\n\nquoted"),
+    ("`code ```py\nblock``` inside`", "<code>code <pre><code>block</code></pre> inside</code>"),
+    ("snake_case_name & <tag>", "snake_case_name &amp; &lt;tag&gt;"),
+])
+def test_converts_common_markdown(text: str, html: str) -> None:
+    assert _markdown_to_telegram_html(text) == html
+
+
+def test_code_is_restored_in_one_pass() -> None:
+    text = " ".join(f"`c{i}`" for i in range(2000)) + "\n```\nblock\n```"
+    html = _markdown_to_telegram_html(text)
+    assert html == " ".join(f"<code>c{i}</code>" for i in range(2000)) + "\n<pre><code>block\n</code></pre>"
+
+    # Placeholder-like text inside code is left as written, where _reference expanded it again
+    text = "`\x00IC1\x00` `b`"
+    assert _markdown_to_telegram_html(text) == "<code>\x00IC1\x00</code> <code>b</code>"
+    assert _reference(text) == "<code><code>b</code></code> <code>b</code>"
+
+
+def _reference(text: str) -> str:
+    """The converter as it was before code restoration became linear."""
+    if not text:
+        return ""
+    code_blocks: list[str] = []
+    inline_codes: list[str] = []
+
+    def save_code_block(m: re.Match) -> str:
+        code_blocks.append(m.group(1))
+        return f"\x00CB{len(code_blocks) - 1}\x00"
+
+    def save_inline_code(m: re.Match) -> str:
+        inline_codes.append(m.group(1))
+        return f"\x00IC{len(inline_codes) - 1}\x00"
+
+    text = re.sub(r'```[\w]*\n?([\s\S]*?)```', save_code_block, text)
+    text = re.sub(r'`([^`]+)`', save_inline_code, text)
+    text = re.sub(r'^#{1,6}\s+(.+)$', r'\1', text, flags=re.MULTILINE)
+    text = re.sub(r'^>\s*(.*)$', r'\1', text, flags=re.MULTILINE)
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'__(.+?)__', r'<b>\1</b>', text)
+    text = re.sub(r'(?<![a-zA-Z0-9])_([^_]+)_(?![a-zA-Z0-9])', r'<i>\1</i>', text)
+    text = re.sub(r'~~(.+?)~~', r'<s>\1</s>', text)
+    text = re.sub(r'^[-*]\s+', '• ', text, flags=re.MULTILINE)
+    for i, code in enumerate(inline_codes):
+        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        text = text.replace(f"\x00IC{i}\x00", f"<code>{escaped}</code>")
+    for i, code in enumerate(code_blocks):
+        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        text = text.replace(f"\x00CB{i}\x00", f"<pre><code>{escaped}</code></pre>")
+    return text
+
+
+# NUL is left out: placeholder-like text inside code is the one intended difference
+_TOKENS = [
+    "`", "```", "```py\n", "**", "__", "_", "~~", "[", "]", "(", ")", "#", "## ", ">", "> ",
+    "- ", "* ", "&", "<", ">", "\n", " ", "a", "word", "snake_case", "x1", "https://e.com/a_b",
+    "IC0", "CB1", "1",
+]
+
+
+def test_matches_the_reference_converter_on_random_markdown() -> None:
+    rng = random.Random(1234)
+    for _ in range(5000):
+        text = "".join(rng.choice(_TOKENS) for _ in range(rng.randint(0, 60)))
+        assert _markdown_to_telegram_html(text) == _reference(text), repr(text)
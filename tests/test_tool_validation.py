@@ -86,3 +86,26 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+def test_registry_caches_sorted_definitions() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    first = reg.get_definitions()
+    assert reg.get_definitions() is first
+    assert reg.version == 1
+
+    class OtherTool(SampleTool):
+        @property
+        def name(self) -> str:
+            return "another"
+
+    reg.register(OtherTool())
+    names = [d["function"]["name"] for d in reg.get_definitions()]
+    assert names == ["another", "sample"]
+    assert reg.version == 2
+
+    reg.unregister("another")
+    reg.unregister("missing")
+    assert [d["function"]["name"] for d in reg.get_definitions()] == ["sample"]
+    assert reg.version == 3
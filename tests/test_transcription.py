@@ -0,0 +1,84 @@
+import asyncio
+from pathlib import Path
+
+from nanobot.providers import transcription
+from nanobot.providers.transcription import (
+    GroqTranscriptionProvider,
+    TranscriptionBackend,
+    parse_silencedetect,
+    split_points,
+)
+
+
+class FakeBackend(TranscriptionBackend):
+    """Echoes the audio back as text; later pieces finish first."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def transcribe(self, audio: bytes, filename: str) -> str:
+        self.calls.append(filename)
+        await asyncio.sleep(0.05 if filename.startswith("0") else 0)
+        return audio.decode()
+
+
+def test_splits_at_the_silence_nearest_each_boundary() -> None:
+    silences = [(50.0, 51.0), (118.0, 119.0), (135.0, 137.0), (250.0, 250.5)]
+    assert split_points(400.0, silences, 120.0) == [118.5, 250.25]
+    # No silence near the boundary: hard cut; short audio is not split
+    assert split_points(300.0, [], 120.0) == [120.0]
+    assert split_points(170.0, silences, 120.0) == []
+
+
+def test_parses_ffmpeg_silencedetect_output() -> None:
+    stderr = (
+        "  Duration: 00:04:05.50, start: 0.000000, bitrate: 32 kb/s\n"
+        "[silencedetect @ 0x1] silence_start: -0.01\n"
+        "[silencedetect @ 0x1] silence_end: 1.2 | silence_duration: 1.21\n"
+        "[silencedetect @ 0x1] silence_start: 100.5\n"
+        "[silencedetect @ 0x1] silence_end: 101 | silence_duration: 0.5\n"
+    )
+    assert parse_silencedetect(stderr) == (245.5, [(0.0, 1.2), (100.5, 101.0)])
+
+
+async def test_long_audio_is_stitched_in_order_and_cached(tmp_path, monkeypatch) -> None:
+    audio = tmp_path / "note.ogg"
+    audio.write_bytes(b"x" * transcription.PROBE_MIN_BYTES)
+
+    async def fake_detect(path):
+        return 400.0, [(119.0, 121.0)]
+
+    async def fake_ffmpeg(*args):
+        start = args[args.index("-ss") + 1]
+        Path(args[-1]).write_text(f"from {start}")
+        return ""
+
+    monkeypatch.setattr(transcription.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(transcription, "_ffmpeg", fake_ffmpeg)
+    backend = FakeBackend()
+    provider = GroqTranscriptionProvider(backend=backend, cache_dir=tmp_path / "cache")
+    provider._detect_silences = fake_detect
+
+    text = await provider.transcribe(audio)
+    assert text == "from 0.000 from 120.000 from 240.000"
+    assert sorted(backend.calls) == ["0.flac", "1.flac", "2.flac"]
+
+    # Same audio under another name: served from the disk cache
+    copy = tmp_path / "copy.ogg"
+    copy.write_bytes(audio.read_bytes())
+    fresh = GroqTranscriptionProvider(backend=backend, cache_dir=tmp_path / "cache")
+    assert await fresh.transcribe(copy) == text
+    assert len(backend.calls) == 3
+
+
+async def test_disk_cache_is_bounded(tmp_path) -> None:
+    backend = FakeBackend()
+    provider = GroqTranscriptionProvider(backend=backend, cache_dir=tmp_path / "cache", cache_max_bytes=250)
+    for i in range(5):
+        audio = tmp_path / f"{i}.ogg"
+        audio.write_bytes(f"{i}".encode() * 100)
+        await provider.transcribe(audio)
+
+    cache = GroqTranscriptionProvider(cache_dir=tmp_path / "cache", cache_max_bytes=250).disk_cache
+    assert len(cache) == 2 and cache.total_bytes <= 250
+    assert len(list((tmp_path / "cache").glob("*.txt"))) == 2
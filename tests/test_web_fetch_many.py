@@ -0,0 +1,80 @@
+import asyncio
+import json
+from collections import Counter
+from urllib.parse import urlparse
+
+from nanobot.agent.tools.web import WebFetchManyTool, WebFetchTool
+
+
+class FakeFetcher(WebFetchTool):
+    """Serves pages after a per-URL delay and records concurrency."""
+
+    def __init__(self, delays: dict[str, float] | None = None):
+        super().__init__()
+        self.delays = delays or {}
+        self.active: Counter[str] = Counter()
+        self.peak_total = 0
+        self.peak_per_host: Counter[str] = Counter()
+
+    async def execute(self, url, extractMode="markdown", maxChars=None, **kwargs):
+        host = urlparse(url).netloc
+        self.active[host] += 1
+        self.peak_total = max(self.peak_total, sum(self.active.values()))
+        self.peak_per_host[host] = max(self.peak_per_host[host], self.active[host])
+        try:
+            await asyncio.sleep(self.delays.get(url, 0.02))
+        finally:
+            self.active[host] -= 1
+        if "broken" in url:
+            raise RuntimeError("connection reset")
+        if "missing" in url:
+            return json.dumps({"error": "HTTP 404", "url": url})
+        return json.dumps({"url": url, "status": 200, "text": f"page {url}"[:maxChars]})
+
+
+async def test_results_keep_request_order() -> None:
+    urls = [f"https://h{i}.test/" for i in range(5)]
+    delays = {url: 0.05 - i * 0.01 for i, url in enumerate(urls)}  # Later URLs finish first
+    result = json.loads(await WebFetchManyTool(FakeFetcher(delays)).execute(urls))
+    assert [r["url"] for r in result["results"]] == urls
+    assert result["fetched"] == 5
+
+
+async def test_concurrency_is_bounded_overall_and_per_host() -> None:
+    fetcher = FakeFetcher()
+    urls = [f"https://same.test/{i}" for i in range(6)] + [f"https://h{i}.test/" for i in range(6)]
+    tool = WebFetchManyTool(fetcher, max_concurrency=4, per_host=2)
+    result = json.loads(await tool.execute(urls))
+
+    assert result["fetched"] == 12
+    assert fetcher.peak_total <= 4
+    assert fetcher.peak_per_host["same.test"] == 2
+
+
+async def test_one_failure_does_not_affect_the_others() -> None:
+    urls = ["https://a.test/", "https://broken.test/", "https://missing.test/", "https://b.test/"]
+    result = json.loads(await WebFetchManyTool(FakeFetcher()).execute(urls))
+
+    assert (result["fetched"], result["failed"]) == (2, 2)
+    by_url = {r["url"]: r for r in result["results"]}
+    assert by_url["https://broken.test/"]["error"] == "connection reset"
+    assert by_url["https://missing.test/"]["error"] == "HTTP 404"
+    assert by_url["https://b.test/"]["text"] == "page https://b.test/"
+
+
+async def test_batch_deadline_reports_slow_pages_as_timed_out() -> None:
+    fetcher = FakeFetcher({"https://slow.test/": 5})
+    tool = WebFetchManyTool(fetcher, timeout_s=0.2)
+    result = json.loads(await tool.execute(["https://slow.test/", "https://fast.test/"]))
+
+    assert result["results"][0] == {"url": "https://slow.test/", "error": "timed out after 0.2s"}
+    assert result["results"][1]["status"] == 200
+
+
+async def test_duplicate_urls_are_fetched_once_and_pages_are_budgeted() -> None:
+    fetcher = FakeFetcher()
+    result = json.loads(await WebFetchManyTool(fetcher).execute(
+        ["https://a.test/", " https://a.test/"], maxCharsPerPage=10,
+    ))
+    assert len(result["results"]) == 1
+    assert result["results"][0]["text"] == "page https"